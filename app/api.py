@@ -0,0 +1,110 @@
+"""JSON endpoints used by handheld scanners and monitoring."""
+
+from datetime import date
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile
+from fastapi.responses import StreamingResponse
+
+from app.auth import current_user_id
+from app.database import get_async_session, get_read_session_async, get_session
+from app.export import EXPORT_FORMATS, XLSX_MAX_ROWS, export_row_count, stream_export
+from app.http_cache import ConditionalGet, Validators
+from app.importer import import_assets
+from app.lookup import ASSET_LOOKUP
+from app.models import (
+    AssetFilter,
+    AssetResponsePage,
+    AssetSummary,
+    BulkMovementCreate,
+    BulkMovementResult,
+    ImportReport,
+    LookupStats,
+)
+from app.movements import move_assets
+from app.pagination import AssetSort
+from app.responses import asset_response_page_async
+from app.workloads import Workload
+
+router = APIRouter(prefix="/api")
+
+
+# the response tables of the asset list and export; a change to any of them changes the ETag
+ASSET_LIST_TABLES = ("assets", "locations", "rooms", "asset_categories")
+
+
+@router.get("/assets", response_model=AssetResponsePage)
+async def list_assets(
+    filters: AssetFilter = Depends(),
+    sort: AssetSort = AssetSort.KODE,
+    limit: int = 50,
+    after: Optional[str] = None,
+    validators: Optional[Validators] = Depends(ConditionalGet(*ASSET_LIST_TABLES)),
+):
+    """One page of assets; pass next_cursor back as `after` for the following page."""
+    # the ETag follows the primary, so a response that carries one is read from there
+    session = get_async_session() if validators is not None else await get_read_session_async()
+    async with session:
+        try:
+            return await asset_response_page_async(session, filters, sort, limit, after)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail="Cursor tidak valid") from e
+
+
+@router.get("/assets/lookup/{code}", response_model=AssetSummary)
+async def lookup_asset(code: str):
+    """Resolve a scanned barcode, kode or nomor_aset."""
+    async with get_async_session() as session:
+        summary = await ASSET_LOOKUP.lookup(session, code)
+    if summary is None:
+        raise HTTPException(status_code=404, detail=f"Aset dengan kode '{code}' tidak ditemukan")
+    return summary
+
+
+@router.post("/assets/import", response_model=ImportReport)
+def import_asset_file(file: UploadFile, user_id: int = Depends(current_user_id)):
+    """Load a CSV or XLSX asset register. Runs in the threadpool; the upload is read as it is parsed."""
+    with get_session(Workload.BULK_IMPORT) as session:
+        return import_assets(session, file.file, file.filename or "", user_id)
+
+
+@router.post("/assets/mutasi", response_model=BulkMovementResult)
+def move_asset_batch(request: BulkMovementCreate, user_id: int = Depends(current_user_id)):
+    """Move many assets to one location/room/holder atomically, e.g. when a room is reorganised."""
+    with get_session() as session:
+        try:
+            return move_assets(session, request, user_id)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e)) from e
+
+
+@router.get("/assets/export")
+def export_assets(
+    export_format: Literal["csv", "xlsx", "jsonl"] = Query("csv", alias="format"),
+    include_inactive: bool = False,
+    validators: Optional[Validators] = Depends(ConditionalGet(*ASSET_LIST_TABLES)),
+):
+    """Stream the whole register; memory use does not depend on its size."""
+    primary = validators is not None
+    if export_format == "xlsx":
+        rows = export_row_count(include_inactive, primary)
+        if rows > XLSX_MAX_ROWS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"{rows} aset melebihi batas XLSX ({XLSX_MAX_ROWS} baris), gunakan format csv atau jsonl",
+            )
+    filename = f"aset-{date.today():%Y%m%d}.{export_format}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    if validators is not None:
+        # a returned response does not pick up headers set by dependencies
+        headers.update(validators.headers())
+    return StreamingResponse(
+        stream_export(export_format, include_inactive, primary),
+        media_type=EXPORT_FORMATS[export_format],
+        headers=headers,
+    )
+
+
+@router.get("/stats/lookup", response_model=LookupStats)
+async def lookup_stats():
+    return ASSET_LOOKUP.stats()
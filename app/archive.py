@@ -0,0 +1,289 @@
+"""Cold archive of movement and maintenance history in Parquet files.
+
+Rows older than a cutoff are streamed into one zstd-compressed Parquet file per table and run
+under APP_ARCHIVE_DIR, then removed from the hot table. history() reads both places, so callers
+do not need to know where a row lives. Every function takes the archive directory as a parameter
+and defaults to APP_ARCHIVE_DIR.
+"""
+
+import enum
+import logging
+import os
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, TypeVar
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from sqlalchemy import Boolean, Date, DateTime, Enum, Integer, Numeric, String, delete, select, text, types
+from sqlalchemy.sql import ColumnElement
+from sqlmodel import Session, SQLModel, col
+
+from app.config import env_int, env_str
+from app.models import ArchiveResult, AssetMovement, MaintenanceRecord, MovementType
+from app.partitions import detach_movement_partitions
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_DIR = Path(env_str("APP_ARCHIVE_DIR", "archive"))
+BATCH_SIZE = env_int("APP_ARCHIVE_BATCH_SIZE", 50_000)
+
+T = TypeVar("T", bound=SQLModel)
+
+# archived model -> the date column that decides what is old
+ARCHIVED: Dict[Type[SQLModel], str] = {
+    AssetMovement: "tanggal_movement",
+    MaintenanceRecord: "tanggal_maintenance",
+}
+
+
+def _arrow_type(column_type: types.TypeEngine) -> pa.DataType:
+    match column_type:
+        case types.TypeDecorator():
+            return _arrow_type(column_type.impl_instance)
+        case Enum() | String():
+            return pa.string()
+        case Boolean():
+            return pa.bool_()
+        case Integer():
+            return pa.int64()
+        case Numeric(precision=int(precision), scale=int(scale)):
+            return pa.decimal128(precision, scale)
+        case DateTime():
+            return pa.timestamp("us")
+        case Date():
+            return pa.date32()
+        case _:
+            raise TypeError(f"No Parquet type for column type {column_type!r}")
+
+
+def _arrow_schema(model: Type[SQLModel]) -> pa.Schema:
+    table = model.__table__  # type: ignore[attr-defined]
+    return pa.schema([pa.field(c.name, _arrow_type(c.type), nullable=c.nullable) for c in table.columns])
+
+
+def _to_arrow(value: Any) -> Any:
+    # enums are archived by member name, the same way they are stored in Postgres
+    return value.name if isinstance(value, enum.Enum) else value
+
+
+def table_dir(model: Type[SQLModel], directory: Path = ARCHIVE_DIR) -> Path:
+    return directory / model.__tablename__  # type: ignore[attr-defined]
+
+
+def _old_rows(model: Type[SQLModel], cutoff: date) -> ColumnElement[bool]:
+    return getattr(model, ARCHIVED[model]) < cutoff
+
+
+# inserts and deletes change the count or the id sum, updates raise the xmin sum
+_FINGERPRINT_SQL = (
+    "SELECT count(*), coalesce(sum(id), 0), coalesce(sum(xmin::text::bigint), 0) FROM {name} WHERE {column} < :cutoff"
+)
+
+
+def _fingerprint(session: Session, model: Type[SQLModel], cutoff: date) -> Tuple[int, int, int]:
+    name = model.__tablename__  # type: ignore[attr-defined]
+    statement = text(_FINGERPRINT_SQL.format(name=name, column=ARCHIVED[model]))
+    count, id_sum, xmin_sum = session.execute(statement, {"cutoff": cutoff}).one()
+    return count, id_sum, xmin_sum
+
+
+def _write_archive(session: Session, model: Type[SQLModel], cutoff: date, path: Path) -> int:
+    table = model.__table__  # type: ignore[attr-defined]
+    schema = _arrow_schema(model)
+    statement = (
+        select(table)
+        .where(_old_rows(model, cutoff))
+        .order_by(table.c[ARCHIVED[model]], table.c.id)
+        .execution_options(yield_per=BATCH_SIZE)
+    )
+    rows = 0
+    with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+        for partition in session.execute(statement).partitions():
+            columns = {name: [_to_arrow(row[i]) for row in partition] for i, name in enumerate(schema.names)}
+            writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+            rows += len(partition)
+    return rows
+
+
+def _finish_partial(session: Session, model: Type[SQLModel], partial: Path) -> None:
+    """Give its final name to a file left by a run that stopped between committing and renaming.
+
+    The delete is all or nothing, so the first archived row tells whether that run committed.
+    Files that are incomplete or whose rows are still in the table are left for an operator,
+    another run may still be writing them.
+    """
+    try:
+        first = pq.ParquetFile(partial).read_row_group(0, columns=["id"]).column("id")[0].as_py()
+    except (pa.ArrowException, OSError) as e:
+        logger.warning(f"Leaving {partial}, it cannot be read: {e}")
+        return
+    table = model.__table__  # type: ignore[attr-defined]
+    committed = session.execute(select(table.c.id).where(table.c.id == first).limit(1)).first() is None
+    session.rollback()
+    if committed:
+        logger.warning(f"Renaming {partial}, its rows were deleted by an earlier run")
+        os.replace(partial, partial.with_suffix(""))
+    else:
+        logger.warning(f"Leaving {partial}, its rows are still in {table.name}")
+
+
+def archive_table(
+    session: Session, model: Type[SQLModel], cutoff: date, directory: Path = ARCHIVE_DIR
+) -> ArchiveResult:
+    """Move the rows of one table dated before cutoff into a new Parquet file.
+
+    The file is written from one snapshot without blocking writers. Then the table is locked
+    against writes only long enough to check that the old rows did not change since the
+    snapshot and to delete them; if they did change, nothing is deleted and the file is removed.
+    Whole movement partitions before the cutoff are dropped instead of deleted. The file gets
+    its final name only after the delete has committed.
+    """
+    name = model.__tablename__  # type: ignore[attr-defined]
+    directory = table_dir(model, directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    for leftover in directory.glob("*.parquet.partial"):
+        _finish_partial(session, model, leftover)
+    path = directory / f"{name}-before-{cutoff.isoformat()}-{datetime.now():%Y%m%d%H%M%S}.parquet"
+    partial = path.with_suffix(".parquet.partial")
+
+    session.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+    snapshot = _fingerprint(session, model, cutoff)
+    rows = _write_archive(session, model, cutoff, partial) if snapshot[0] else 0
+    session.rollback()
+    if rows == 0:
+        partial.unlink(missing_ok=True)
+        return ArchiveResult(table_name=name, rows=0, path=None)
+
+    session.execute(text(f"LOCK TABLE {name} IN SHARE ROW EXCLUSIVE MODE"))
+    if _fingerprint(session, model, cutoff) != snapshot:
+        session.rollback()
+        partial.unlink()
+        logger.warning(f"Rows of {name} before {cutoff} changed while archiving, nothing archived")
+        return ArchiveResult(table_name=name, rows=0, path=None)
+    # archived movements stay counted in the movement rollups
+    session.execute(text("SET LOCAL app.archiving = 'on'"))
+    if model is AssetMovement:
+        for partition in detach_movement_partitions(session.connection(), before=cutoff):
+            session.execute(text(f"DROP TABLE {partition}"))
+    session.execute(delete(model).where(_old_rows(model, cutoff)))
+    try:
+        session.commit()
+    except Exception as e:
+        logger.error(f"Archiving {name} failed, removing {partial}: {e}")
+        partial.unlink()
+        raise
+    os.replace(partial, path)
+    logger.info(f"Archived {rows} rows of {name} to {path}")
+    return ArchiveResult(table_name=name, rows=rows, path=str(path))
+
+
+def archive_before(session: Session, cutoff: date, directory: Path = ARCHIVE_DIR) -> List[ArchiveResult]:
+    return [archive_table(session, model, cutoff, directory) for model in ARCHIVED]
+
+
+def _archive_dataset(model: Type[SQLModel], directory: Path) -> Optional[ds.Dataset]:
+    files = sorted(str(path) for path in table_dir(model, directory).glob("*.parquet"))
+    return ds.dataset(files, format="parquet", schema=_arrow_schema(model)) if files else None
+
+
+def archived_movement_counts(directory: Path = ARCHIVE_DIR) -> List[Dict[str, Any]]:
+    """Archived movements per day, location and type, counted the way the rollups count them."""
+    dataset = _archive_dataset(AssetMovement, directory)
+    if dataset is None:
+        return []
+    movements = dataset.to_table(columns=["tanggal_movement", "movement_type", "from_location_id", "to_location_id"])
+    location = pc.if_else(
+        pc.equal(movements["movement_type"], MovementType.KELUAR.name),
+        movements["from_location_id"],
+        pc.coalesce(movements["to_location_id"], movements["from_location_id"]),
+    )
+    keys = pa.table(
+        {
+            "day": pc.cast(movements["tanggal_movement"], pa.date32()),
+            "location_id": location,
+            "movement_type": movements["movement_type"],
+        }
+    )
+    counts = keys.group_by(["day", "location_id", "movement_type"]).aggregate([("day", "count")])
+    return [
+        {
+            "day": row["day"],
+            "location_id": row["location_id"],
+            "movement_type": MovementType[row["movement_type"]],
+            "movement_count": row["day_count"],
+        }
+        for row in counts.to_pylist()
+    ]
+
+
+def _archived_rows(
+    model: Type[T], directory: Path, asset_id: Optional[int], start: Optional[date], end: Optional[date]
+) -> List[Dict[str, Any]]:
+    dataset = _archive_dataset(model, directory)
+    if dataset is None:
+        return []
+    schema = dataset.schema
+    column = ARCHIVED[model]
+
+    def bound(day: date) -> Any:
+        # a plain date does not compare with a timestamp column in Arrow
+        if pa.types.is_timestamp(schema.field(column).type) and not isinstance(day, datetime):
+            return datetime.combine(day, datetime.min.time())
+        return day
+
+    conditions = []
+    if asset_id is not None:
+        conditions.append(ds.field("asset_id") == asset_id)
+    if start is not None:
+        conditions.append(ds.field(column) >= bound(start))
+    if end is not None:
+        conditions.append(ds.field(column) < bound(end))
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+    return dataset.to_table(filter=expression).to_pylist()
+
+
+def _from_archive(model: Type[T]) -> Callable[[Dict[str, Any]], T]:
+    enums = {
+        c.name: c.type.enum_class
+        for c in model.__table__.columns  # type: ignore[attr-defined]
+        if isinstance(c.type, Enum) and c.type.enum_class is not None
+    }
+
+    def build(row: Dict[str, Any]) -> T:
+        for name, enum_class in enums.items():
+            if row[name] is not None:
+                row[name] = enum_class[row[name]]
+        return model(**row)
+
+    return build
+
+
+def history(
+    session: Session,
+    model: Type[T],
+    asset_id: Optional[int] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    directory: Path = ARCHIVE_DIR,
+) -> List[T]:
+    """Rows of an archived table from the hot table and the archive, newest first.
+
+    start is inclusive and end exclusive. Archived rows are detached objects, not attached to the session.
+    """
+    column = ARCHIVED[model]
+    statement = select(model)
+    if asset_id is not None:
+        statement = statement.where(col(getattr(model, "asset_id")) == asset_id)
+    if start is not None:
+        statement = statement.where(getattr(model, column) >= start)
+    if end is not None:
+        statement = statement.where(getattr(model, column) < end)
+    hot = list(session.scalars(statement))
+    build = _from_archive(model)
+    archived = [build(row) for row in _archived_rows(model, directory, asset_id, start, end)]
+    return sorted(hot + archived, key=lambda row: (getattr(row, column), row.id), reverse=True)  # type: ignore[attr-defined]
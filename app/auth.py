@@ -0,0 +1,25 @@
+"""The signed-in user of an API request.
+
+ui.run() with a storage_secret puts a signed session cookie on every browser. Signing in stores
+the user's id in that session under USER_ID_KEY; endpoints that write on behalf of a user take
+it from there through `current_user_id`, never from a parameter the client chooses.
+"""
+
+from fastapi import HTTPException, Request
+
+from app.database import get_session
+from app.models import User
+
+USER_ID_KEY = "user_id"
+
+
+def current_user_id(request: Request) -> int:
+    """FastAPI dependency: the id of the signed-in, active user. 401 without one."""
+    user_id = request.session.get(USER_ID_KEY) if "session" in request.scope else None
+    if user_id is None:
+        raise HTTPException(status_code=401, detail="Silakan masuk terlebih dahulu")
+    with get_session() as session:
+        user = session.get(User, user_id)
+    if user is None or not user.is_active:
+        raise HTTPException(status_code=401, detail="Pengguna tidak aktif")
+    return user_id
@@ -0,0 +1,26 @@
+"""Helpers for reading typed settings from environment variables."""
+
+import os
+from typing import Mapping
+
+_TRUTHY = {"1", "true", "yes", "on"}
+
+
+def env_str(name: str, default: str, env: Mapping[str, str] = os.environ) -> str:
+    value = env.get(name)
+    return default if value is None or value.strip() == "" else value.strip()
+
+
+def env_int(name: str, default: int, env: Mapping[str, str] = os.environ) -> int:
+    value = env.get(name)
+    return default if value is None or value.strip() == "" else int(value)
+
+
+def env_float(name: str, default: float, env: Mapping[str, str] = os.environ) -> float:
+    value = env.get(name)
+    return default if value is None or value.strip() == "" else float(value)
+
+
+def env_bool(name: str, default: bool, env: Mapping[str, str] = os.environ) -> bool:
+    value = env.get(name)
+    return default if value is None or value.strip() == "" else value.strip().lower() in _TRUTHY
@@ -0,0 +1,131 @@
+"""Connection pool configuration and instrumentation for the SQLAlchemy engines."""
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Mapping, Optional
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+from app.config import env_bool, env_float, env_int
+from app.models import PoolStats
+
+
+@dataclass(frozen=True)
+class PoolConfig:
+    """Pool sizing, defaults match SQLAlchemy's QueuePool."""
+
+    size: int = 5
+    max_overflow: int = 10
+    pre_ping: bool = False
+    recycle: int = -1
+    timeout: float = 30.0
+
+    @classmethod
+    def from_env(cls, prefix: str = "APP_DB_", env: Mapping[str, str] = os.environ) -> "PoolConfig":
+        defaults = cls()
+        return cls(
+            size=env_int(f"{prefix}POOL_SIZE", defaults.size, env),
+            max_overflow=env_int(f"{prefix}MAX_OVERFLOW", defaults.max_overflow, env),
+            pre_ping=env_bool(f"{prefix}POOL_PRE_PING", defaults.pre_ping, env),
+            recycle=env_int(f"{prefix}POOL_RECYCLE", defaults.recycle, env),
+            timeout=env_float(f"{prefix}POOL_TIMEOUT", defaults.timeout, env),
+        )
+
+    def engine_kwargs(self, poolclass: type[Pool]) -> Dict[str, Any]:
+        return {
+            "poolclass": poolclass,
+            "pool_size": self.size,
+            "max_overflow": self.max_overflow,
+            "pool_pre_ping": self.pre_ping,
+            "pool_recycle": self.recycle,
+            "pool_timeout": self.timeout,
+        }
+
+
+class PoolMetrics:
+    """Cumulative checkout counters; gauges are read live from the pool in snapshot()."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts_total = 0
+        self.timeouts_total = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_checkout(self, waited: float) -> None:
+        with self._lock:
+            self.checkouts_total += 1
+            self.wait_seconds_total += waited
+            if waited > self.wait_seconds_max:
+                self.wait_seconds_max = waited
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts_total += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self.checkouts_total = 0
+            self.timeouts_total = 0
+            self.wait_seconds_total = 0.0
+            self.wait_seconds_max = 0.0
+
+    def snapshot(self, pool: Pool) -> PoolStats:
+        size = checked_out = checked_in = overflow = 0
+        if isinstance(pool, QueuePool):
+            size, checked_out, checked_in = pool.size(), pool.checkedout(), pool.checkedin()
+            # overflow() starts at -size and only counts connections opened beyond pool_size once positive
+            overflow = max(pool.overflow(), 0)
+        with self._lock:
+            return PoolStats(
+                pool_size=size,
+                checked_out=checked_out,
+                checked_in=checked_in,
+                overflow=overflow,
+                checkouts_total=self.checkouts_total,
+                timeouts_total=self.timeouts_total,
+                wait_seconds_total=self.wait_seconds_total,
+                wait_seconds_max=self.wait_seconds_max,
+            )
+
+
+class _InstrumentedPoolMixin:
+    metrics: PoolMetrics
+
+    def __init__(self, *args: Any, metrics: Optional[PoolMetrics] = None, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.metrics = metrics if metrics is not None else PoolMetrics()
+
+    def recreate(self) -> Any:
+        # engine.dispose() swaps in a fresh pool, keep counting into the same metrics
+        pool = super().recreate()  # type: ignore[misc]
+        pool.metrics = self.metrics
+        return pool
+
+    def connect(self) -> Any:
+        start = time.perf_counter()
+        try:
+            connection = super().connect()  # type: ignore[misc]
+        except exc.TimeoutError:
+            self.metrics.record_timeout()
+            raise
+        self.metrics.record_checkout(time.perf_counter() - start)
+        return connection
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def get_pool_stats(pool: Pool) -> PoolStats:
+    metrics = getattr(pool, "metrics", None)
+    if metrics is None:
+        metrics = PoolMetrics()
+    return metrics.snapshot(pool)
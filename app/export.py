@@ -0,0 +1,197 @@
+"""Constant-memory export of the asset register as CSV, XLSX or JSON Lines.
+
+Rows come from a server-side cursor in chunks of EXPORT_CHUNK_SIZE and are encoded chunk by
+chunk, so memory does not grow with the size of the register. The columns are a superset of
+the import columns, so an export can be loaded again with app.importer.
+"""
+
+import csv
+import io
+import json
+import tempfile
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Dict, Iterator, List, Sequence
+
+from openpyxl import Workbook
+from sqlalchemy import Row, func
+from sqlalchemy.sql import Select
+from sqlmodel import Session, col, select
+
+from app.config import env_int
+from app.database import get_read_session, get_session
+from app.models import Asset, AssetCategory, Location, Room
+from app.workloads import Workload
+
+EXPORT_CHUNK_SIZE = env_int("APP_EXPORT_CHUNK_SIZE", 2_000)
+
+# a worksheet holds 1,048,576 rows and the header takes one
+XLSX_MAX_ROWS = 1_048_575
+
+EXPORT_FORMATS: Dict[str, str] = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "jsonl": "application/x-ndjson",
+}
+
+EXPORT_COLUMNS = [
+    "kode",
+    "barcode",
+    "nomor_aset",
+    "nama_barang",
+    "merk_tipe",
+    "kode_barang",
+    "tahun_anggaran",
+    "rupiah_satuan",
+    "tanggal_perolehan",
+    "kode_lokasi",
+    "nama_lokasi",
+    "nama_ruang",
+    "pemegang_barang",
+    "kondisi_barang",
+    "kode_kategori",
+    "nama_kategori",
+    "gambar",
+    "keterangan",
+    "spesifikasi",
+    "is_active",
+]
+
+
+def export_statement(include_inactive: bool = False) -> Select:
+    statement = (
+        select(
+            Asset.kode,
+            Asset.barcode,
+            Asset.nomor_aset,
+            Asset.nama_barang,
+            Asset.merk_tipe,
+            Asset.kode_barang,
+            Asset.tahun_anggaran,
+            Asset.rupiah_satuan,
+            Asset.tanggal_perolehan,
+            Location.kode_lokasi,
+            Location.nama_lokasi,
+            Room.nama_ruang,
+            Asset.pemegang_barang,
+            Asset.kondisi_barang,
+            AssetCategory.kode_kategori,
+            AssetCategory.nama_kategori,
+            Asset.gambar,
+            Asset.keterangan,
+            Asset.spesifikasi,
+            Asset.is_active,
+        )
+        .join(Location, col(Location.id) == Asset.location_id)
+        .outerjoin(Room, col(Room.id) == Asset.room_id)
+        .outerjoin(AssetCategory, col(AssetCategory.id) == Asset.category_id)
+        # primary key order lets the cursor stream from the index without a sort
+        .order_by(col(Asset.id))
+    )
+    if not include_inactive:
+        statement = statement.where(col(Asset.is_active))
+    return statement
+
+
+def _plain(value: Any) -> Any:
+    match value:
+        case Enum():
+            return value.value
+        case Decimal():
+            return str(value)
+        case datetime() | date():
+            return value.isoformat()
+        case dict():
+            return json.dumps(value, ensure_ascii=False)
+        case _:
+            return value
+
+
+def _cell(value: Any) -> Any:
+    # numbers and dates stay typed in a spreadsheet
+    match value:
+        case Enum():
+            return value.value
+        case dict():
+            return json.dumps(value, ensure_ascii=False)
+        case _:
+            return value
+
+
+def _open_session(primary: bool) -> Session:
+    return (get_session if primary else get_read_session)(Workload.REPORT)
+
+
+def export_row_count(include_inactive: bool = False, primary: bool = False) -> int:
+    """Number of rows an export would have, to refuse an XLSX export before streaming it."""
+    statement = select(func.count()).select_from(export_statement(include_inactive).order_by(None).subquery())
+    with _open_session(primary) as session:
+        return session.exec(statement).one()
+
+
+def iter_chunks(session: Session, include_inactive: bool = False) -> Iterator[Sequence[Row]]:
+    statement = export_statement(include_inactive).execution_options(yield_per=EXPORT_CHUNK_SIZE)
+    yield from session.execute(statement).partitions()
+
+
+def csv_chunks(chunks: Iterator[Sequence[Row]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # byte order mark so Excel opens the file as UTF-8
+    buffer.write("\ufeff")
+    writer.writerow(EXPORT_COLUMNS)
+    for chunk in chunks:
+        writer.writerows([_plain(value) for value in row] for row in chunk)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def jsonl_chunks(chunks: Iterator[Sequence[Row]]) -> Iterator[bytes]:
+    for chunk in chunks:
+        lines: List[str] = []
+        for row in chunk:
+            record = {name: _plain(value) for name, value in zip(EXPORT_COLUMNS, row)}
+            # spesifikasi stays a JSON object here instead of an encoded string
+            record["spesifikasi"] = row.spesifikasi
+            lines.append(json.dumps(record, ensure_ascii=False, default=str))
+        yield ("\n".join(lines) + "\n").encode()
+
+
+def xlsx_chunks(
+    chunks: Iterator[Sequence[Row]], read_size: int = 1 << 16, max_rows: int = XLSX_MAX_ROWS
+) -> Iterator[bytes]:
+    """XLSX is a zip archive that is only complete once written, so rows go through a temporary file.
+
+    The write-only workbook keeps rows on disk, not in memory; the finished file is then streamed.
+    Raises ValueError past `max_rows`, which Excel would cut off without a word.
+    """
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Aset")
+    sheet.append(EXPORT_COLUMNS)
+    rows = 0
+    for chunk in chunks:
+        rows += len(chunk)
+        if rows > max_rows:
+            raise ValueError(f"XLSX holds at most {max_rows} rows per sheet, export as CSV or JSON Lines instead")
+        for row in chunk:
+            sheet.append([_cell(value) for value in row])
+    with tempfile.TemporaryFile() as file:
+        workbook.save(file)
+        file.seek(0)
+        while data := file.read(read_size):
+            yield data
+
+
+def stream_export(export_format: str, include_inactive: bool = False, primary: bool = False) -> Iterator[bytes]:
+    """Encoded export of the register; the session lives exactly as long as the iteration.
+
+    `primary` skips the replica, for exports that carry an ETag.
+    """
+    encoders = {"csv": csv_chunks, "xlsx": xlsx_chunks, "jsonl": jsonl_chunks}
+    encode = encoders[export_format]
+    with _open_session(primary) as session:
+        yield from encode(iter_chunks(session, include_inactive))
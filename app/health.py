@@ -0,0 +1,155 @@
+"""Readiness from a background database probe.
+
+The probe runs every APP_READINESS_INTERVAL seconds on its own asyncpg connections, outside the
+application pools, and /ready only returns the cached result. Health checks therefore never
+open connections or wait for a pool. The instance is ready when the primary answered the last
+probe and no pool is saturated. Replica lag is only reported, because reads fall back to the
+primary when the replica lags; the probe also hands each lag measurement to the replica router.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, List, Optional
+
+import asyncpg
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.config import env_float
+from app.database import DATABASE_URL, POOL_CONFIG, REPLICA_DATABASE_URL, REPLICA_ROUTER, pool_stats
+from app.models import PoolStats, ReadinessReport
+from app.replica import REPLICA_LAG_SQL, ReplicaRouter
+
+logger = logging.getLogger(__name__)
+
+READINESS_INTERVAL = env_float("APP_READINESS_INTERVAL", 2.0)
+READINESS_TIMEOUT = env_float("APP_READINESS_TIMEOUT", 1.0)
+# a pool with this share of its connections checked out makes the instance unready
+MAX_POOL_SATURATION = env_float("APP_READINESS_MAX_POOL_SATURATION", 0.9)
+
+
+def pool_saturation(stats: Dict[str, PoolStats], max_overflow: int) -> Dict[str, float]:
+    return {
+        name: pool.checked_out / (pool.pool_size + max_overflow)
+        for name, pool in stats.items()
+        if pool.pool_size + max_overflow > 0
+    }
+
+
+class ReadinessProbe:
+    def __init__(
+        self,
+        dsn: str,
+        replica_dsn: Optional[str] = None,
+        interval: float = READINESS_INTERVAL,
+        timeout: float = READINESS_TIMEOUT,
+        max_saturation: float = MAX_POOL_SATURATION,
+        stats: Callable[[], Dict[str, PoolStats]] = pool_stats,
+        max_overflow: int = POOL_CONFIG.max_overflow,
+        replica_router: Optional[ReplicaRouter] = None,
+    ) -> None:
+        self.dsn = dsn
+        self.replica_dsn = replica_dsn
+        self.interval = interval
+        self.timeout = timeout
+        self.max_saturation = max_saturation
+        self.stats = stats
+        self.max_overflow = max_overflow
+        self.replica_router = replica_router
+        self._connections: Dict[str, asyncpg.Connection] = {}
+        self._report: Optional[ReadinessReport] = None
+        self._checked_at = float("-inf")
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run(), name="readiness-probe")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                logger.debug("Readiness probe stopped")
+            self._task = None
+        for conn in self._connections.values():
+            await conn.close()
+        self._connections.clear()
+
+    async def _fetch(self, dsn: str, sql: str) -> Optional[float]:
+        """One value from `dsn` over the probe's own connection, or None when the database does not answer."""
+        try:
+            conn = self._connections.get(dsn)
+            if conn is None or conn.is_closed():
+                conn = await asyncpg.connect(dsn, timeout=self.timeout)
+                self._connections[dsn] = conn
+            return float(await conn.fetchval(sql, timeout=self.timeout))
+        except (OSError, asyncio.TimeoutError, asyncpg.PostgresError, asyncpg.InterfaceError) as e:
+            logger.warning(f"Readiness probe query failed: {e}")
+            conn = self._connections.pop(dsn, None)
+            if conn is not None:
+                conn.terminate()
+            return None
+
+    async def check(self) -> ReadinessReport:
+        problems: List[str] = []
+        started = time.perf_counter()
+        database_ok = await self._fetch(self.dsn, "SELECT 1") is not None
+        latency_ms = (time.perf_counter() - started) * 1000 if database_ok else None
+        if not database_ok:
+            problems.append("database unreachable")
+
+        saturation = pool_saturation(self.stats(), self.max_overflow)
+        for name, share in saturation.items():
+            if share >= self.max_saturation:
+                problems.append(f"pool {name} saturated ({share:.0%})")
+
+        lag: Optional[float] = None
+        if self.replica_dsn is not None:
+            lag = await self._fetch(self.replica_dsn, REPLICA_LAG_SQL.text)
+            if self.replica_router is not None:
+                self.replica_router.record(lag)
+        return ReadinessReport(
+            ready=not problems,
+            database_ok=database_ok,
+            database_latency_ms=latency_ms,
+            pool_saturation=saturation,
+            replica_lag_seconds=lag,
+            problems=problems,
+        )
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                self._report = await self.check()
+            except Exception as e:
+                # an unexpected error must not end the probe, /ready would then only ever report a stale result
+                logger.exception("Readiness probe failed")
+                self._report = ReadinessReport(ready=False, database_ok=False, problems=[f"probe failed: {e}"])
+            self._checked_at = time.monotonic()
+            await asyncio.sleep(self.interval)
+
+    def report(self) -> ReadinessReport:
+        """The last probe result; unready when there is none or it is older than three intervals."""
+        age = time.monotonic() - self._checked_at
+        if self._report is None:
+            return ReadinessReport(ready=False, database_ok=False, problems=["no probe result yet"])
+        report = self._report.model_copy(update={"checked_seconds_ago": round(age, 3)})
+        if age > 3 * self.interval:
+            report.ready = False
+            report.problems = [*report.problems, "probe result is stale"]
+        return report
+
+
+READINESS_PROBE = ReadinessProbe(DATABASE_URL, REPLICA_DATABASE_URL, replica_router=REPLICA_ROUTER)
+
+router = APIRouter()
+
+
+@router.get("/ready", response_model=ReadinessReport)
+async def ready():
+    """503 tells the load balancer to send traffic elsewhere; the body says why."""
+    report = READINESS_PROBE.report()
+    return JSONResponse(report.model_dump(), status_code=200 if report.ready else 503)
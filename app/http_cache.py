@@ -0,0 +1,91 @@
+"""ETags for read endpoints, driven by per-table change counters.
+
+The counters live in process and advance on every row change the listener delivers, so an
+unchanged list is answered with 304 before any session is opened. Notifications missed while
+the listener is down would leave stale validators, so a reconnect starts a new epoch and no
+validators are issued at all while it is disconnected. There is no Last-Modified: HTTP dates
+have whole seconds, and two changes within one second would share a date.
+
+The counters follow the primary, so a response that carries validators must be read from the
+primary too; a lagging replica would pair old rows with a new ETag.
+"""
+
+import threading
+import uuid
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence
+
+from fastapi import HTTPException, Request, Response
+
+from app.notify import CHANGE_LISTENER, WATCHED_TABLES, ChangeEvent, ChangeListener
+
+
+@dataclass(frozen=True)
+class Validators:
+    etag: str
+
+    def headers(self) -> Dict[str, str]:
+        # no-cache: clients may store the response but must revalidate it on every use
+        return {"ETag": self.etag, "Cache-Control": "no-cache"}
+
+    def matches(self, request: Request) -> bool:
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is None:
+            return False
+        # weak comparison, as a compressed and an identity response share the validator
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or self.etag.removeprefix("W/") in tags
+
+
+class TableVersions:
+    def __init__(self, listener: ChangeListener) -> None:
+        self.listener = listener
+        self._lock = threading.Lock()
+        self._reset_locked()
+        for table in WATCHED_TABLES:
+            listener.subscribe(table, self._on_change)
+        listener.on_reset(self.reset)
+
+    def _reset_locked(self) -> None:
+        self._epoch = uuid.uuid4().hex[:12]
+        self._versions: Dict[str, int] = {}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._reset_locked()
+
+    def _on_change(self, event: ChangeEvent) -> None:
+        with self._lock:
+            self._versions[event.table] = self._versions.get(event.table, 0) + 1
+
+    def validators(self, tables: Sequence[str]) -> Optional[Validators]:
+        """Validators of a response built from `tables`, or None while changes may go unnoticed."""
+        if not self.listener.connected:
+            return None
+        with self._lock:
+            versions = ".".join(str(self._versions.get(table, 0)) for table in tables)
+            return Validators(etag=f'W/"{self._epoch}-{versions}"')
+
+
+TABLE_VERSIONS = TableVersions(CHANGE_LISTENER)
+
+
+class ConditionalGet:
+    """FastAPI dependency: answer 304 when nothing in `tables` changed since the client's copy.
+
+    Otherwise it returns the validators, and sets them on the response for endpoints that return models.
+    Endpoints read from the primary when validators were returned and may use the replica otherwise.
+    """
+
+    def __init__(self, *tables: str, versions: TableVersions = TABLE_VERSIONS) -> None:
+        self.tables = tables
+        self.versions = versions
+
+    def __call__(self, request: Request, response: Response) -> Optional[Validators]:
+        validators = self.versions.validators(self.tables)
+        if validators is None:
+            return None
+        if validators.matches(request):
+            raise HTTPException(status_code=304, headers=validators.headers())
+        response.headers.update(validators.headers())
+        return validators
@@ -0,0 +1,263 @@
+"""Bulk import of the asset register from CSV or XLSX.
+
+Rows are read one at a time, validated against AssetCreate in batches and copied into a
+temporary staging table with COPY. One INSERT ... SELECT then merges the staging table into
+assets. Invalid rows and rows that clash with existing assets are reported by row number;
+they never abort the rest of the load.
+"""
+
+import csv
+import io
+import json
+import logging
+from datetime import date, datetime
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Set, Tuple
+
+from openpyxl import load_workbook
+from pydantic import ValidationError
+from sqlalchemy import text
+from sqlmodel import Session
+
+from app.config import env_int
+from app.models import AssetCreate, ImportReport, ImportRowError
+from app.reference import REFERENCE_CACHE, ReferenceData
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = env_int("APP_IMPORT_BATCH_SIZE", 5_000)
+
+# columns of an import file; locations, rooms and categories are given by code or name
+IMPORT_COLUMNS = [
+    "kode",
+    "barcode",
+    "nomor_aset",
+    "nama_barang",
+    "merk_tipe",
+    "kode_barang",
+    "tahun_anggaran",
+    "rupiah_satuan",
+    "tanggal_perolehan",
+    "kode_lokasi",
+    "nama_ruang",
+    "pemegang_barang",
+    "kondisi_barang",
+    "kode_kategori",
+    "gambar",
+    "keterangan",
+    "spesifikasi",
+]
+
+_STAGED_COLUMNS = [
+    "kode",
+    "barcode",
+    "nomor_aset",
+    "nama_barang",
+    "merk_tipe",
+    "kode_barang",
+    "tahun_anggaran",
+    "rupiah_satuan",
+    "tanggal_perolehan",
+    "location_id",
+    "room_id",
+    "pemegang_barang",
+    "kondisi_barang",
+    "category_id",
+    "gambar",
+    "keterangan",
+    "spesifikasi",
+]
+_UNIQUE_COLUMNS = ["kode", "barcode", "nomor_aset"]
+_FILE_COLUMN_OF = {"location_id": "kode_lokasi", "room_id": "nama_ruang", "category_id": "kode_kategori"}
+
+
+def _cell(value: Any) -> Optional[str]:
+    """Normalise a CSV or XLSX cell to the text AssetCreate parses; empty cells become None."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    text_value = str(value).strip()
+    return text_value or None
+
+
+def _csv_rows(file: BinaryIO) -> Iterator[List[Any]]:
+    # utf-8-sig drops the byte order mark Excel puts in front of CSV exports
+    yield from csv.reader(io.TextIOWrapper(file, encoding="utf-8-sig", newline=""))
+
+
+def _xlsx_rows(file: BinaryIO) -> Iterator[List[Any]]:
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        for row in workbook.worksheets[0].iter_rows(values_only=True):
+            yield list(row)
+    finally:
+        workbook.close()
+
+
+def read_rows(file: BinaryIO, filename: str) -> Iterator[Tuple[int, Dict[str, Optional[str]]]]:
+    """Yield (row number, cells by column) for every data row; the first row is the header."""
+    rows = _xlsx_rows(file) if filename.lower().endswith(".xlsx") else _csv_rows(file)
+    header = [(_cell(name) or "").lower() for name in next(rows, [])]
+    for number, row in enumerate(rows, start=2):
+        cells = {name: _cell(value) for name, value in zip(header, row) if name}
+        if any(cells.values()):
+            yield number, cells
+
+
+class ReferenceMaps:
+    """Codes and names of locations, rooms and categories to ids, from the reference data snapshot."""
+
+    def __init__(self, data: ReferenceData) -> None:
+        self.locations = data.location_ids_by_code
+        self.categories = data.category_ids_by_code
+        self.rooms = data.room_ids_by_name
+
+    def resolve(self, number: int, cells: Dict[str, Optional[str]], errors: List[ImportRowError]) -> Dict[str, Any]:
+        values: Dict[str, Any] = {k: v for k, v in cells.items() if v is not None and k in IMPORT_COLUMNS}
+        kode_lokasi = values.pop("kode_lokasi", None)
+        nama_ruang = values.pop("nama_ruang", None)
+        kode_kategori = values.pop("kode_kategori", None)
+        if kode_lokasi is not None:
+            values["location_id"] = self.locations.get(kode_lokasi)
+            if values["location_id"] is None:
+                errors.append(
+                    ImportRowError(row=number, field="kode_lokasi", message=f"Lokasi '{kode_lokasi}' tidak ditemukan")
+                )
+            elif nama_ruang is not None:
+                values["room_id"] = self.rooms.get((values["location_id"], nama_ruang.lower()))
+                if values["room_id"] is None:
+                    errors.append(
+                        ImportRowError(row=number, field="nama_ruang", message=f"Ruang '{nama_ruang}' tidak ditemukan")
+                    )
+        if kode_kategori is not None:
+            values["category_id"] = self.categories.get(kode_kategori)
+            if values["category_id"] is None:
+                errors.append(
+                    ImportRowError(
+                        row=number, field="kode_kategori", message=f"Kategori '{kode_kategori}' tidak ditemukan"
+                    )
+                )
+        if "kondisi_barang" in values:
+            # accept "Rusak Ringan" as well as the enum value "rusak_ringan"
+            values["kondisi_barang"] = values["kondisi_barang"].lower().replace(" ", "_")
+        if "spesifikasi" in values:
+            try:
+                values["spesifikasi"] = json.loads(values["spesifikasi"])
+            except ValueError as e:
+                logger.debug(f"Import row {number}: spesifikasi is not JSON: {e}")
+                errors.append(
+                    ImportRowError(row=number, field="spesifikasi", message="Spesifikasi bukan JSON yang valid")
+                )
+                del values["spesifikasi"]
+        return values
+
+
+def _validate(
+    number: int, values: Dict[str, Any], seen: Dict[str, Set[str]], errors: List[ImportRowError]
+) -> Optional[AssetCreate]:
+    try:
+        asset = AssetCreate.model_validate(values)
+    except ValidationError as e:
+        logger.debug(f"Import row {number} failed validation: {e}")
+        for error in e.errors():
+            field = ".".join(str(part) for part in error["loc"]) or None
+            field = _FILE_COLUMN_OF.get(field or "", field)
+            errors.append(ImportRowError(row=number, field=field, message=error["msg"]))
+        return None
+    for column in _UNIQUE_COLUMNS:
+        value = getattr(asset, column)
+        if value is None:
+            continue
+        if value in seen[column]:
+            errors.append(
+                ImportRowError(row=number, field=column, message=f"'{value}' muncul lebih dari sekali dalam file")
+            )
+            return None
+    for column in _UNIQUE_COLUMNS:
+        if getattr(asset, column) is not None:
+            seen[column].add(getattr(asset, column))
+    return asset
+
+
+def _copy_batch(session: Session, batch: List[Tuple[int, AssetCreate]]) -> None:
+    buffer = io.StringIO()
+    # quoted empty strings stay empty strings, unquoted empty fields are NULL to COPY
+    writer = csv.writer(buffer, quoting=csv.QUOTE_NOTNULL)
+    for number, asset in batch:
+        row: List[Any] = [number]
+        for column in _STAGED_COLUMNS:
+            value = getattr(asset, column)
+            match column:
+                case "kondisi_barang":
+                    value = value.name
+                case "spesifikasi":
+                    value = json.dumps(value)
+            row.append(value)
+        writer.writerow(row)
+    buffer.seek(0)
+    dbapi_connection = session.connection().connection.driver_connection
+    with dbapi_connection.cursor() as cursor:  # type: ignore[union-attr]
+        cursor.copy_expert(
+            f"COPY asset_import_staging (source_row, {', '.join(_STAGED_COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buffer
+        )
+
+
+def _merge(session: Session, user_id: int) -> Set[int]:
+    """Insert the staged rows that clash with no existing asset; returns the source rows inserted."""
+    columns = ", ".join(_STAGED_COLUMNS)
+    inserted = session.execute(
+        text(
+            f"WITH inserted AS ("
+            f" INSERT INTO assets ({columns}, is_active, created_at, updated_at, created_by, updated_by)"
+            f" SELECT {columns}, true, timezone('utc', now()), timezone('utc', now()), :user_id, :user_id"
+            f" FROM asset_import_staging ORDER BY source_row"
+            f" ON CONFLICT DO NOTHING RETURNING kode)"
+            f" SELECT s.source_row FROM asset_import_staging s JOIN inserted USING (kode)"
+        ),
+        {"user_id": user_id},
+    ).scalars()
+    return set(inserted)
+
+
+def import_assets(session: Session, file: BinaryIO, filename: str, user_id: int) -> ImportReport:
+    """Load an asset register file. Commits the valid rows; everything else is in the report's errors."""
+    errors: List[ImportRowError] = []
+    refs = ReferenceMaps(REFERENCE_CACHE.get(session))
+    seen: Dict[str, Set[str]] = {column: set() for column in _UNIQUE_COLUMNS}
+    session.execute(
+        text(
+            f"CREATE TEMP TABLE asset_import_staging ON COMMIT DROP AS "
+            f"SELECT 0 AS source_row, {', '.join(_STAGED_COLUMNS)} FROM assets WITH NO DATA"
+        )
+    )
+
+    rows_read = 0
+    staged: Dict[int, str] = {}
+    batch: List[Tuple[int, AssetCreate]] = []
+    for number, cells in read_rows(file, filename):
+        rows_read += 1
+        row_errors: List[ImportRowError] = []
+        values = refs.resolve(number, cells, row_errors)
+        asset = None if row_errors else _validate(number, values, seen, row_errors)
+        errors.extend(row_errors)
+        if asset is not None:
+            batch.append((number, asset))
+            staged[number] = asset.kode
+        if len(batch) >= BATCH_SIZE:
+            _copy_batch(session, batch)
+            batch = []
+    if batch:
+        _copy_batch(session, batch)
+
+    inserted = _merge(session, user_id) if staged else set()
+    for number in sorted(set(staged) - inserted):
+        message = f"Aset dengan kode '{staged[number]}' atau nomor aset/barcode yang sama sudah ada"
+        errors.append(ImportRowError(row=number, field=None, message=message))
+    session.commit()
+    errors.sort(key=lambda error: error.row)
+    logger.info(f"Imported {len(inserted)} of {rows_read} asset rows from {filename}, {len(errors)} errors")
+    return ImportReport(rows_read=rows_read, rows_imported=len(inserted), errors=errors)
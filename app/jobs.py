@@ -0,0 +1,100 @@
+"""Maintenance jobs, run from cron or by hand.
+
+Usage:
+    python -m app.jobs migrate
+    python -m app.jobs reconcile-counters
+    python -m app.jobs rebuild-movement-rollups
+    python -m app.jobs ensure-movement-partitions
+    python -m app.jobs archive-history --before 2020-01-01
+    python -m app.jobs import-assets --file register.xlsx --user-id 1
+"""
+
+import argparse
+import logging
+from datetime import date
+from pathlib import Path
+from typing import Callable, Dict
+
+from app.archive import archive_before
+from app.database import create_tables, get_session, migrate
+from app.importer import import_assets
+from app.partitions import install_movement_partitions
+from app.reports import rebuild_movement_rollups
+from app.summary import reconcile_location_counts
+from app.workloads import Workload
+
+logger = logging.getLogger(__name__)
+
+
+def run_migrations(args: argparse.Namespace) -> int:
+    migrate()
+    return 0
+
+
+def reconcile_counters(args: argparse.Namespace) -> int:
+    with get_session(Workload.MAINTENANCE) as session:
+        report = reconcile_location_counts(session)
+    logger.info(f"Checked {report.counters_checked} location counters, {len(report.drifts)} drifted")
+    return 1 if report.drifts else 0
+
+
+def rebuild_rollups(args: argparse.Namespace) -> int:
+    with get_session(Workload.MAINTENANCE) as session:
+        rows = rebuild_movement_rollups(session)
+    logger.info(f"Rebuilt {rows} movement rollup rows")
+    return 0
+
+
+def ensure_partitions(args: argparse.Namespace) -> int:
+    with get_session(Workload.MAINTENANCE) as session:
+        install_movement_partitions(session.connection())
+        session.commit()
+    return 0
+
+
+def archive_history(args: argparse.Namespace) -> int:
+    if args.before is None:
+        logger.error("archive-history needs --before")
+        return 2
+    with get_session(Workload.MAINTENANCE) as session:
+        for result in archive_before(session, args.before):
+            logger.info(f"{result.table_name}: archived {result.rows} rows to {result.path or '-'}")
+    return 0
+
+
+def import_file(args: argparse.Namespace) -> int:
+    if args.file is None or args.user_id is None:
+        logger.error("import-assets needs --file and --user-id")
+        return 2
+    with get_session(Workload.BULK_IMPORT) as session, args.file.open("rb") as file:
+        report = import_assets(session, file, args.file.name, args.user_id)
+    for error in report.errors:
+        logger.warning(f"row {error.row} {error.field or ''}: {error.message}")
+    return 1 if report.errors else 0
+
+
+JOBS: Dict[str, Callable[[argparse.Namespace], int]] = {
+    "migrate": run_migrations,
+    "reconcile-counters": reconcile_counters,
+    "rebuild-movement-rollups": rebuild_rollups,
+    "ensure-movement-partitions": ensure_partitions,
+    "archive-history": archive_history,
+    "import-assets": import_file,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("job", choices=sorted(JOBS))
+    parser.add_argument("--before", type=date.fromisoformat, help="cutoff date for archive-history")
+    parser.add_argument("--file", type=Path, help="CSV or XLSX file for import-assets")
+    parser.add_argument("--user-id", type=int, help="user recorded as creator of imported assets")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    create_tables()
+    raise SystemExit(JOBS[args.job](args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Named loader profiles for Asset queries.
+
+A profile eager-loads exactly the relationships a view reads: many-to-one relationships are
+joined into the same statement, collections come from one extra SELECT ... IN per relationship.
+With strict loading, every other relationship raises on access instead of quietly issuing one
+query per row. Turn it on in development with APP_STRICT_LOADING=1.
+
+The large collections (a location's or user's assets, an asset's movements) are write-only and
+never load as a whole; related_page() and related_count() read them a page at a time.
+"""
+
+from enum import Enum
+from typing import Any, List, Optional, TypeVar
+
+from sqlalchemy import func
+from sqlalchemy.orm import WriteOnlyCollection, joinedload, raiseload, selectinload
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.base import ExecutableOption
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import env_bool
+from app.models import Asset
+
+STRICT_LOADING = env_bool("APP_STRICT_LOADING", False)
+
+T = TypeVar("T")
+
+
+class LoadProfile(str, Enum):
+    LIST = "list"  # tables and pickers: names of location, room and category
+    DETAIL = "detail"  # one asset page: names, who created and changed it, maintenance history
+    AUDIT = "audit"  # change review: who created and changed it; movements are paged separately
+
+
+def _names() -> List[ExecutableOption]:
+    return [
+        joinedload(Asset.location, innerjoin=True),  # type: ignore[arg-type]
+        joinedload(Asset.room),  # type: ignore[arg-type]
+        joinedload(Asset.category),  # type: ignore[arg-type]
+    ]
+
+
+def _users() -> List[ExecutableOption]:
+    return [
+        joinedload(Asset.created_by_user, innerjoin=True),  # type: ignore[arg-type]
+        joinedload(Asset.updated_by_user, innerjoin=True),  # type: ignore[arg-type]
+    ]
+
+
+def loader_options(profile: LoadProfile, strict: Optional[bool] = None) -> List[ExecutableOption]:
+    match profile:
+        case LoadProfile.LIST:
+            options = _names()
+        case LoadProfile.DETAIL:
+            options = [*_names(), *_users(), selectinload(Asset.maintenance_records)]  # type: ignore[arg-type]
+        case LoadProfile.AUDIT:
+            options = _users()
+    if STRICT_LOADING if strict is None else strict:
+        # sql_only lets a many-to-one resolve from the identity map; only a new query raises
+        options.append(raiseload("*", sql_only=True))
+    return options
+
+
+def with_profile(statement: Select, profile: LoadProfile, strict: Optional[bool] = None) -> Select:
+    """Apply a profile to a statement selecting Asset entities."""
+    return statement.options(*loader_options(profile, strict))
+
+
+def get_asset(
+    session: Session, asset_id: int, profile: LoadProfile = LoadProfile.DETAIL, strict: Optional[bool] = None
+) -> Optional[Asset]:
+    statement = with_profile(select(Asset).where(Asset.id == asset_id), profile, strict)
+    return session.exec(statement).unique().first()  # type: ignore[call-overload]
+
+
+def related_page(
+    session: Session, collection: WriteOnlyCollection[T], *order_by: Any, limit: int = 50, offset: int = 0
+) -> List[T]:
+    """One page of a write-only collection, e.g. related_page(session, asset.movements, desc(...))."""
+    statement = collection.select().order_by(*order_by).limit(limit).offset(offset)
+    return list(session.scalars(statement).all())
+
+
+async def related_page_async(
+    session: AsyncSession, collection: WriteOnlyCollection[T], *order_by: Any, limit: int = 50, offset: int = 0
+) -> List[T]:
+    statement = collection.select().order_by(*order_by).limit(limit).offset(offset)
+    return list((await session.scalars(statement)).all())
+
+
+def related_count(session: Session, collection: WriteOnlyCollection[Any]) -> int:
+    statement = select(func.count()).select_from(collection.select().subquery())
+    return session.exec(statement).one()  # type: ignore[call-overload]
@@ -0,0 +1,218 @@
+"""Scanner lookups: barcode, kode or nomor_aset to AssetSummary through an in-process cache.
+
+The cache is only consulted while the change listener is connected, because only then do
+asset changes reliably evict entries. Otherwise every lookup is a single indexed query.
+"""
+
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import case, or_
+from sqlalchemy.sql import Select
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import env_float, env_int
+from app.models import Asset, AssetSummary, LookupStats
+from app.notify import CHANGE_LISTENER, ChangeEvent, ChangeListener
+
+
+def normalize_code(code: str) -> str:
+    # handheld scanners commonly terminate the code with CR/LF or pad it
+    return code.strip()
+
+
+def lookup_statement(code: str) -> Select:
+    """One row via the three unique indexes; a barcode match wins over kode, kode over nomor_aset."""
+    return (
+        select(
+            Asset.id,
+            Asset.kode,
+            Asset.barcode,
+            Asset.nomor_aset,
+            Asset.nama_barang,
+            Asset.merk_tipe,
+            Asset.kondisi_barang,
+            Asset.location_id,
+            Asset.room_id,
+            Asset.pemegang_barang,
+            Asset.is_active,
+        )
+        .where(or_(Asset.barcode == code, Asset.kode == code, Asset.nomor_aset == code))
+        .order_by(case((Asset.barcode == code, 0), (Asset.kode == code, 1), else_=2))
+        .limit(1)
+    )
+
+
+class LookupCache:
+    """LRU of asset summaries by the codes they were looked up with, with a TTL as a safety net.
+
+    A summary is only reachable by codes that actually resolved to it. One asset's kode can be
+    another asset's barcode, and then only the lookup query knows which of them wins.
+    """
+
+    def __init__(self, max_size: int, ttl: float) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[int, Tuple[AssetSummary, float, Set[str]]] = OrderedDict()
+        self._ids_by_code: Dict[str, int] = {}
+        # bumped on every eviction, so a row read before a concurrent change is not cached after it
+        self._generation = 0
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, code: str) -> Optional[AssetSummary]:
+        with self._lock:
+            asset_id = self._ids_by_code.get(code)
+            if asset_id is None:
+                return None
+            summary, expires_at, _ = self._entries[asset_id]
+            if expires_at < time.monotonic():
+                self._drop_locked(asset_id)
+                return None
+            self._entries.move_to_end(asset_id)
+            return summary
+
+    def put(self, code: str, summary: AssetSummary, generation: int) -> None:
+        """Cache the answer of looking up `code`."""
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            if generation != self._generation:
+                return
+            owner = self._ids_by_code.get(code)
+            if owner is not None and owner != summary.id:
+                self._entries[owner][2].discard(code)
+            entry = self._entries.pop(summary.id, None)
+            codes = entry[2] if entry is not None else set()
+            codes.add(code)
+            self._entries[summary.id] = (summary, expires_at, codes)
+            self._ids_by_code[code] = summary.id
+            while len(self._entries) > self.max_size:
+                self._drop_locked(next(iter(self._entries)))
+
+    def evict(self, asset_id: int) -> None:
+        with self._lock:
+            self._generation += 1
+            self._drop_locked(asset_id)
+
+    def _drop_locked(self, asset_id: int) -> None:
+        entry = self._entries.pop(asset_id, None)
+        if entry is not None:
+            for code in entry[2]:
+                self._ids_by_code.pop(code, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._ids_by_code.clear()
+
+
+class LatencyWindow:
+    """Durations of the most recent lookups, for percentile reporting."""
+
+    def __init__(self, size: int = 10_000) -> None:
+        self._lock = threading.Lock()
+        self._samples: Deque[float] = deque(maxlen=size)
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentiles_ms(self, *quantiles: float) -> List[float]:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return [0.0 for _ in quantiles]
+        return [samples[min(int(q * len(samples)), len(samples) - 1)] * 1000 for q in quantiles]
+
+
+class AssetLookup:
+    def __init__(self, cache: LookupCache, listener: ChangeListener) -> None:
+        self.cache = cache
+        self.listener = listener
+        self.latency = LatencyWindow()
+        self.hits = 0
+        self.misses = 0
+        self.not_found = 0
+        listener.subscribe("assets", self._on_asset_change)
+        listener.on_reset(cache.clear)
+
+    def _on_asset_change(self, event: ChangeEvent) -> None:
+        if event.ids is None:
+            # a bulk statement; its ids were not sent
+            self.cache.clear()
+            return
+        for asset_id in event.ids:
+            self.cache.evict(asset_id)
+
+    def _cached(self, code: str) -> Optional[AssetSummary]:
+        if not self.listener.connected:
+            return None
+        summary = self.cache.get(code)
+        if summary is not None:
+            self.hits += 1
+        return summary
+
+    def _loaded(self, code: str, row, generation: int) -> Optional[AssetSummary]:
+        self.misses += 1
+        if row is None:
+            self.not_found += 1
+            return None
+        # columns come straight from the typed query, validation would only cost time on the hot path
+        summary = AssetSummary.model_construct(**row._mapping)
+        if self.listener.connected:
+            self.cache.put(code, summary, generation)
+        return summary
+
+    async def lookup(self, session: AsyncSession, code: str) -> Optional[AssetSummary]:
+        start = time.perf_counter()
+        code = normalize_code(code)
+        summary = self._cached(code)
+        if summary is None and code:
+            generation = self.cache.generation
+            row = (await session.execute(lookup_statement(code))).first()
+            summary = self._loaded(code, row, generation)
+        self.latency.record(time.perf_counter() - start)
+        return summary
+
+    def lookup_sync(self, session: Session, code: str) -> Optional[AssetSummary]:
+        start = time.perf_counter()
+        code = normalize_code(code)
+        summary = self._cached(code)
+        if summary is None and code:
+            generation = self.cache.generation
+            summary = self._loaded(code, session.execute(lookup_statement(code)).first(), generation)
+        self.latency.record(time.perf_counter() - start)
+        return summary
+
+    def reset_stats(self) -> None:
+        self.latency = LatencyWindow()
+        self.hits = self.misses = self.not_found = 0
+
+    def stats(self) -> LookupStats:
+        p50, p95, p99 = self.latency.percentiles_ms(0.50, 0.95, 0.99)
+        return LookupStats(
+            cache_enabled=self.listener.connected,
+            cache_size=len(self.cache),
+            hits=self.hits,
+            misses=self.misses,
+            not_found=self.not_found,
+            p50_ms=p50,
+            p95_ms=p95,
+            p99_ms=p99,
+        )
+
+
+ASSET_LOOKUP = AssetLookup(
+    LookupCache(max_size=env_int("APP_LOOKUP_CACHE_SIZE", 50_000), ttl=env_float("APP_LOOKUP_CACHE_TTL", 300.0)),
+    CHANGE_LISTENER,
+)
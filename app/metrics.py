@@ -0,0 +1,317 @@
+"""Prometheus text exposition of request, SQL, pool, client, event loop and cache metrics.
+
+Hot-path instruments are plain counters and fixed-bucket histograms behind a lock. Values
+that already exist elsewhere (pool stats, cache counters, connected clients) are read only
+when /metrics is scraped.
+"""
+
+import asyncio
+import bisect
+import contextlib
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from nicegui import Client
+from sqlalchemy import Engine, event
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import env_float
+from app.database import ASYNC_ENGINE, ASYNC_REPLICA_ENGINE, ENGINE, REPLICA_ENGINE, pool_stats
+from app.lookup import ASSET_LOOKUP
+from app.query_budget import track
+from app.reference import REFERENCE_CACHE
+
+logger = logging.getLogger(__name__)
+
+LOOP_LAG_INTERVAL = env_float("APP_METRICS_LOOP_LAG_INTERVAL", 0.5)
+
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0, 5.0)
+STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names: Sequence[str], values: Labels, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    # the shortest text that reads back as the same float; :g keeps only six digits
+    return repr(float(value))
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, labels: Labels = (), amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            values = sorted(self._values.items())
+        for labels, value in values:
+            yield f"{self.name}{_label_text(self.label_names, labels)} {_number(value)}"
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float], label_names: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        # per label set: count per bucket (the last one is +Inf), then the sum
+        self._values: Dict[Labels, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, labels: Labels = ()) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+            entry[0][index] += 1
+            entry[1][0] += value
+
+    def count(self, labels: Labels = ()) -> int:
+        with self._lock:
+            entry = self._values.get(labels)
+            return 0 if entry is None else sum(entry[0])
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            values = sorted((labels, (list(counts), total[0])) for labels, (counts, total) in self._values.items())
+        for labels, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip([*self.buckets, float("inf")], counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                yield f"{self.name}_bucket{_label_text(self.label_names, labels, f'le="{le}"')} {cumulative}"
+            yield f"{self.name}_sum{_label_text(self.label_names, labels)} {_number(total)}"
+            yield f"{self.name}_count{_label_text(self.label_names, labels)} {cumulative}"
+
+
+def _gauge(name: str, help_text: str, samples: Sequence[Tuple[str, float]]) -> Iterator[str]:
+    """A gauge read at scrape time; each sample is (rendered labels, value)."""
+    yield f"# HELP {name} {help_text}"
+    yield f"# TYPE {name} gauge"
+    for labels, value in samples:
+        yield f"{name}{labels} {_number(value)}"
+
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "app_http_request_duration_seconds",
+    "HTTP request latency until the response is complete.",
+    HTTP_BUCKETS,
+    ("method", "route", "status"),
+)
+SQL_STATEMENT_SECONDS = Histogram(
+    "app_sql_statement_duration_seconds", "SQL statement execution time.", SQL_BUCKETS, ("engine", "kind")
+)
+SQL_ERRORS = Counter("app_sql_errors_total", "SQL statements that raised.", ("engine",))
+HTTP_REQUEST_STATEMENTS = Histogram(
+    "app_http_request_sql_statements",
+    "SQL statements run while handling one HTTP request.",
+    STATEMENT_BUCKETS,
+    ("method", "route"),
+)
+HTTP_REQUEST_DB_SECONDS = Histogram(
+    "app_http_request_db_seconds", "Database time spent handling one HTTP request.", SQL_BUCKETS, ("method", "route")
+)
+EVENT_LOOP_LAG_SECONDS = Histogram(
+    "app_event_loop_lag_seconds", "How late a periodic event loop wake-up ran.", LAG_BUCKETS
+)
+
+
+def _route_label(scope: Scope, root_path: str) -> str:
+    """The route template a request matched, or "unmatched" when it matched nothing."""
+    # a Mount (static files, sub-applications) appends its prefix to root_path and sets no route
+    mounted = scope.get("root_path", "")[len(root_path) :]
+    # the router leaves the matched route in the scope, its path is relative to the mount
+    route = getattr(scope.get("route"), "path", None)
+    if route is not None:
+        return mounted + route
+    return mounted or "unmatched"
+
+
+class MetricsMiddleware:
+    """Times each HTTP request per route template, so path parameters do not multiply the series.
+
+    Each request is also a unit of work for app.query_budget, which counts its SQL statements.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        status = "500"
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        root_path = scope.get("root_path", "")
+        with track(f"{scope['method']} {scope['path']}") as unit:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                route = _route_label(scope, root_path)
+                unit.name = f"{scope['method']} {route}"
+                HTTP_REQUEST_SECONDS.observe(time.perf_counter() - start, (scope["method"], route, status))
+                HTTP_REQUEST_STATEMENTS.observe(unit.statements, (scope["method"], route))
+                HTTP_REQUEST_DB_SECONDS.observe(unit.db_seconds, (scope["method"], route))
+
+
+def _statement_kind(statement: str) -> str:
+    kind = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    return kind if kind in {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "COPY"} else "OTHER"
+
+
+def install_sql_metrics(engine: Engine, name: str) -> None:
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+        conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+        elapsed = time.perf_counter() - conn.info["metrics_started"].pop()
+        SQL_STATEMENT_SECONDS.observe(elapsed, (name, _statement_kind(statement)))
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context: Any) -> None:
+        started = context.connection.info.get("metrics_started") if context.connection is not None else None
+        if started:
+            started.pop()
+        SQL_ERRORS.inc((name,))
+
+
+install_sql_metrics(ENGINE, "primary")
+install_sql_metrics(ASYNC_ENGINE.sync_engine, "primary_async")
+if REPLICA_ENGINE is not None and ASYNC_REPLICA_ENGINE is not None:
+    install_sql_metrics(REPLICA_ENGINE, "replica")
+    install_sql_metrics(ASYNC_REPLICA_ENGINE.sync_engine, "replica_async")
+
+
+class LoopLagMonitor:
+    """Sleeps for `interval` and records how much later than that it woke up."""
+
+    def __init__(self, interval: float = LOOP_LAG_INTERVAL) -> None:
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run(), name="loop-lag-monitor")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            EVENT_LOOP_LAG_SECONDS.observe(max(time.perf_counter() - start - self.interval, 0.0))
+
+
+LOOP_LAG_MONITOR = LoopLagMonitor()
+
+
+def _scrape_time_metrics() -> Iterator[str]:
+    pools = pool_stats()
+    for field, help_text in (
+        ("pool_size", "Configured pool size."),
+        ("checked_out", "Connections currently checked out."),
+        ("overflow", "Connections open beyond the pool size."),
+    ):
+        yield from _gauge(
+            f"app_db_pool_{field}",
+            help_text,
+            [(_label_text(("pool",), (name,)), getattr(stats, field)) for name, stats in pools.items()],
+        )
+    for field, help_text in (
+        ("checkouts_total", "Connection checkouts."),
+        ("timeouts_total", "Checkouts that timed out waiting for a connection."),
+        ("wait_seconds_total", "Time spent waiting for a connection."),
+    ):
+        yield f"# HELP app_db_pool_{field} {help_text}"
+        yield f"# TYPE app_db_pool_{field} counter"
+        for name, stats in pools.items():
+            yield f"app_db_pool_{field}{_label_text(('pool',), (name,))} {_number(getattr(stats, field))}"
+
+    clients = list(Client.instances.values())
+    yield from _gauge(
+        "app_nicegui_clients",
+        "NiceGUI clients, by whether their websocket is connected.",
+        [
+            ('{connected="true"}', sum(1 for client in clients if client.has_socket_connection)),
+            ('{connected="false"}', sum(1 for client in clients if not client.has_socket_connection)),
+        ],
+    )
+
+    caches = {
+        "asset_lookup": (ASSET_LOOKUP.hits, ASSET_LOOKUP.misses),
+        "reference_data": (REFERENCE_CACHE.hits, REFERENCE_CACHE.loads),
+    }
+    for index, (field, help_text) in enumerate(
+        (("hits", "Reads answered from the cache."), ("misses", "Reads that went to the database."))
+    ):
+        yield f"# HELP app_cache_{field}_total {help_text}"
+        yield f"# TYPE app_cache_{field}_total counter"
+        for name, counts in caches.items():
+            yield f"app_cache_{field}_total{_label_text(('cache',), (name,))} {counts[index]}"
+
+
+# instruments rendered on every scrape, in this order
+COLLECTORS: List[Callable[[], Iterator[str]]] = [
+    HTTP_REQUEST_SECONDS.render,
+    HTTP_REQUEST_STATEMENTS.render,
+    HTTP_REQUEST_DB_SECONDS.render,
+    SQL_STATEMENT_SECONDS.render,
+    SQL_ERRORS.render,
+    EVENT_LOOP_LAG_SECONDS.render,
+    _scrape_time_metrics,
+]
+
+
+def render_metrics() -> str:
+    return "\n".join(line for collect in COLLECTORS for line in collect()) + "\n"
+
+
+router = APIRouter()
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
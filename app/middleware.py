@@ -0,0 +1,160 @@
+"""Pure ASGI middleware.
+
+BaseHTTPMiddleware runs every response through an extra task and a memory stream. A raw ASGI
+middleware only has to rewrite the http.response.start message, so the body, streamed or not,
+passes straight through.
+"""
+
+import re
+from typing import Dict, List, Optional, Set, Tuple
+
+import brotli
+from starlette.applications import Starlette
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipResponder, IdentityResponder
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import env_int
+
+SECURITY_HEADERS: Dict[str, str] = {
+    "X-XSS-Protection": "1; mode=block",
+    "X-Content-Type-Options": "nosniff",
+    "Referrer-Policy": "strict-origin-when-cross-origin",
+    "Content-Security-Policy": (
+        "default-src 'self' http: https: data: blob: 'unsafe-inline'; "
+        "frame-ancestors https://app.build/ https://www.app.build/ https://staging.app.build/"
+    ),
+}
+
+
+class SecurityHeadersMiddleware:
+    """Set SECURITY_HEADERS on every HTTP response, replacing any value the endpoint chose."""
+
+    def __init__(self, app: ASGIApp, headers: Optional[Dict[str, str]] = None) -> None:
+        self.app = app
+        # encoded once; ASGI header names are lower-case bytes
+        self.headers: List[Tuple[bytes, bytes]] = [
+            (name.lower().encode("latin-1"), value.encode("latin-1"))
+            for name, value in (SECURITY_HEADERS if headers is None else headers).items()
+        ]
+        self._names = frozenset(name for name, _ in self.headers)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = [header for header in message.get("headers", ()) if header[0].lower() not in self._names]
+                headers.extend(self.headers)
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+
+COMPRESSION_MINIMUM_SIZE = env_int("APP_COMPRESSION_MINIMUM_SIZE", 1024)
+GZIP_LEVEL = env_int("APP_GZIP_LEVEL", 6)
+BROTLI_QUALITY = env_int("APP_BROTLI_QUALITY", 4)
+
+# already compressed, another pass only costs CPU
+INCOMPRESSIBLE_TYPES = (
+    "image/png",
+    "image/jpeg",
+    "image/gif",
+    "image/webp",
+    "application/zip",
+    "application/gzip",
+    "application/vnd.openxmlformats",
+    "application/vnd.apache.parquet",
+    "font/woff",
+    "video/",
+    "audio/",
+)
+
+
+_REFUSED = re.compile(r"q=0(\.0{0,3})?$")
+
+
+class _SkipIncompressible(IdentityResponder):
+    async def send_with_compression(self, message: Message) -> None:
+        await super().send_with_compression(message)
+        if message["type"] == "http.response.start":
+            content_type = Headers(raw=message["headers"]).get("content-type", "")
+            self.content_type_is_excluded |= content_type.startswith(INCOMPRESSIBLE_TYPES)
+
+
+class _GZipResponder(_SkipIncompressible, GZipResponder):
+    pass
+
+
+class _BrotliResponder(_SkipIncompressible):
+    content_encoding = "br"
+
+    def __init__(self, app: ASGIApp, minimum_size: int, quality: int) -> None:
+        super().__init__(app, minimum_size)
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        if more_body:
+            # flush so a streamed export reaches the client chunk by chunk
+            return self.compressor.process(body) + self.compressor.flush()
+        return self.compressor.process(body) + self.compressor.finish()
+
+
+def accepted_encodings(accept_encoding: str) -> Set[str]:
+    """Content codings an Accept-Encoding header allows; q=0 excludes one."""
+    encodings = set()
+    for item in accept_encoding.split(","):
+        name, _, params = item.partition(";")
+        if not _REFUSED.match(params.strip()):
+            encodings.add(name.strip().lower())
+    return encodings
+
+
+class CompressionMiddleware:
+    """Brotli or gzip for responses of at least `minimum_size` bytes, whichever the client prefers by name.
+
+    Brotli wins when both are accepted. Responses that already carry a Content-Encoding, event
+    streams and INCOMPRESSIBLE_TYPES pass through unchanged. Any gzip middleware outside this one
+    would compress them anyway; see remove_middleware().
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = COMPRESSION_MINIMUM_SIZE,
+        gzip_level: int = GZIP_LEVEL,
+        brotli_quality: int = BROTLI_QUALITY,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encodings = accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        responder: ASGIApp
+        if "br" in encodings:
+            responder = _BrotliResponder(self.app, self.minimum_size, self.brotli_quality)
+        elif "gzip" in encodings:
+            responder = _GZipResponder(self.app, self.minimum_size, compresslevel=self.gzip_level)
+        else:
+            responder = self.app
+        await responder(scope, receive, send)
+
+
+def remove_middleware(app: Starlette, middleware_class: type) -> None:
+    """Take every `middleware_class` out of `app`, also once its middleware stack has been built.
+
+    ui.run() adds NiceGUI's GZipMiddleware outside all middleware of the app, after main.py has
+    run, so it can only be removed from a startup handler. By then Starlette has built the stack,
+    so it is built again.
+    """
+    app.user_middleware = [middleware for middleware in app.user_middleware if middleware.cls is not middleware_class]
+    if app.middleware_stack is not None:
+        app.middleware_stack = app.build_middleware_stack()
@@ -1,4 +1,7 @@
-from sqlmodel import SQLModel, Field, Relationship, JSON, Column
+from sqlalchemy import Computed, Index, text
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from sqlalchemy.orm import WriteOnlyMapped, relationship
+from sqlmodel import SQLModel, Field, Relationship, Column
 from datetime import datetime, date
 from typing import Optional, List, Dict, Any
 from decimal import Decimal
@@ -39,9 +42,21 @@ class User(SQLModel, table=True):
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
     # Relationships
-    created_assets: List["Asset"] = Relationship(back_populates="created_by_user")
-    updated_assets: List["Asset"] = Relationship(back_populates="updated_by_user")
-    asset_movements: List["AssetMovement"] = Relationship(back_populates="user")
+    # Collections of assets and movements can hold tens of thousands of rows, so they are write-only:
+    # add to them freely, read them through app.loading.related_page()
+    created_assets: WriteOnlyMapped["Asset"] = Relationship(
+        sa_relationship=relationship(
+            back_populates="created_by_user", foreign_keys="[Asset.created_by]", lazy="write_only", passive_deletes=True
+        )
+    )
+    updated_assets: WriteOnlyMapped["Asset"] = Relationship(
+        sa_relationship=relationship(
+            back_populates="updated_by_user", foreign_keys="[Asset.updated_by]", lazy="write_only", passive_deletes=True
+        )
+    )
+    asset_movements: WriteOnlyMapped["AssetMovement"] = Relationship(
+        sa_relationship=relationship(back_populates="user", lazy="write_only", passive_deletes=True)
+    )
 
 
 class Location(SQLModel, table=True):
@@ -55,7 +70,9 @@ class Location(SQLModel, table=True):
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
     # Relationships
-    assets: List["Asset"] = Relationship(back_populates="location")
+    assets: WriteOnlyMapped["Asset"] = Relationship(
+        sa_relationship=relationship(back_populates="location", lazy="write_only", passive_deletes=True)
+    )
     rooms: List["Room"] = Relationship(back_populates="location")
 
 
@@ -71,7 +88,9 @@ class Room(SQLModel, table=True):
 
     # Relationships
     location: Location = Relationship(back_populates="rooms")
-    assets: List["Asset"] = Relationship(back_populates="room")
+    assets: WriteOnlyMapped["Asset"] = Relationship(
+        sa_relationship=relationship(back_populates="room", lazy="write_only", passive_deletes=True)
+    )
 
 
 class AssetCategory(SQLModel, table=True):
@@ -85,11 +104,39 @@ class AssetCategory(SQLModel, table=True):
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
     # Relationships
-    assets: List["Asset"] = Relationship(back_populates="category")
+    assets: WriteOnlyMapped["Asset"] = Relationship(
+        sa_relationship=relationship(back_populates="category", lazy="write_only", passive_deletes=True)
+    )
 
 
 class Asset(SQLModel, table=True):
     __tablename__ = "assets"  # type: ignore[assignment]
+    # Most reads only look at active assets, so the filter indexes are partial on is_active.
+    # Enum columns store member names, hence 'BAIK' rather than 'baik' in predicates.
+    __table_args__ = (
+        # per-location summary: counts by condition come from the index alone
+        Index("ix_assets_location_kondisi_active", "location_id", "kondisi_barang", postgresql_where=text("is_active")),
+        # per-room list, ordered by asset code
+        Index("ix_assets_room_kode_active", "room_id", "kode", postgresql_where=text("is_active")),
+        Index("ix_assets_category_active", "category_id", postgresql_where=text("is_active")),
+        Index("ix_assets_tahun_location_active", "tahun_anggaran", "location_id", postgresql_where=text("is_active")),
+        # damaged/lost worklists are a small slice of the table
+        Index(
+            "ix_assets_kondisi_attention",
+            "kondisi_barang",
+            "location_id",
+            postgresql_where=text("is_active AND kondisi_barang <> 'BAIK'"),
+        ),
+        # keyset pagination: (sort key, id) in both directions, see app.pagination
+        Index("ix_assets_updated_id_active", "updated_at", "id", postgresql_where=text("is_active")),
+        Index(
+            "ix_assets_location_updated_active", "location_id", "updated_at", "id", postgresql_where=text("is_active")
+        ),
+        Index("ix_assets_nama_id_active", "nama_barang", "id", postgresql_where=text("is_active")),
+        Index("ix_assets_perolehan_id_active", "tanggal_perolehan", "id", postgresql_where=text("is_active")),
+        # default jsonb_ops: serves containment (@>), key existence (?) and jsonpath (@@, @?) filters
+        Index("ix_assets_spesifikasi", "spesifikasi", postgresql_using="gin"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
 
@@ -110,17 +157,20 @@ class Asset(SQLModel, table=True):
 
     # Location and assignment
     location_id: int = Field(foreign_key="locations.id")
-    room_id: Optional[int] = Field(default=None, foreign_key="rooms.id")
+    # a deleted room or category leaves its assets without one; passive_deletes on the parents relies on it
+    room_id: Optional[int] = Field(default=None, foreign_key="rooms.id", ondelete="SET NULL")
     pemegang_barang: str = Field(max_length=100, description="Nama pemegang/penanggungjawab barang")
 
     # Asset status and condition
     kondisi_barang: AssetCondition = Field(default=AssetCondition.BAIK)
-    category_id: Optional[int] = Field(default=None, foreign_key="asset_categories.id")
+    category_id: Optional[int] = Field(default=None, foreign_key="asset_categories.id", ondelete="SET NULL")
 
     # Additional information
     gambar: Optional[str] = Field(default=None, max_length=500, description="Path/URL gambar barang")
     keterangan: str = Field(default="", max_length=1000, description="Keterangan tambahan")
-    spesifikasi: Dict[str, Any] = Field(default={}, sa_column=Column(JSON), description="Spesifikasi teknis dalam JSON")
+    spesifikasi: Dict[str, Any] = Field(
+        default={}, sa_column=Column(JSONB), description="Spesifikasi teknis dalam JSON"
+    )
 
     # Audit fields
     is_active: bool = Field(default=True)
@@ -139,14 +189,40 @@ class Asset(SQLModel, table=True):
     updated_by_user: User = Relationship(
         back_populates="updated_assets", sa_relationship_kwargs={"foreign_keys": "[Asset.updated_by]"}
     )
-    movements: List["AssetMovement"] = Relationship(back_populates="asset")
+    movements: WriteOnlyMapped["AssetMovement"] = Relationship(
+        sa_relationship=relationship(back_populates="asset", lazy="write_only", passive_deletes=True)
+    )
     maintenance_records: List["MaintenanceRecord"] = Relationship(back_populates="asset")
 
 
+# Full-text search document over the free-text asset fields, maintained by Postgres as a stored
+# generated column. It is not a mapped field so loading Asset rows never pulls it in.
+ASSET_SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple'::regconfig, coalesce(nama_barang, '')), 'A') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(merk_tipe, '')), 'B') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(pemegang_barang, '')), 'C') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(keterangan, '')), 'D')"
+)
+Asset.__table__.append_column(  # type: ignore[attr-defined]
+    Column("search_vector", TSVECTOR, Computed(ASSET_SEARCH_VECTOR_SQL, persisted=True), nullable=True)
+)
+Index("ix_assets_search_vector", Asset.__table__.c.search_vector, postgresql_using="gin")  # type: ignore[attr-defined]
+
+
 class AssetMovement(SQLModel, table=True):
     __tablename__ = "asset_movements"  # type: ignore[assignment]
+    __table_args__ = (
+        # movement history of one asset, newest first
+        Index("ix_asset_movements_asset_tanggal", "asset_id", "tanggal_movement"),
+        # period reports grouped by type
+        Index("ix_asset_movements_tanggal_type", "tanggal_movement", "movement_type"),
+        # monthly partitions are managed by app.partitions
+        {"postgresql_partition_by": "RANGE (tanggal_movement)"},
+    )
 
-    id: Optional[int] = Field(default=None, primary_key=True)
+    # the partition key has to be part of the primary key, so the identity is (id, tanggal_movement):
+    # session.get(AssetMovement, id) raises, use session.get(AssetMovement, (id, tanggal_movement)) or a select by id
+    id: Optional[int] = Field(default=None, primary_key=True, sa_column_kwargs={"autoincrement": True})
     asset_id: int = Field(foreign_key="assets.id")
     movement_type: MovementType = Field(description="Jenis pergerakan: masuk/keluar/mutasi")
 
@@ -157,7 +233,7 @@ class AssetMovement(SQLModel, table=True):
     to_room_id: Optional[int] = Field(default=None, foreign_key="rooms.id")
 
     # Movement details
-    tanggal_movement: datetime = Field(default_factory=datetime.utcnow)
+    tanggal_movement: datetime = Field(default_factory=datetime.utcnow, primary_key=True)
     keterangan: str = Field(default="", max_length=500)
     dokumen_referensi: Optional[str] = Field(default=None, max_length=100, description="Nomor dokumen referensi")
 
@@ -176,6 +252,7 @@ class AssetMovement(SQLModel, table=True):
 
 class MaintenanceRecord(SQLModel, table=True):
     __tablename__ = "maintenance_records"  # type: ignore[assignment]
+    __table_args__ = (Index("ix_maintenance_records_asset_tanggal", "asset_id", "tanggal_maintenance"),)
 
     id: Optional[int] = Field(default=None, primary_key=True)
     asset_id: int = Field(foreign_key="assets.id")
@@ -196,6 +273,39 @@ class MaintenanceRecord(SQLModel, table=True):
     asset: Asset = Relationship(back_populates="maintenance_records")
 
 
+class LocationAssetCount(SQLModel, table=True):
+    """Active assets per location and condition, maintained by statement triggers on assets."""
+
+    __tablename__ = "location_asset_counts"  # type: ignore[assignment]
+
+    location_id: int = Field(foreign_key="locations.id", primary_key=True, ondelete="CASCADE")
+    kondisi_barang: AssetCondition = Field(primary_key=True)
+    asset_count: int = Field(default=0)
+
+
+class MovementDailyRollup(SQLModel, table=True):
+    """Movements per day, location and type, maintained by statement triggers on asset_movements."""
+
+    __tablename__ = "movement_daily_rollups"  # type: ignore[assignment]
+    __table_args__ = (
+        # movements without a location roll up under a NULL location_id, which must still be unique
+        Index(
+            "ux_movement_daily_rollups_key",
+            "day",
+            "location_id",
+            "movement_type",
+            unique=True,
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    day: date
+    location_id: Optional[int] = Field(default=None, foreign_key="locations.id", ondelete="CASCADE")
+    movement_type: MovementType
+    movement_count: int = Field(default=0)
+
+
 # Non-persistent schemas (for validation, forms, API requests/responses)
 class UserCreate(SQLModel, table=False):
     username: str = Field(max_length=50)
@@ -307,6 +417,20 @@ class AssetMovementCreate(SQLModel, table=False):
     pemegang_baru: Optional[str] = Field(default=None, max_length=100)
 
 
+class BulkMovementCreate(SQLModel, table=False):
+    # one request is one transaction holding a row lock on every asset
+    asset_ids: List[int] = Field(min_length=1, max_length=1000)
+    from_location_id: Optional[int] = Field(
+        default=None, description="Jika diisi, semua aset harus berada di lokasi ini"
+    )
+    to_location_id: int
+    to_room_id: Optional[int] = Field(default=None)
+    pemegang_baru: Optional[str] = Field(default=None, max_length=100)
+    tanggal_movement: datetime = Field(default_factory=datetime.utcnow)
+    keterangan: str = Field(default="", max_length=500)
+    dokumen_referensi: Optional[str] = Field(default=None, max_length=100)
+
+
 class MaintenanceRecordCreate(SQLModel, table=False):
     asset_id: int
     tanggal_maintenance: date
@@ -366,3 +490,125 @@ class MovementReport(SQLModel, table=False):
     total_keluar: int
     total_mutasi: int
     movements_by_location: Dict[str, Dict[str, int]]
+
+
+class AssetFilter(SQLModel, table=False):
+    location_id: Optional[int] = Field(default=None)
+    room_id: Optional[int] = Field(default=None)
+    category_id: Optional[int] = Field(default=None)
+    kondisi_barang: Optional[AssetCondition] = Field(default=None)
+    is_active: Optional[bool] = Field(default=True)
+
+
+class AssetPage(SQLModel, table=False):
+    items: List[Asset]
+    next_cursor: Optional[str]
+
+
+class AssetResponsePage(SQLModel, table=False):
+    items: List[AssetResponse]
+    next_cursor: Optional[str]
+
+
+class AssetSearchHit(SQLModel, table=False):
+    id: int
+    kode: str
+    nomor_aset: str
+    nama_barang: str
+    merk_tipe: str
+    pemegang_barang: str
+    kondisi_barang: AssetCondition
+    location_id: int
+    room_id: Optional[int]
+    rank: float
+
+
+class AssetSearchPage(SQLModel, table=False):
+    query: str
+    page: int
+    page_size: int
+    has_more: bool
+    hits: List[AssetSearchHit]
+
+
+class AssetSummary(SQLModel, table=False):
+    id: int
+    kode: str
+    barcode: Optional[str]
+    nomor_aset: str
+    nama_barang: str
+    merk_tipe: str
+    kondisi_barang: AssetCondition
+    location_id: int
+    room_id: Optional[int]
+    pemegang_barang: str
+    is_active: bool
+
+
+# Operational schemas
+class PoolStats(SQLModel, table=False):
+    pool_size: int
+    checked_out: int
+    checked_in: int
+    overflow: int
+    checkouts_total: int
+    timeouts_total: int
+    wait_seconds_total: float
+    wait_seconds_max: float
+
+
+class ReadinessReport(SQLModel, table=False):
+    ready: bool
+    database_ok: bool
+    database_latency_ms: Optional[float] = None
+    # checked-out connections per pool as a fraction of pool_size + max_overflow
+    pool_saturation: Dict[str, float] = Field(default_factory=dict)
+    replica_lag_seconds: Optional[float] = None
+    checked_seconds_ago: Optional[float] = None
+    problems: List[str] = Field(default_factory=list)
+
+
+class CounterDrift(SQLModel, table=False):
+    location_id: int
+    kondisi_barang: AssetCondition
+    stored: int
+    actual: int
+
+
+class ReconciliationReport(SQLModel, table=False):
+    counters_checked: int
+    drifts: List[CounterDrift]
+
+
+class ImportRowError(SQLModel, table=False):
+    row: int
+    field: Optional[str]
+    message: str
+
+
+class ImportReport(SQLModel, table=False):
+    rows_read: int
+    rows_imported: int
+    errors: List[ImportRowError]
+
+
+class ArchiveResult(SQLModel, table=False):
+    table_name: str
+    rows: int
+    path: Optional[str]
+
+
+class BulkMovementResult(SQLModel, table=False):
+    moved: int
+    unchanged: List[int]
+
+
+class LookupStats(SQLModel, table=False):
+    cache_enabled: bool
+    cache_size: int
+    hits: int
+    misses: int
+    not_found: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
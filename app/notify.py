@@ -0,0 +1,162 @@
+"""Row change feed over Postgres LISTEN/NOTIFY, used to invalidate in-process caches."""
+
+import asyncio
+import json
+import logging
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+import asyncpg
+from sqlalchemy import Connection, text
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "app_table_changes"
+WATCHED_TABLES = ["assets", "locations", "rooms", "asset_categories"]
+
+# above this many rows a notification carries no ids, NOTIFY payloads are limited to 8000 bytes
+MAX_NOTIFY_IDS = 500
+
+# one notification per statement: the trigger reads the rows it touched from its transition table
+_NOTIFY_FUNCTION_DDL = f"""
+CREATE OR REPLACE FUNCTION app_notify_change() RETURNS trigger AS $$
+DECLARE
+    changed_rows bigint;
+    changed_ids jsonb;
+BEGIN
+    SELECT count(*), CASE WHEN count(*) <= {MAX_NOTIFY_IDS} THEN jsonb_agg(id) END
+    INTO changed_rows, changed_ids
+    FROM changed;
+    IF changed_rows > 0 THEN
+        PERFORM pg_notify('{CHANNEL}', json_build_object(
+            'table', TG_TABLE_NAME,
+            'op', TG_OP,
+            'rows', changed_rows,
+            'ids', changed_ids
+        )::text);
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+
+# transition tables need one trigger per event
+_TRIGGER_EVENTS = {"insert": "NEW", "update": "NEW", "delete": "OLD"}
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    """One statement's changes to a table; ids is None when it touched more than MAX_NOTIFY_IDS rows."""
+
+    table: str
+    op: str
+    rows: int
+    ids: Optional[Tuple[int, ...]]
+
+
+def install_change_notify(conn: Connection) -> None:
+    """(Re)create the statement triggers that publish changes of WATCHED_TABLES on CHANNEL."""
+    conn.execute(text(_NOTIFY_FUNCTION_DDL))
+    for table in WATCHED_TABLES:
+        # the row-level trigger of earlier versions
+        conn.execute(text(f"DROP TRIGGER IF EXISTS {table}_notify_change ON {table}"))
+        for event, transition in _TRIGGER_EVENTS.items():
+            conn.execute(
+                text(
+                    f"CREATE OR REPLACE TRIGGER {table}_notify_{event} AFTER {event.upper()} ON {table} "
+                    f"REFERENCING {transition} TABLE AS changed "
+                    "FOR EACH STATEMENT EXECUTE FUNCTION app_notify_change()"
+                )
+            )
+
+
+ChangeCallback = Callable[[ChangeEvent], None]
+ResetCallback = Callable[[], None]
+
+
+class ChangeListener:
+    """Holds one dedicated asyncpg connection LISTENing on CHANNEL and fans events out per table.
+
+    Notifications sent while the connection is down are lost, so reset callbacks run on every
+    connect and disconnect; caches should drop everything there. Callbacks run on the event loop.
+    """
+
+    def __init__(self, reconnect_delay: float = 5.0) -> None:
+        self.reconnect_delay = reconnect_delay
+        self._subscribers: Dict[str, List[ChangeCallback]] = {}
+        self._reset_callbacks: List[ResetCallback] = []
+        self._task: Optional[asyncio.Task] = None
+        self._connected = False
+
+    @property
+    def connected(self) -> bool:
+        return self._connected
+
+    def subscribe(self, table: str, callback: ChangeCallback) -> None:
+        self._subscribers.setdefault(table, []).append(callback)
+
+    def on_reset(self, callback: ResetCallback) -> None:
+        self._reset_callbacks.append(callback)
+
+    def start(self, dsn: str) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run(dsn), name="change-listener")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                logger.debug("Change listener stopped")
+            self._task = None
+        self._set_connected(False)
+
+    def _set_connected(self, connected: bool) -> None:
+        changed = connected != self._connected
+        self._connected = connected
+        if changed:
+            for callback in self._reset_callbacks:
+                callback()
+
+    def dispatch(self, payload: str) -> None:
+        try:
+            data = json.loads(payload)
+            ids = data.get("ids")
+            event = ChangeEvent(
+                table=data["table"], op=data["op"], rows=data["rows"], ids=None if ids is None else tuple(ids)
+            )
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring malformed change notification {payload!r}: {e}")
+            return
+        for callback in self._subscribers.get(event.table, []):
+            callback(event)
+
+    def _on_notification(self, connection: object, pid: int, channel: str, payload: str) -> None:
+        self.dispatch(payload)
+
+    async def _run(self, dsn: str) -> None:
+        while True:
+            conn: Optional[asyncpg.Connection] = None
+            try:
+                conn = await asyncpg.connect(dsn)
+                closed = asyncio.Event()
+                conn.add_termination_listener(lambda _: closed.set())
+                await conn.add_listener(CHANNEL, self._on_notification)
+                self._set_connected(True)
+                await closed.wait()
+                logger.warning("Change listener connection closed, reconnecting")
+            except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError) as e:
+                logger.warning(f"Change listener cannot connect: {e}")
+            except Exception:
+                # anything else (a bad DSN, a driver error) must not end the feed and leave the caches off for good
+                logger.exception("Change listener failed, reconnecting")
+            finally:
+                self._set_connected(False)
+                if conn is not None and not conn.is_closed():
+                    # terminate() cannot raise, so the loop survives a connection that broke mid-close
+                    conn.terminate()
+            await asyncio.sleep(self.reconnect_delay)
+
+
+CHANGE_LISTENER = ChangeListener()
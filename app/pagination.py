@@ -0,0 +1,143 @@
+"""Keyset (seek) pagination of asset listings.
+
+A page continues strictly after the last row of the previous page, identified by its sort value
+and id, so the database seeks into an index instead of counting past OFFSET rows. Cursors are
+opaque to clients: URL-safe base64 of the sort name and that last (value, id) pair.
+"""
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Callable, List, Optional, Sequence, Tuple, TypeVar
+
+from sqlalchemy import tuple_
+from sqlalchemy.sql import Select
+from sqlmodel import Session, col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.loading import LoadProfile, with_profile
+from app.models import Asset, AssetFilter, AssetPage
+
+MAX_PAGE_SIZE = 200
+
+T = TypeVar("T")
+
+
+class AssetSort(str, Enum):
+    KODE = "kode"
+    KODE_DESC = "-kode"
+    NAMA = "nama_barang"
+    UPDATED = "updated_at"
+    UPDATED_DESC = "-updated_at"
+    PEROLEHAN_DESC = "-tanggal_perolehan"
+
+
+@dataclass(frozen=True)
+class _SortKey:
+    column: Any
+    descending: bool
+    parse: Callable[[Any], Any]
+
+
+_SORT_KEYS = {
+    AssetSort.KODE: _SortKey(col(Asset.kode), False, str),
+    AssetSort.KODE_DESC: _SortKey(col(Asset.kode), True, str),
+    AssetSort.NAMA: _SortKey(col(Asset.nama_barang), False, str),
+    AssetSort.UPDATED: _SortKey(col(Asset.updated_at), False, datetime.fromisoformat),
+    AssetSort.UPDATED_DESC: _SortKey(col(Asset.updated_at), True, datetime.fromisoformat),
+    AssetSort.PEROLEHAN_DESC: _SortKey(col(Asset.tanggal_perolehan), True, date.fromisoformat),
+}
+
+
+def encode_cursor(sort: AssetSort, value: Any, asset_id: int) -> str:
+    raw = json.dumps([sort.value, value.isoformat() if isinstance(value, date) else value, asset_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(sort: AssetSort, cursor: str) -> Tuple[Any, int]:
+    """(sort value, id) of the row a cursor points after. Raises ValueError for foreign or damaged cursors."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        sort_name, value, asset_id = json.loads(raw)
+        if sort_name != sort.value or not isinstance(asset_id, int):
+            raise ValueError(f"Cursor belongs to sort '{sort_name}', not '{sort.value}'")
+        return _SORT_KEYS[sort].parse(value), asset_id
+    except (binascii.Error, TypeError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {e}") from e
+
+
+def _filtered(statement: Select, filters: AssetFilter) -> Select:
+    if filters.location_id is not None:
+        statement = statement.where(Asset.location_id == filters.location_id)
+    if filters.room_id is not None:
+        statement = statement.where(Asset.room_id == filters.room_id)
+    if filters.category_id is not None:
+        statement = statement.where(Asset.category_id == filters.category_id)
+    if filters.kondisi_barang is not None:
+        statement = statement.where(Asset.kondisi_barang == filters.kondisi_barang)
+    if filters.is_active is not None:
+        statement = statement.where(Asset.is_active == filters.is_active)
+    return statement
+
+
+def keyset_statement(
+    filters: AssetFilter,
+    sort: AssetSort = AssetSort.KODE,
+    limit: int = 50,
+    after: Optional[str] = None,
+    base: Optional[Select] = None,
+) -> Select:
+    """Page query over Asset entities with the list profile, or over any `base` selecting from assets
+    that includes id and the sort column.
+
+    One row more than the page tells whether another page follows.
+    """
+    key = _SORT_KEYS[sort]
+    statement = _filtered(with_profile(select(Asset), LoadProfile.LIST) if base is None else base, filters)
+    position = tuple_(key.column, col(Asset.id))
+    if after is not None:
+        value, asset_id = decode_cursor(sort, after)
+        # the id tie-break runs in the same direction as the key, so one row comparison covers both
+        boundary = tuple_(value, asset_id)
+        statement = statement.where(position < boundary if key.descending else position > boundary)
+    order = [key.column.desc(), col(Asset.id).desc()] if key.descending else [key.column, col(Asset.id)]
+    return statement.order_by(*order).limit(min(max(limit, 1), MAX_PAGE_SIZE) + 1)
+
+
+def split_page(sort: AssetSort, limit: int, rows: Sequence[T]) -> Tuple[Sequence[T], Optional[str]]:
+    """The page's rows and the cursor of the next page, from the limit + 1 rows of keyset_statement()."""
+    limit = min(max(limit, 1), MAX_PAGE_SIZE)
+    if len(rows) <= limit:
+        return rows, None
+    last: Any = rows[limit - 1]
+    return rows[:limit], encode_cursor(sort, getattr(last, _SORT_KEYS[sort].column.key), last.id)
+
+
+def _to_page(sort: AssetSort, limit: int, assets: List[Asset]) -> AssetPage:
+    items, next_cursor = split_page(sort, limit, assets)
+    return AssetPage(items=list(items), next_cursor=next_cursor)
+
+
+def paginate_assets(
+    session: Session,
+    filters: AssetFilter,
+    sort: AssetSort = AssetSort.KODE,
+    limit: int = 50,
+    after: Optional[str] = None,
+) -> AssetPage:
+    assets = list(session.exec(keyset_statement(filters, sort, limit, after)).all())
+    return _to_page(sort, limit, assets)
+
+
+async def paginate_assets_async(
+    session: AsyncSession,
+    filters: AssetFilter,
+    sort: AssetSort = AssetSort.KODE,
+    limit: int = 50,
+    after: Optional[str] = None,
+) -> AssetPage:
+    assets = list((await session.exec(keyset_statement(filters, sort, limit, after))).all())
+    return _to_page(sort, limit, assets)
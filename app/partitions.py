@@ -0,0 +1,197 @@
+"""Monthly range partitions of asset_movements on tanggal_movement.
+
+Each month lives in asset_movements_pYYYY_MM. Rows outside the prepared months land in
+asset_movements_default and are split into their own month by the next ensure run, so
+period queries are pruned to the months they cover. Archiving drops whole months instead
+of deleting their rows.
+"""
+
+import logging
+import re
+from datetime import date
+from typing import List, Optional
+
+from sqlalchemy import Connection, text
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from app.config import env_int
+from app.models import AssetMovement
+
+logger = logging.getLogger(__name__)
+
+PARENT = "asset_movements"
+DEFAULT_PARTITION = f"{PARENT}_default"
+MONTHS_AHEAD = env_int("APP_MOVEMENT_PARTITIONS_AHEAD", 3)
+
+_PARTITION_NAME = re.compile(rf"^{PARENT}_p(\d{{4}})_(\d{{2}})$")
+
+
+def _month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def _next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT}_p{month.year:04d}_{month.month:02d}"
+
+
+def _relkind(conn: Connection, name: str) -> Optional[str]:
+    return conn.execute(
+        text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:name)"), {"name": name}
+    ).scalar_one_or_none()
+
+
+def movement_partitions(conn: Connection) -> List[str]:
+    """Monthly partitions currently attached, oldest first."""
+    names = conn.execute(
+        text("SELECT inhrelid::regclass::text FROM pg_inherits WHERE inhparent = to_regclass(:parent)"),
+        {"parent": PARENT},
+    ).scalars()
+    return sorted(name for name in names if _PARTITION_NAME.match(name))
+
+
+def _convert_plain_table(conn: Connection) -> None:
+    """Turn an asset_movements created before partitioning into the default partition of a new parent.
+
+    No row is copied here; the rows are split into monthly partitions by ensure_movement_partitions.
+    The table's triggers are re-created on the parent, so the rollups keep counting every insert.
+    """
+    logger.info(f"Converting {PARENT} to a partitioned table")
+    table = AssetMovement.__table__  # type: ignore[attr-defined]
+    # rollup, notify and counter triggers; their definitions name PARENT, so they move to the new parent
+    triggers = conn.execute(
+        text(
+            "SELECT tgname, pg_get_triggerdef(oid) FROM pg_trigger "
+            "WHERE tgrelid = to_regclass(:name) AND NOT tgisinternal"
+        ),
+        {"name": PARENT},
+    ).all()
+    conn.execute(text(f"ALTER TABLE {PARENT} RENAME TO {DEFAULT_PARTITION}"))
+    # the parent re-creates these under their model names and adopts the renamed ones on attach
+    for index in table.indexes:
+        conn.execute(text(f"ALTER INDEX IF EXISTS {index.name} RENAME TO {DEFAULT_PARTITION}_{index.name[3:]}"))
+    conn.execute(text(f"ALTER TABLE {DEFAULT_PARTITION} DROP CONSTRAINT IF EXISTS {PARENT}_pkey"))
+    # statement triggers with transition tables are not allowed on partitions; the parent gets them back below
+    for trigger, _ in triggers:
+        conn.execute(text(f"DROP TRIGGER {trigger} ON {DEFAULT_PARTITION}"))
+
+    # the enum types already exist, so only the table and its indexes are created
+    conn.execute(CreateTable(table))
+    for index in table.indexes:
+        conn.execute(CreateIndex(index))
+    conn.execute(text(f"ALTER TABLE {PARENT} ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"))
+    conn.execute(
+        text(f"SELECT setval(pg_get_serial_sequence('{PARENT}', 'id'), coalesce(max(id), 0) + 1, false) FROM {PARENT}")
+    )
+    for _, definition in triggers:
+        conn.exec_driver_sql(definition)
+
+
+def _split_from_default(conn: Connection, month: date) -> None:
+    """Move one month of rows out of the default partition into its own partition.
+
+    A table left by an earlier detach holds rows that were never archived, so it is attached again
+    rather than replaced.
+    """
+    name = partition_name(month)
+    bounds = {"start": month, "end": _next_month(month)}
+    columns = ", ".join(
+        conn.execute(
+            text(
+                "SELECT quote_ident(attname) FROM pg_attribute "
+                "WHERE attrelid = to_regclass(:parent) AND attnum > 0 AND NOT attisdropped ORDER BY attnum"
+            ),
+            {"parent": PARENT},
+        ).scalars()
+    )
+    if _relkind(conn, name) is None:
+        conn.execute(text(f"CREATE TABLE {name} (LIKE {PARENT} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    else:
+        logger.warning(f"Attaching {name} again, it was detached without being archived")
+    conn.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+            "WHERE tanggal_movement >= :start AND tanggal_movement < :end "
+            f"RETURNING {columns}) INSERT INTO {name} ({columns}) SELECT {columns} FROM moved"
+        ),
+        bounds,
+    )
+    conn.execute(
+        text(f"ALTER TABLE {PARENT} ATTACH PARTITION {name} FOR VALUES FROM ('{month}') TO ('{_next_month(month)}')")
+    )
+
+
+def ensure_movement_partitions(
+    conn: Connection, months_ahead: int = MONTHS_AHEAD, today: Optional[date] = None
+) -> List[str]:
+    """Create the partitions up to months_ahead after the current month and split rows out of the default.
+
+    Returns the partitions created. Safe to run repeatedly, e.g. from a daily job.
+    """
+    created: List[str] = []
+    months = conn.execute(
+        text(f"SELECT DISTINCT date_trunc('month', tanggal_movement)::date FROM {DEFAULT_PARTITION} ORDER BY 1")
+    ).scalars()
+    for month in list(months):
+        _split_from_default(conn, month)
+        created.append(partition_name(month))
+
+    month = _month_start(today or date.today())
+    for _ in range(months_ahead + 1):
+        name = partition_name(month)
+        if _relkind(conn, name) is None:
+            conn.execute(
+                text(
+                    f"CREATE TABLE {name} PARTITION OF {PARENT} FOR VALUES FROM ('{month}') TO ('{_next_month(month)}')"
+                )
+            )
+            created.append(name)
+        month = _next_month(month)
+    if created:
+        logger.info(f"Created movement partitions: {', '.join(created)}")
+    return created
+
+
+def ensure_default_partition(conn: Connection) -> None:
+    """Give a newly created parent its default partition, so inserts work before the first job run.
+
+    Runs on every boot: an existing database costs one catalog lookup and takes no lock.
+    """
+    if _relkind(conn, PARENT) == "p" and _relkind(conn, DEFAULT_PARTITION) is None:
+        conn.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {PARENT} DEFAULT"))
+
+
+def install_movement_partitions(conn: Connection, months_ahead: int = MONTHS_AHEAD) -> List[str]:
+    """Convert a pre-partitioning table, then ensure the monthly partitions. Returns the partitions created.
+
+    The DDL takes ACCESS EXCLUSIVE locks, so this belongs in the ensure-movement-partitions job and
+    never in application startup. An advisory lock keeps overlapping runs from racing on ATTACH.
+    """
+    conn.execute(text("SELECT pg_advisory_xact_lock(hashtext(:key))"), {"key": PARENT})
+    if _relkind(conn, PARENT) == "r":
+        _convert_plain_table(conn)
+    ensure_default_partition(conn)
+    return ensure_movement_partitions(conn, months_ahead)
+
+
+def detach_movement_partitions(conn: Connection, before: date) -> List[str]:
+    """Detach every monthly partition that ends on or before `before` and return their names.
+
+    Only archive_table calls this, after writing those rows to Parquet, and it drops the detached
+    tables in the same transaction. A detached table that is kept is invisible to history() and
+    rebuild_movement_rollups.
+    """
+    detached: List[str] = []
+    for name in movement_partitions(conn):
+        match = _PARTITION_NAME.match(name)
+        assert match is not None
+        month = date(int(match[1]), int(match[2]), 1)
+        if _next_month(month) <= before:
+            conn.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {name}"))
+            detached.append(name)
+    if detached:
+        logger.info(f"Detached movement partitions: {', '.join(detached)}")
+    return detached
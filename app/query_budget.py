@@ -0,0 +1,149 @@
+"""SQL statement counts and database time per unit of work, with an N+1 warning.
+
+A unit of work is one HTTP request (opened by app.metrics.MetricsMiddleware) or one NiceGUI
+handler wrapped with `tracked`. app.database installs `install_statement_tracking` on every
+engine it creates, so each statement is charged to the innermost active unit and the units
+around it. When one statement shape runs more than APP_SQL_REPEAT_THRESHOLD times in a unit,
+usually a lazy load inside a loop, a warning names the unit and the statement.
+"""
+
+import functools
+import inspect
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator, List, Optional, Tuple, TypeVar
+
+from sqlalchemy import Engine, event
+
+from app.config import env_int
+
+logger = logging.getLogger(__name__)
+
+REPEAT_THRESHOLD = env_int("APP_SQL_REPEAT_THRESHOLD", 10)
+
+# a parenthesised list of placeholders, as rendered by expanding IN for psycopg2 and asyncpg
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:%\(\w+\)s|\$\d+|\?)(?:\s*,\s*(?:%\(\w+\)s|\$\d+|\?))*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@functools.lru_cache(maxsize=1024)
+def statement_shape(statement: str) -> str:
+    """The statement with whitespace collapsed and IN lists of any length folded into one."""
+    return _PLACEHOLDER_LIST.sub("(?)", _WHITESPACE.sub(" ", statement).strip())
+
+
+@dataclass
+class UnitOfWork:
+    name: str
+    parent: Optional["UnitOfWork"] = None
+    statements: int = 0
+    db_seconds: float = 0.0
+    shapes: Counter = field(default_factory=Counter)
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statement shapes that ran more than `threshold` times, most frequent first."""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count > threshold]
+
+
+_CURRENT: ContextVar[Optional[UnitOfWork]] = ContextVar("sql_unit_of_work", default=None)
+
+
+def current_unit() -> Optional[UnitOfWork]:
+    return _CURRENT.get()
+
+
+def record_statement(statement: str, seconds: float) -> None:
+    unit = _CURRENT.get()
+    if unit is None:
+        return
+    shape = statement_shape(statement)
+    while unit is not None:
+        unit.statements += 1
+        unit.db_seconds += seconds
+        unit.shapes[shape] += 1
+        unit = unit.parent
+
+
+def install_statement_tracking(engine: Engine) -> None:
+    """Report every statement `engine` runs, with its duration, to the active unit of work."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+        conn.info.setdefault("query_budget_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+        record_statement(statement, time.perf_counter() - conn.info["query_budget_started"].pop())
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context: Any) -> None:
+        started = context.connection.info.get("query_budget_started") if context.connection is not None else None
+        if started:
+            started.pop()
+
+
+@contextmanager
+def track(name: str, repeat_threshold: int = REPEAT_THRESHOLD) -> Iterator[UnitOfWork]:
+    """Charge statements run inside the block to a new unit; warn about repeated shapes on exit.
+
+    The unit may be renamed inside the block, e.g. once the route is known.
+    """
+    unit = UnitOfWork(name, parent=_CURRENT.get())
+    token = _CURRENT.set(unit)
+    try:
+        yield unit
+    finally:
+        _CURRENT.reset(token)
+        for shape, count in unit.repeated(repeat_threshold):
+            logger.warning(f"Possible N+1 in {unit.name}: statement ran {count} times: {shape[:300]}")
+
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def tracked(name: Optional[str] = None) -> Callable[[F], F]:
+    """Decorator for NiceGUI page functions and event handlers, sync or async."""
+
+    def decorate(func: F) -> F:
+        unit_name = name or f"ui {func.__qualname__}"
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def run_async(*args: Any, **kwargs: Any) -> Any:
+                with track(unit_name):
+                    return await func(*args, **kwargs)
+
+            return run_async  # type: ignore[return-value]
+
+        @functools.wraps(func)
+        def run(*args: Any, **kwargs: Any) -> Any:
+            with track(unit_name):
+                return func(*args, **kwargs)
+
+        return run  # type: ignore[return-value]
+
+    return decorate
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def query_budget(
+    max_statements: int, max_repeats: Optional[int] = None, name: str = "query budget"
+) -> Iterator[UnitOfWork]:
+    """Raise QueryBudgetExceeded when the block runs more than `max_statements` statements,
+    or any one shape more than `max_repeats` times. Meant for tests."""
+    with track(name, repeat_threshold=REPEAT_THRESHOLD if max_repeats is None else max_repeats) as unit:
+        yield unit
+    if unit.statements > max_statements:
+        raise QueryBudgetExceeded(f"{name} ran {unit.statements} SQL statements, budget is {max_statements}")
+    if max_repeats is not None and unit.repeated(max_repeats):
+        shape, count = unit.repeated(max_repeats)[0]
+        raise QueryBudgetExceeded(f"{name} ran one statement {count} times, at most {max_repeats} allowed: {shape}")
@@ -0,0 +1,110 @@
+"""Process-wide cache of the reference tables: locations, rooms and asset categories.
+
+They change a few times a week but every import resolves its codes and names against them. The
+cache holds one immutable snapshot with id-to-name and code-to-id maps. Any change notified on
+app.notify.CHANNEL drops the snapshot and the next reader loads a new one. As with scanner
+lookups, the cache is only used while the change listener is connected.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Tuple
+
+from sqlalchemy import Row
+from sqlmodel import Session, select
+
+from app.config import env_float
+from app.models import AssetCategory, Location, Room
+from app.notify import CHANGE_LISTENER, ChangeEvent, ChangeListener
+
+REFERENCE_TABLES = ["locations", "rooms", "asset_categories"]
+
+_LOCATIONS = select(Location.id, Location.kode_lokasi, Location.nama_lokasi)
+_ROOMS = select(Room.id, Room.location_id, Room.nama_ruang)
+_CATEGORIES = select(AssetCategory.id, AssetCategory.kode_kategori, AssetCategory.nama_kategori)
+
+
+@dataclass(frozen=True)
+class ReferenceData:
+    location_names: Dict[int, str]
+    location_ids_by_code: Dict[str, int]
+    room_names: Dict[int, str]
+    # (location id, lower-cased room name) -> room id; room names are only unique within a location
+    room_ids_by_name: Dict[Tuple[int, str], int]
+    category_names: Dict[int, str]
+    category_ids_by_code: Dict[str, int]
+
+    @classmethod
+    def from_rows(cls, locations: Sequence[Row], rooms: Sequence[Row], categories: Sequence[Row]) -> "ReferenceData":
+        return cls(
+            location_names={row.id: row.nama_lokasi for row in locations},
+            location_ids_by_code={row.kode_lokasi: row.id for row in locations},
+            room_names={row.id: row.nama_ruang for row in rooms},
+            room_ids_by_name={(row.location_id, row.nama_ruang.lower()): row.id for row in rooms},
+            category_names={row.id: row.nama_kategori for row in categories},
+            category_ids_by_code={row.kode_kategori: row.id for row in categories},
+        )
+
+    @classmethod
+    def load(cls, session: Session) -> "ReferenceData":
+        return cls.from_rows(
+            session.exec(_LOCATIONS).all(), session.exec(_ROOMS).all(), session.exec(_CATEGORIES).all()
+        )
+
+
+class ReferenceCache:
+    """The current ReferenceData snapshot, with a TTL as a safety net behind NOTIFY invalidation."""
+
+    def __init__(self, listener: ChangeListener, ttl: float) -> None:
+        self.listener = listener
+        self.ttl = ttl
+        self.hits = 0
+        self.loads = 0
+        self._lock = threading.Lock()
+        self._data: Optional[ReferenceData] = None
+        self._expires_at = 0.0
+        # bumped on every invalidation, so a snapshot read before a concurrent change is not kept
+        self._generation = 0
+        for table in REFERENCE_TABLES:
+            listener.subscribe(table, self._on_change)
+        listener.on_reset(self.invalidate)
+
+    @property
+    def loaded(self) -> bool:
+        return self._data is not None
+
+    def _on_change(self, event: ChangeEvent) -> None:
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._data = None
+
+    def _cached(self) -> Optional[ReferenceData]:
+        if not self.listener.connected:
+            return None
+        with self._lock:
+            if self._data is None or self._expires_at < time.monotonic():
+                return None
+            self.hits += 1
+            return self._data
+
+    def _store(self, data: ReferenceData, generation: int) -> ReferenceData:
+        with self._lock:
+            self.loads += 1
+            if self.listener.connected and generation == self._generation:
+                self._data = data
+                self._expires_at = time.monotonic() + self.ttl
+        return data
+
+    def get(self, session: Session) -> ReferenceData:
+        data = self._cached()
+        if data is None:
+            generation = self._generation
+            data = self._store(ReferenceData.load(session), generation)
+        return data
+
+
+REFERENCE_CACHE = ReferenceCache(CHANGE_LISTENER, ttl=env_float("APP_REFERENCE_CACHE_TTL", 3600.0))
@@ -0,0 +1,49 @@
+"""Lag-aware routing of read-only sessions to a streaming replica."""
+
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import text
+
+# 0 on a primary and on a replica that has replayed everything it received, otherwise seconds since the last replay
+REPLICA_LAG_SQL = text(
+    "SELECT CASE"
+    " WHEN NOT pg_is_in_recovery() THEN 0"
+    " WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0"
+    " ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)"
+    " END"
+)
+
+
+class ReplicaRouter:
+    """Picks the replica for reads while its last measured lag is within max_lag_seconds.
+
+    The lag is measured in the background by the readiness probe (app.health) and recorded here,
+    so routing a session never touches the network. A failed measurement, or none within
+    max_age seconds, routes reads to the primary.
+    """
+
+    def __init__(self, max_lag_seconds: float, max_age: float) -> None:
+        self.max_lag_seconds = max_lag_seconds
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._lag: Optional[float] = None
+        self._checked_at = float("-inf")
+
+    @property
+    def lag_seconds(self) -> Optional[float]:
+        """Last measured lag, None before the first check or after a failed one."""
+        return self._lag
+
+    def record(self, lag: Optional[float]) -> None:
+        with self._lock:
+            self._lag = lag
+            self._checked_at = time.monotonic()
+
+    def use_replica(self) -> bool:
+        with self._lock:
+            lag, checked_at = self._lag, self._checked_at
+        if time.monotonic() - checked_at > self.max_age:
+            return False
+        return lag is not None and lag <= self.max_lag_seconds
@@ -0,0 +1,138 @@
+"""MovementReport from daily rollups of asset_movements.
+
+A movement counts at its destination, except keluar which counts where the asset left from.
+"""
+
+from datetime import date
+from pathlib import Path
+from typing import Dict, List
+
+from sqlalchemy import Connection, func, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.archive import ARCHIVE_DIR, archived_movement_counts
+from app.models import Location, MovementDailyRollup, MovementReport, MovementType
+
+_ROLLUP_LOCATION_SQL = (
+    "CASE WHEN movement_type = 'KELUAR' THEN from_location_id ELSE coalesce(to_location_id, from_location_id) END"
+)
+
+_ROLLUP_UPSERT_SQL = """
+INSERT INTO movement_daily_rollups AS r (day, location_id, movement_type, movement_count)
+SELECT day, location_id, movement_type, sum(delta) FROM ({deltas}) d
+GROUP BY day, location_id, movement_type HAVING sum(delta) <> 0
+ORDER BY day, location_id, movement_type
+ON CONFLICT (day, location_id, movement_type) DO UPDATE SET movement_count = r.movement_count + EXCLUDED.movement_count
+"""
+
+
+def _deltas(rows: str, sign: int) -> str:
+    return (
+        f"SELECT tanggal_movement::date AS day, {_ROLLUP_LOCATION_SQL} AS location_id, movement_type, "
+        f"{sign} AS delta FROM {rows}"
+    )
+
+
+# same shape as the location counters: one grouped upsert per statement, in key order
+_ROLLUP_FUNCTION_DDL = f"""
+CREATE OR REPLACE FUNCTION movement_daily_rollups_apply() RETURNS trigger AS $$
+BEGIN
+    IF current_setting('app.archiving', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP = 'INSERT' THEN
+        {_ROLLUP_UPSERT_SQL.format(deltas=_deltas("new_rows", 1))};
+    ELSIF TG_OP = 'DELETE' THEN
+        {_ROLLUP_UPSERT_SQL.format(deltas=_deltas("old_rows", -1))};
+    ELSE
+        {_ROLLUP_UPSERT_SQL.format(deltas=_deltas("new_rows", 1) + " UNION ALL " + _deltas("old_rows", -1))};
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+
+_ROLLUP_TRIGGERS = {
+    "INSERT": "REFERENCING NEW TABLE AS new_rows",
+    "UPDATE": "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows",
+    "DELETE": "REFERENCING OLD TABLE AS old_rows",
+}
+
+_REBUILD_SQL = _ROLLUP_UPSERT_SQL.format(deltas=_deltas("asset_movements", 1))
+
+
+def install_movement_rollups(conn: Connection) -> None:
+    """Create the rollup triggers on asset_movements and fill the rollups if they have never been built."""
+    conn.execute(text(_ROLLUP_FUNCTION_DDL))
+    for event, referencing in _ROLLUP_TRIGGERS.items():
+        conn.execute(
+            text(
+                f"CREATE OR REPLACE TRIGGER asset_movements_rollup_{event.lower()} AFTER {event} ON asset_movements "
+                f"{referencing} FOR EACH STATEMENT EXECUTE FUNCTION movement_daily_rollups_apply()"
+            )
+        )
+    empty = conn.execute(text("SELECT NOT EXISTS (SELECT 1 FROM movement_daily_rollups)")).scalar_one()
+    if empty:
+        conn.execute(text(_REBUILD_SQL))
+
+
+def rebuild_movement_rollups(session: Session, archive_dir: Path = ARCHIVE_DIR) -> int:
+    """Recompute every rollup from asset_movements and the Parquet archive. Returns the number of rollup rows."""
+    # an archive run cannot delete movements while they are being counted
+    session.execute(text("LOCK TABLE asset_movements IN SHARE MODE"))
+    session.execute(text("LOCK TABLE movement_daily_rollups IN EXCLUSIVE MODE"))
+    archived = archived_movement_counts(archive_dir)
+    session.execute(text("DELETE FROM movement_daily_rollups"))
+    session.execute(text(_REBUILD_SQL))
+    if archived:
+        statement = insert(MovementDailyRollup)
+        session.execute(
+            statement.on_conflict_do_update(
+                index_elements=["day", "location_id", "movement_type"],
+                set_={"movement_count": MovementDailyRollup.movement_count + statement.excluded.movement_count},
+            ),
+            archived,
+        )
+    count = session.execute(text("SELECT count(*) FROM movement_daily_rollups")).scalar_one()
+    session.commit()
+    return count
+
+
+def _report_statement(period_start: date, period_end: date):
+    return (
+        select(Location.nama_lokasi, MovementDailyRollup.movement_type, func.sum(MovementDailyRollup.movement_count))
+        .select_from(MovementDailyRollup)
+        .outerjoin(Location, col(Location.id) == MovementDailyRollup.location_id)
+        .where(MovementDailyRollup.day >= period_start, MovementDailyRollup.day <= period_end)
+        .group_by(Location.nama_lokasi, MovementDailyRollup.movement_type)
+    )
+
+
+def _to_report(period_start: date, period_end: date, rows: List) -> MovementReport:
+    totals = {movement_type: 0 for movement_type in MovementType}
+    by_location: Dict[str, Dict[str, int]] = {}
+    for nama_lokasi, movement_type, count in rows:
+        totals[movement_type] += count
+        if nama_lokasi is not None:
+            by_location.setdefault(nama_lokasi, {t.value: 0 for t in MovementType})[movement_type.value] += count
+    return MovementReport(
+        period_start=period_start.isoformat(),
+        period_end=period_end.isoformat(),
+        total_masuk=totals[MovementType.MASUK],
+        total_keluar=totals[MovementType.KELUAR],
+        total_mutasi=totals[MovementType.MUTASI],
+        movements_by_location=by_location,
+    )
+
+
+def get_movement_report(session: Session, period_start: date, period_end: date) -> MovementReport:
+    """Movements between period_start and period_end, both days inclusive."""
+    rows = list(session.exec(_report_statement(period_start, period_end)).all())
+    return _to_report(period_start, period_end, rows)
+
+
+async def get_movement_report_async(session: AsyncSession, period_start: date, period_end: date) -> MovementReport:
+    rows = list((await session.exec(_report_statement(period_start, period_end))).all())
+    return _to_report(period_start, period_end, rows)
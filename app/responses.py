@@ -0,0 +1,102 @@
+"""AssetResponse built from one projection query instead of loaded Asset objects.
+
+Building a response from an Asset touches asset.location, asset.room and asset.category, which
+lazy-loads up to three rows per asset. The projection selects exactly the response columns with
+the names joined in, and the rows are trusted as they come from typed columns, so responses are
+constructed without a validation pass.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import Row
+from sqlalchemy.sql import Select
+from sqlmodel import Session, col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models import Asset, AssetCategory, AssetFilter, AssetResponse, AssetResponsePage, Location, Room
+from app.pagination import AssetSort, keyset_statement, split_page
+
+
+def response_statement() -> Select:
+    return (
+        select(
+            Asset.id,
+            Asset.kode,
+            Asset.barcode,
+            Asset.nomor_aset,
+            Asset.nama_barang,
+            Asset.merk_tipe,
+            Asset.kode_barang,
+            Asset.tahun_anggaran,
+            Asset.rupiah_satuan,
+            Asset.tanggal_perolehan,
+            Asset.pemegang_barang,
+            Asset.kondisi_barang,
+            Asset.gambar,
+            Asset.keterangan,
+            col(Location.nama_lokasi).label("location_name"),
+            col(Room.nama_ruang).label("room_name"),
+            col(AssetCategory.nama_kategori).label("category_name"),
+            Asset.created_at,
+            Asset.updated_at,
+        )
+        .join(Location, col(Location.id) == Asset.location_id)
+        .outerjoin(Room, col(Room.id) == Asset.room_id)
+        .outerjoin(AssetCategory, col(AssetCategory.id) == Asset.category_id)
+    )
+
+
+def to_response(row: Row) -> AssetResponse:
+    values: Dict[str, Any] = dict(row._mapping)
+    values["tanggal_perolehan"] = str(values["tanggal_perolehan"])
+    values["created_at"] = str(values["created_at"])
+    values["updated_at"] = str(values["updated_at"])
+    return AssetResponse.model_construct(**values)
+
+
+def response_from_asset(asset: Asset) -> AssetResponse:
+    """The ORM path: validates and follows the relationships, so it lazy-loads unless they are already loaded."""
+    return AssetResponse(
+        **asset.model_dump(exclude={"tanggal_perolehan", "created_at", "updated_at"}),
+        tanggal_perolehan=str(asset.tanggal_perolehan),
+        created_at=str(asset.created_at),
+        updated_at=str(asset.updated_at),
+        location_name=asset.location.nama_lokasi,
+        room_name=asset.room.nama_ruang if asset.room else None,
+        category_name=asset.category.nama_kategori if asset.category else None,
+    )
+
+
+def get_asset_responses(session: Session, asset_ids: Sequence[int]) -> List[AssetResponse]:
+    rows = session.execute(response_statement().where(col(Asset.id).in_(asset_ids)).order_by(col(Asset.id)))
+    return [to_response(row) for row in rows]
+
+
+def get_asset_response(session: Session, asset_id: int) -> Optional[AssetResponse]:
+    row = session.execute(response_statement().where(Asset.id == asset_id)).first()
+    return None if row is None else to_response(row)
+
+
+def asset_response_page(
+    session: Session,
+    filters: AssetFilter,
+    sort: AssetSort = AssetSort.KODE,
+    limit: int = 50,
+    after: Optional[str] = None,
+) -> AssetResponsePage:
+    rows = list(session.execute(keyset_statement(filters, sort, limit, after, base=response_statement())).all())
+    items, next_cursor = split_page(sort, limit, rows)
+    return AssetResponsePage(items=[to_response(row) for row in items], next_cursor=next_cursor)
+
+
+async def asset_response_page_async(
+    session: AsyncSession,
+    filters: AssetFilter,
+    sort: AssetSort = AssetSort.KODE,
+    limit: int = 50,
+    after: Optional[str] = None,
+) -> AssetResponsePage:
+    statement = keyset_statement(filters, sort, limit, after, base=response_statement())
+    rows = list((await session.execute(statement)).all())
+    items, next_cursor = split_page(sort, limit, rows)
+    return AssetResponsePage(items=[to_response(row) for row in items], next_cursor=next_cursor)
@@ -0,0 +1,131 @@
+"""Ranked asset search: prefix full-text matching on assets.search_vector plus pg_trgm fuzzy matching."""
+
+import logging
+import re
+from typing import List, Optional
+
+from sqlalchemy import Connection, func, literal, or_, select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.sql import ColumnElement, Select
+from sqlmodel import Session, literal_column
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models import ASSET_SEARCH_VECTOR_SQL, Asset, AssetSearchHit, AssetSearchPage
+
+logger = logging.getLogger(__name__)
+
+MAX_PAGE_SIZE = 100
+
+# Must match the indexed expression below exactly, otherwise the planner cannot use the trigram index
+SEARCH_TEXT_SQL = "(nama_barang || ' ' || merk_tipe || ' ' || pemegang_barang || ' ' || keterangan)"
+TRIGRAM_INDEX = "ix_assets_search_trgm"
+TRIGRAM_INDEX_DDL = f"CREATE INDEX CONCURRENTLY {TRIGRAM_INDEX} ON assets USING gin ({SEARCH_TEXT_SQL} gin_trgm_ops)"
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_trigram_enabled = False
+
+
+def trigram_enabled() -> bool:
+    return _trigram_enabled
+
+
+def install_search(conn: Connection) -> bool:
+    """Add the search column to an existing assets table and install pg_trgm when the server has it.
+
+    Runs from migrate() on an autocommit connection. Returns whether pg_trgm is available, in
+    which case migrate() builds TRIGRAM_INDEX_DDL.
+    """
+    # no-op on tables created by create_all(), which already declares the generated column
+    conn.execute(
+        text(
+            "ALTER TABLE assets ADD COLUMN IF NOT EXISTS search_vector tsvector "
+            f"GENERATED ALWAYS AS ({ASSET_SEARCH_VECTOR_SQL}) STORED"
+        )
+    )
+    try:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    except DBAPIError as e:
+        logger.warning(f"pg_trgm is not available, asset search runs without fuzzy matching: {e}")
+        return False
+    return True
+
+
+def detect_search(conn: Connection) -> None:
+    """Turn fuzzy matching on when migrate() has built the trigram index. Runs on every boot."""
+    global _trigram_enabled
+    _trigram_enabled = bool(
+        conn.execute(
+            text("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"), {"name": TRIGRAM_INDEX}
+        ).scalar_one_or_none()
+    )
+
+
+def to_prefix_tsquery(query: str) -> Optional[str]:
+    """'lapt think' -> 'lapt:* & think:*', so partially typed words still match."""
+    tokens = _TOKEN_RE.findall(query.lower())
+    if not tokens:
+        return None
+    return " & ".join(f"{token}:*" for token in tokens)
+
+
+def search_statement(
+    query: str, page: int = 1, page_size: int = 20, include_inactive: bool = False
+) -> Optional[Select]:
+    tsquery_text = to_prefix_tsquery(query)
+    if tsquery_text is None:
+        return None
+    page = max(page, 1)
+    page_size = min(max(page_size, 1), MAX_PAGE_SIZE)
+
+    search_vector = Asset.__table__.c.search_vector  # type: ignore[attr-defined]
+    tsquery = func.to_tsquery("simple", tsquery_text)
+    match: ColumnElement[bool] = search_vector.op("@@")(tsquery)
+    rank: ColumnElement[float] = func.ts_rank_cd(search_vector, tsquery)
+    if _trigram_enabled:
+        search_text = literal_column(SEARCH_TEXT_SQL)
+        # word similarity tolerates typos ("proyekter") and infixes that the prefix query misses
+        match = or_(match, literal(query).op("<%")(search_text))
+        rank = rank + func.word_similarity(query, search_text)
+
+    statement = select(
+        Asset.id,
+        Asset.kode,
+        Asset.nomor_aset,
+        Asset.nama_barang,
+        Asset.merk_tipe,
+        Asset.pemegang_barang,
+        Asset.kondisi_barang,
+        Asset.location_id,
+        Asset.room_id,
+        rank.label("rank"),
+    ).where(match)
+    if not include_inactive:
+        statement = statement.where(Asset.is_active)
+    # one extra row tells whether a next page exists without a COUNT(*) over all matches
+    return (
+        statement.order_by(literal_column("rank").desc(), Asset.id).offset((page - 1) * page_size).limit(page_size + 1)
+    )
+
+
+def _to_page(query: str, page: int, page_size: int, rows: List) -> AssetSearchPage:
+    page_size = min(max(page_size, 1), MAX_PAGE_SIZE)
+    hits = [AssetSearchHit(**row._mapping) for row in rows[:page_size]]
+    return AssetSearchPage(
+        query=query, page=max(page, 1), page_size=page_size, has_more=len(rows) > page_size, hits=hits
+    )
+
+
+def search_assets(
+    session: Session, query: str, page: int = 1, page_size: int = 20, include_inactive: bool = False
+) -> AssetSearchPage:
+    statement = search_statement(query, page, page_size, include_inactive)
+    rows = [] if statement is None else list(session.execute(statement).all())
+    return _to_page(query, page, page_size, rows)
+
+
+async def search_assets_async(
+    session: AsyncSession, query: str, page: int = 1, page_size: int = 20, include_inactive: bool = False
+) -> AssetSearchPage:
+    statement = search_statement(query, page, page_size, include_inactive)
+    rows = [] if statement is None else list((await session.execute(statement)).all())
+    return _to_page(query, page, page_size, rows)
@@ -0,0 +1,119 @@
+"""Filters over Asset.spesifikasi evaluated in Postgres against the GIN-indexed JSONB column."""
+
+import json
+from enum import Enum
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from sqlalchemy import Connection, String, and_, cast, literal, text
+from sqlalchemy.dialects.postgresql import JSONPATH
+from sqlalchemy.sql import ColumnElement, Select
+from sqlmodel import Field, Session, SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.loading import LoadProfile, with_profile
+from app.models import Asset
+
+SpecValue = Union[bool, int, float, str]
+
+
+class SpecOp(str, Enum):
+    EQ = "=="
+    NE = "!="
+    GT = ">"
+    GE = ">="
+    LT = "<"
+    LE = "<="
+    EXISTS = "exists"
+
+
+class SpecFilter(SQLModel, table=False):
+    key: str = Field(min_length=1, max_length=100)
+    op: SpecOp = Field(default=SpecOp.EQ)
+    value: Optional[SpecValue] = Field(default=None)
+
+
+def install_specs(conn: Connection) -> None:
+    """Convert a spesifikasi column created as plain json to jsonb. Rewrites the table once, from migrate()."""
+    data_type = conn.execute(
+        text(
+            "SELECT data_type FROM information_schema.columns "
+            "WHERE table_schema = current_schema() AND table_name = 'assets' AND column_name = 'spesifikasi'"
+        )
+    ).scalar_one_or_none()
+    if data_type == "json":
+        conn.execute(text("ALTER TABLE assets ALTER COLUMN spesifikasi TYPE jsonb USING spesifikasi::jsonb"))
+
+
+def _jsonpath_literal(value: SpecValue) -> str:
+    # json.dumps output is valid jsonpath literal syntax for strings, numbers and booleans
+    return json.dumps(value)
+
+
+def spec_condition(spec: SpecFilter) -> ColumnElement[bool]:
+    column = Asset.__table__.c.spesifikasi  # type: ignore[attr-defined]
+    match spec.op:
+        case SpecOp.EXISTS:
+            return column.has_key(spec.key)
+        case SpecOp.EQ:
+            if spec.value is None:
+                raise ValueError(f"Spec filter on '{spec.key}' with == needs a value")
+            # containment is the form the GIN index answers best
+            return column.contains({spec.key: spec.value})
+        case _:
+            if spec.value is None:
+                raise ValueError(f"Spec filter on '{spec.key}' with {spec.op.value} needs a value")
+            if isinstance(spec.value, bool) and spec.op != SpecOp.NE:
+                raise ValueError(f"Spec filter on '{spec.key}' cannot order booleans")
+            path = f"$.{json.dumps(spec.key)} {spec.op.value} {_jsonpath_literal(spec.value)}"
+            return column.path_match(cast(literal(path, String), JSONPATH))
+
+
+def filter_by_spec(
+    statement: Select, filters: Sequence[SpecFilter] = (), contains: Optional[Dict[str, Any]] = None
+) -> Select:
+    """Add spesifikasi conditions to any statement selecting from assets."""
+    conditions: List[ColumnElement[bool]] = [spec_condition(spec) for spec in filters]
+    if contains:
+        conditions.append(Asset.__table__.c.spesifikasi.contains(contains))  # type: ignore[attr-defined]
+    if not conditions:
+        return statement
+    return statement.where(and_(*conditions))
+
+
+def assets_by_spec_statement(
+    filters: Sequence[SpecFilter] = (),
+    contains: Optional[Dict[str, Any]] = None,
+    category_id: Optional[int] = None,
+    include_inactive: bool = False,
+    limit: int = 100,
+) -> Select:
+    statement = with_profile(select(Asset), LoadProfile.LIST)
+    if category_id is not None:
+        statement = statement.where(Asset.category_id == category_id)
+    if not include_inactive:
+        statement = statement.where(Asset.is_active)
+    return filter_by_spec(statement, filters, contains).order_by(Asset.id).limit(limit)  # type: ignore[arg-type]
+
+
+def find_assets_by_spec(
+    session: Session,
+    filters: Sequence[SpecFilter] = (),
+    contains: Optional[Dict[str, Any]] = None,
+    category_id: Optional[int] = None,
+    include_inactive: bool = False,
+    limit: int = 100,
+) -> List[Asset]:
+    statement = assets_by_spec_statement(filters, contains, category_id, include_inactive, limit)
+    return list(session.exec(statement).all())  # type: ignore[call-overload]
+
+
+async def find_assets_by_spec_async(
+    session: AsyncSession,
+    filters: Sequence[SpecFilter] = (),
+    contains: Optional[Dict[str, Any]] = None,
+    category_id: Optional[int] = None,
+    include_inactive: bool = False,
+    limit: int = 100,
+) -> List[Asset]:
+    statement = assets_by_spec_statement(filters, contains, category_id, include_inactive, limit)
+    return list((await session.exec(statement)).all())  # type: ignore[call-overload]
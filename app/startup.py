@@ -1,4 +1,8 @@
-from app.database import create_tables
+from app.database import DATABASE_URL, create_tables
+from app.health import READINESS_PROBE
+from app.metrics import LOOP_LAG_MONITOR
+from app.notify import CHANGE_LISTENER
+from app.query_budget import tracked
 from nicegui import ui
 
 
@@ -7,5 +11,19 @@ def startup() -> None:
     create_tables()
 
     @ui.page("/")
+    @tracked()
     def index():
         ui.label("🚧 Work in progress 🚧").style("font-size: 2rem; text-align: center; margin-top: 2rem")
+
+
+async def start_services() -> None:
+    # cache invalidation feed; caches stay bypassed until it is connected
+    CHANGE_LISTENER.start(DATABASE_URL)
+    READINESS_PROBE.start()
+    LOOP_LAG_MONITOR.start()
+
+
+async def stop_services() -> None:
+    await LOOP_LAG_MONITOR.stop()
+    await READINESS_PROBE.stop()
+    await CHANGE_LISTENER.stop()
@@ -0,0 +1,147 @@
+"""LocationSummary from incrementally maintained counters, plus their reconciliation."""
+
+import logging
+from typing import Dict, List, Tuple
+
+from sqlalchemy import Connection, text
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models import AssetCondition, CounterDrift, Location, LocationAssetCount, LocationSummary, ReconciliationReport
+
+logger = logging.getLogger(__name__)
+
+# Statement-level triggers see each statement's changed rows as transition tables, so a bulk
+# update of 10k assets costs one grouped upsert instead of 10k. Rows are upserted in key order
+# to keep concurrent writers from deadlocking on the counter rows.
+_COUNTS_FUNCTION_DDL = """
+CREATE OR REPLACE FUNCTION location_asset_counts_apply() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO location_asset_counts AS c (location_id, kondisi_barang, asset_count)
+        SELECT location_id, kondisi_barang, count(*) FROM new_rows WHERE is_active
+        GROUP BY location_id, kondisi_barang ORDER BY location_id, kondisi_barang
+        ON CONFLICT (location_id, kondisi_barang) DO UPDATE SET asset_count = c.asset_count + EXCLUDED.asset_count;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO location_asset_counts AS c (location_id, kondisi_barang, asset_count)
+        SELECT location_id, kondisi_barang, -count(*) FROM old_rows WHERE is_active
+        GROUP BY location_id, kondisi_barang ORDER BY location_id, kondisi_barang
+        ON CONFLICT (location_id, kondisi_barang) DO UPDATE SET asset_count = c.asset_count + EXCLUDED.asset_count;
+    ELSE
+        INSERT INTO location_asset_counts AS c (location_id, kondisi_barang, asset_count)
+        SELECT location_id, kondisi_barang, sum(delta) FROM (
+            SELECT location_id, kondisi_barang, 1 AS delta FROM new_rows WHERE is_active
+            UNION ALL
+            SELECT location_id, kondisi_barang, -1 AS delta FROM old_rows WHERE is_active
+        ) d
+        GROUP BY location_id, kondisi_barang HAVING sum(delta) <> 0 ORDER BY location_id, kondisi_barang
+        ON CONFLICT (location_id, kondisi_barang) DO UPDATE SET asset_count = c.asset_count + EXCLUDED.asset_count;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+
+_COUNTS_TRIGGERS = {
+    "INSERT": "REFERENCING NEW TABLE AS new_rows",
+    "UPDATE": "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows",
+    "DELETE": "REFERENCING OLD TABLE AS old_rows",
+}
+
+_ACTUAL_COUNTS_SQL = text(
+    "SELECT location_id, kondisi_barang, count(*) FROM assets WHERE is_active GROUP BY location_id, kondisi_barang"
+)
+
+
+def install_location_counts(conn: Connection) -> None:
+    """Create the counter triggers on assets and fill the counters if they have never been built."""
+    conn.execute(text(_COUNTS_FUNCTION_DDL))
+    for event, referencing in _COUNTS_TRIGGERS.items():
+        conn.execute(
+            text(
+                f"CREATE OR REPLACE TRIGGER assets_location_counts_{event.lower()} AFTER {event} ON assets "
+                f"{referencing} FOR EACH STATEMENT EXECUTE FUNCTION location_asset_counts_apply()"
+            )
+        )
+    empty = conn.execute(text("SELECT NOT EXISTS (SELECT 1 FROM location_asset_counts)")).scalar_one()
+    if empty:
+        columns = "location_id, kondisi_barang, asset_count"
+        conn.execute(text(f"INSERT INTO location_asset_counts ({columns}) {_ACTUAL_COUNTS_SQL.text}"))
+
+
+def _summary_statement():
+    return (
+        select(
+            Location.id,
+            Location.kode_lokasi,
+            Location.nama_lokasi,
+            LocationAssetCount.kondisi_barang,
+            LocationAssetCount.asset_count,
+        )
+        .outerjoin(LocationAssetCount, LocationAssetCount.location_id == Location.id)  # type: ignore[arg-type]
+        .where(Location.is_active)
+        .order_by(Location.kode_lokasi)  # type: ignore[arg-type]
+    )
+
+
+def _to_summaries(rows) -> List[LocationSummary]:
+    summaries: Dict[int, LocationSummary] = {}
+    for location_id, kode_lokasi, nama_lokasi, kondisi, count in rows:
+        summary = summaries.get(location_id)
+        if summary is None:
+            summary = LocationSummary(
+                location_id=location_id,
+                kode_lokasi=kode_lokasi,
+                nama_lokasi=nama_lokasi,
+                total_assets=0,
+                assets_by_condition={condition.value: 0 for condition in AssetCondition},
+            )
+            summaries[location_id] = summary
+        if kondisi is not None and count:
+            summary.assets_by_condition[kondisi.value] = count
+            summary.total_assets += count
+    return list(summaries.values())
+
+
+def get_location_summaries(session: Session) -> List[LocationSummary]:
+    """One row per location and condition, independent of the number of assets."""
+    return _to_summaries(session.exec(_summary_statement()).all())
+
+
+async def get_location_summaries_async(session: AsyncSession) -> List[LocationSummary]:
+    return _to_summaries((await session.exec(_summary_statement())).all())
+
+
+def reconcile_location_counts(session: Session) -> ReconciliationReport:
+    """Recount active assets, rewrite every counter that drifted and report the differences.
+
+    The EXCLUSIVE lock waits for in-flight asset writes and holds new ones back until commit,
+    so the recount and the counters describe the same state.
+    """
+    session.execute(text("LOCK TABLE location_asset_counts IN EXCLUSIVE MODE"))
+    actual: Dict[Tuple[int, AssetCondition], int] = {
+        (location_id, AssetCondition[kondisi] if isinstance(kondisi, str) else kondisi): count
+        for location_id, kondisi, count in session.execute(_ACTUAL_COUNTS_SQL).all()
+    }
+    stored = {(row.location_id, row.kondisi_barang): row for row in session.exec(select(LocationAssetCount)).all()}
+
+    drifts: List[CounterDrift] = []
+    for key in sorted(set(actual) | set(stored), key=lambda k: (k[0], k[1].name)):
+        expected = actual.get(key, 0)
+        row = stored.get(key)
+        current = row.asset_count if row is not None else 0
+        if expected == current:
+            continue
+        drifts.append(CounterDrift(location_id=key[0], kondisi_barang=key[1], stored=current, actual=expected))
+        if row is None:
+            session.add(LocationAssetCount(location_id=key[0], kondisi_barang=key[1], asset_count=expected))
+        else:
+            row.asset_count = expected
+    session.commit()
+
+    for drift in drifts:
+        logger.warning(
+            f"Location counter drift at location {drift.location_id}/{drift.kondisi_barang.value}: "
+            f"stored {drift.stored}, actual {drift.actual}"
+        )
+    return ReconciliationReport(counters_checked=len(set(actual) | set(stored)), drifts=drifts)
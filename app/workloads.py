@@ -0,0 +1,51 @@
+"""Named workload classes and their per-transaction statement timeouts."""
+
+from enum import Enum
+from typing import Any, Dict
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection
+from sqlmodel import Session
+
+from app.config import env_int
+
+
+class Workload(str, Enum):
+    INTERACTIVE = "interactive"
+    REPORT = "report"
+    BULK_IMPORT = "bulk_import"
+    MAINTENANCE = "maintenance"
+
+
+# Milliseconds, 0 disables the timeout. Override with APP_DB_STATEMENT_TIMEOUT_<WORKLOAD>.
+_DEFAULT_TIMEOUTS_MS: Dict[Workload, int] = {
+    Workload.INTERACTIVE: 1000,
+    Workload.REPORT: 30_000,
+    Workload.BULK_IMPORT: 300_000,
+    Workload.MAINTENANCE: 600_000,
+}
+
+STATEMENT_TIMEOUTS_MS: Dict[Workload, int] = {
+    workload: env_int(f"APP_DB_STATEMENT_TIMEOUT_{workload.name}", default)
+    for workload, default in _DEFAULT_TIMEOUTS_MS.items()
+}
+
+# Connections are opened with this timeout, so interactive sessions need no extra round trip
+DEFAULT_WORKLOAD = Workload.INTERACTIVE
+
+
+def statement_timeout_ms(workload: Workload) -> int:
+    return STATEMENT_TIMEOUTS_MS[workload]
+
+
+def session_info(workload: Workload) -> Dict[str, Any]:
+    return {"workload": workload}
+
+
+@event.listens_for(Session, "after_begin")
+def _apply_statement_timeout(session: Session, transaction: Any, connection: Connection) -> None:
+    workload = session.info.get("workload", DEFAULT_WORKLOAD)
+    if workload == DEFAULT_WORKLOAD:
+        return
+    # SET LOCAL ends with the transaction, the pooled connection goes back with the default timeout
+    connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(statement_timeout_ms(workload))}")
@@ -0,0 +1,82 @@
+"""Time to build AssetResponse for N assets: lazy ORM objects, ORM objects with the list loader profile,
+and the projection query.
+
+Usage: python -m benchmarks.asset_responses --assets 10000
+"""
+
+import argparse
+import logging
+import time
+from typing import Callable, List
+
+from sqlalchemy import event
+from sqlmodel import Session, col, select
+
+from app.database import ENGINE, create_tables, get_session
+from app.loading import LoadProfile, with_profile
+from app.models import Asset, AssetResponse
+from app.responses import get_asset_responses, response_from_asset
+from app.workloads import Workload
+from benchmarks import seed
+
+logger = logging.getLogger(__name__)
+
+
+def orm_path(session: Session, asset_ids: List[int]) -> List[AssetResponse]:
+    assets = session.exec(select(Asset).where(col(Asset.id).in_(asset_ids)).order_by(col(Asset.id))).all()
+    return [response_from_asset(asset) for asset in assets]
+
+
+def orm_list_path(session: Session, asset_ids: List[int]) -> List[AssetResponse]:
+    statement = select(Asset).where(col(Asset.id).in_(asset_ids)).order_by(col(Asset.id))
+    assets = session.exec(with_profile(statement, LoadProfile.LIST)).all()
+    return [response_from_asset(asset) for asset in assets]
+
+
+def projection_path(session: Session, asset_ids: List[int]) -> List[AssetResponse]:
+    return get_asset_responses(session, asset_ids)
+
+
+def measure(name: str, path: Callable[[Session, List[int]], List[AssetResponse]], asset_ids: List[int]) -> None:
+    statements = 0
+
+    def count(*_args) -> None:
+        nonlocal statements
+        statements += 1
+
+    event.listen(ENGINE, "before_cursor_execute", count)
+    try:
+        # a fresh session each run so the identity map does not carry loaded rows over
+        with get_session() as session:
+            started = time.perf_counter()
+            responses = path(session, asset_ids)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+    finally:
+        event.remove(ENGINE, "before_cursor_execute", count)
+    logger.info(f"{name:<10} {len(responses)} responses  {elapsed_ms:.1f} ms  {statements} statements")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--assets", type=int, default=10_000)
+    parser.add_argument("--keep", action="store_true", help="leave the seeded rows in place")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    create_tables()
+    with get_session(Workload.BULK_IMPORT) as session:
+        seed.clear(session)
+        seed.seed(session, assets=args.assets, movements_per_asset=0)
+        asset_ids = list(session.exec(select(Asset.id).where(col(Asset.kode).startswith(seed.PREFIX))).all())
+    try:
+        # the first run of each path warms the connection pool and statement caches
+        for name, path in (("orm", orm_path), ("orm-list", orm_list_path), ("projection", projection_path)) * 2:
+            measure(name, path, asset_ids)
+    finally:
+        if not args.keep:
+            with get_session(Workload.BULK_IMPORT) as session:
+                seed.clear(session)
+
+
+if __name__ == "__main__":
+    main()
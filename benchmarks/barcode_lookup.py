@@ -0,0 +1,78 @@
+"""Latency percentiles of the scanner lookup path, database-only versus cached.
+
+Usage: python -m benchmarks.barcode_lookup --assets 100000 --lookups 5000
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+
+from app.database import DATABASE_URL, create_tables, get_async_session, get_session
+from app.lookup import AssetLookup, LookupCache
+from app.models import LookupStats
+from app.notify import ChangeListener
+from app.workloads import Workload
+from benchmarks import seed
+
+logger = logging.getLogger(__name__)
+
+
+async def measure(lookup: AssetLookup, codes: list[str]) -> LookupStats:
+    async with get_async_session() as session:
+        for code in codes:
+            await lookup.lookup(session, code)
+    return lookup.stats()
+
+
+async def run(assets: int, lookups: int) -> None:
+    rng = random.Random(7)
+    # scanners mostly send barcodes, sometimes a typed kode
+    codes = [
+        f"{seed.PREFIX}B{i:08d}" if rng.random() < 0.8 else f"{seed.PREFIX}{i:08d}"
+        for i in (rng.randrange(assets) for _ in range(lookups))
+    ]
+
+    uncached = AssetLookup(LookupCache(max_size=0, ttl=0), ChangeListener())
+    stats = await measure(uncached, codes)
+    logger.info(f"database  p50={stats.p50_ms:.3f} ms  p95={stats.p95_ms:.3f} ms  p99={stats.p99_ms:.3f} ms")
+
+    listener = ChangeListener()
+    cached = AssetLookup(LookupCache(max_size=assets, ttl=300), listener)
+    listener.start(DATABASE_URL)
+    try:
+        while not listener.connected:
+            await asyncio.sleep(0.05)
+        await measure(cached, codes)  # warm up
+        cached.reset_stats()
+        stats = await measure(cached, codes)
+    finally:
+        await listener.stop()
+    logger.info(
+        f"cached    p50={stats.p50_ms:.3f} ms  p95={stats.p95_ms:.3f} ms  p99={stats.p99_ms:.3f} ms  "
+        f"hits={stats.hits} misses={stats.misses}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--assets", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=5_000)
+    parser.add_argument("--keep", action="store_true", help="leave the seeded rows in place")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    create_tables()
+    with get_session(Workload.BULK_IMPORT) as session:
+        seed.clear(session)
+        seed.seed(session, assets=args.assets, movements_per_asset=0)
+    try:
+        asyncio.run(run(args.assets, args.lookups))
+    finally:
+        if not args.keep:
+            with get_session(Workload.BULK_IMPORT) as session:
+                seed.clear(session)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Requests per second through the security headers middleware, BaseHTTPMiddleware versus pure ASGI.
+
+Requests go to an in-process app over httpx's ASGI transport, so the numbers show the
+middleware's own cost without network or server noise.
+
+Usage: python -m benchmarks.middleware --requests 5000 --concurrency 20
+"""
+
+import argparse
+import asyncio
+import logging
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+import httpx
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse
+from starlette.routing import Mount, Route
+from starlette.staticfiles import StaticFiles
+
+from app.middleware import SECURITY_HEADERS, SecurityHeadersMiddleware
+
+logger = logging.getLogger(__name__)
+
+
+class BaseHTTPSecurityHeadersMiddleware(BaseHTTPMiddleware):
+    """The previous implementation, kept here as the baseline."""
+
+    async def dispatch(self, request, call_next):
+        response = await call_next(request)
+        for name, value in SECURITY_HEADERS.items():
+            response.headers[name] = value
+        return response
+
+
+async def health(request):
+    return JSONResponse({"status": "healthy", "service": "nicegui-app"})
+
+
+def build_app(static_dir: Path, middleware: Optional[type]) -> Starlette:
+    return Starlette(
+        routes=[Route("/health", health), Mount("/static", StaticFiles(directory=static_dir))],
+        middleware=[] if middleware is None else [Middleware(middleware)],
+    )
+
+
+async def measure(app: Starlette, path: str, requests: int, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def worker(count: int) -> None:
+            for _ in range(count):
+                response = await client.get(path)
+                response.raise_for_status()
+
+        await worker(min(requests, 100))  # warm up
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(requests // concurrency) for _ in range(concurrency)))
+        return (requests // concurrency * concurrency) / (time.perf_counter() - started)
+
+
+async def run(requests: int, concurrency: int, static_size: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        static_dir = Path(directory)
+        (static_dir / "image.bin").write_bytes(b"\0" * static_size)
+        variants = [
+            ("none", None),
+            ("base-http", BaseHTTPSecurityHeadersMiddleware),
+            ("asgi", SecurityHeadersMiddleware),
+        ]
+        for path in ("/health", "/static/image.bin"):
+            for name, middleware in variants:
+                rate = await measure(build_app(static_dir, middleware), path, requests, concurrency)
+                logger.info(f"{path:<18} {name:<10} {rate:8.0f} req/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5_000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--static-size", type=int, default=256 * 1024, help="bytes of the static file")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    asyncio.run(run(args.requests, args.concurrency, args.static_size))
+
+
+if __name__ == "__main__":
+    main()
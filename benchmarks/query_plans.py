@@ -0,0 +1,220 @@
+"""Check that the main list/summary/history queries are served by the model indexes.
+
+Usage: python -m benchmarks.query_plans --assets 500000 [--keep]
+
+Seeds a synthetic register, runs EXPLAIN (ANALYZE, FORMAT JSON) on each query and logs the
+indexes each plan touches together with the median execution time.
+"""
+
+import argparse
+import logging
+import statistics
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Set
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql import ClauseElement, Executable, Select
+from sqlmodel import Session
+
+from app.database import create_tables, get_session
+from app.models import Asset, AssetCondition, AssetFilter, AssetMovement
+from app.pagination import AssetSort, encode_cursor, keyset_statement
+from app.specs import SpecFilter, SpecOp, filter_by_spec
+from app.workloads import Workload
+from benchmarks import seed
+
+logger = logging.getLogger(__name__)
+
+
+def _first_seeded(session: Session, column: Any) -> Any:
+    return session.execute(select(func.min(column)).where(Asset.kode.startswith(seed.PREFIX))).scalar_one()  # type: ignore[attr-defined]
+
+
+def room_list(session: Session) -> Select:
+    room_id = _first_seeded(session, Asset.room_id)
+    return (
+        select(Asset)
+        .where(Asset.room_id == room_id, Asset.is_active)
+        .order_by(Asset.kode)  # type: ignore[arg-type]
+        .limit(50)
+    )
+
+
+def location_summary(session: Session) -> Select:
+    location_id = _first_seeded(session, Asset.location_id)
+    return (
+        select(Asset.kondisi_barang, func.count())
+        .where(Asset.location_id == location_id, Asset.is_active)
+        .group_by(Asset.kondisi_barang)
+    )
+
+
+def category_list(session: Session) -> Select:
+    category_id = _first_seeded(session, Asset.category_id)
+    return select(Asset.id, Asset.kode).where(Asset.category_id == category_id, Asset.is_active)
+
+
+def attention_list(session: Session) -> Select:
+    location_id = _first_seeded(session, Asset.location_id)
+    return select(Asset.id, Asset.kode, Asset.kondisi_barang).where(
+        Asset.location_id == location_id, Asset.is_active, Asset.kondisi_barang != AssetCondition.BAIK
+    )
+
+
+def movement_history(session: Session) -> Select:
+    asset_id = _first_seeded(session, Asset.id)
+    return (
+        select(AssetMovement)
+        .where(AssetMovement.asset_id == asset_id)
+        .order_by(AssetMovement.tanggal_movement.desc())  # type: ignore[attr-defined]
+        .limit(50)
+    )
+
+
+def movement_period(session: Session) -> Select:
+    end = datetime(2026, 1, 1)
+    return (
+        select(AssetMovement.movement_type, func.count())
+        .where(AssetMovement.tanggal_movement >= end - timedelta(days=30), AssetMovement.tanggal_movement < end)
+        .group_by(AssetMovement.movement_type)
+    )
+
+
+def keyset_page(session: Session) -> Select:
+    location_id = _first_seeded(session, Asset.location_id)
+    filters = AssetFilter(location_id=location_id)
+    # a deep page: the cursor of the 1000th newest asset of the location
+    first = session.execute(
+        keyset_statement(filters, AssetSort.UPDATED_DESC, limit=1)
+        .with_only_columns(Asset.updated_at, Asset.id)
+        .offset(999)
+    ).first()
+    after = encode_cursor(AssetSort.UPDATED_DESC, first.updated_at, first.id) if first else None
+    return keyset_statement(filters, AssetSort.UPDATED_DESC, limit=50, after=after)
+
+
+def spec_range(session: Session) -> Select:
+    return filter_by_spec(select(Asset.id), [SpecFilter(key="ram_gb", op=SpecOp.GE, value=32)])
+
+
+QUERIES: Dict[str, Callable[[Session], Select]] = {
+    "room_list": room_list,
+    "location_summary": location_summary,
+    "category_list": category_list,
+    "attention_list": attention_list,
+    "movement_history": movement_history,
+    "movement_period": movement_period,
+    "spec_range": spec_range,
+    "keyset_page": keyset_page,
+}
+
+# any of the listed indexes is a good plan; at small volumes the planner may prefer the broader one
+EXPECTED_INDEXES: Dict[str, Set[str]] = {
+    "room_list": {"ix_assets_room_kode_active"},
+    "location_summary": {"ix_assets_location_kondisi_active"},
+    "category_list": {"ix_assets_category_active"},
+    "attention_list": {"ix_assets_kondisi_attention", "ix_assets_location_kondisi_active"},
+    "movement_history": {"ix_asset_movements_asset_tanggal"},
+    "movement_period": {"ix_asset_movements_tanggal_type"},
+    "spec_range": {"ix_assets_spesifikasi"},
+    "keyset_page": {"ix_assets_location_updated_active"},
+}
+
+# period queries on the partitioned movement log must be pruned to the months they cover; a pruned
+# month can be small enough that a sequential scan of it beats the index
+PRUNED_QUERIES: Dict[str, int] = {"movement_period": 2}
+
+
+def _walk(plan: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _walk(child)
+
+
+class Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement: Select, analyze: bool = False) -> None:
+        self.statement = statement
+        self.analyze = analyze
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element: Explain, compiler: Any, **kw: Any) -> str:
+    # compiled through the dialect, so bind parameters keep their type processing (JSONB, enums, ...)
+    options = "ANALYZE, FORMAT JSON" if element.analyze else "FORMAT JSON"
+    return f"EXPLAIN ({options}) {compiler.process(element.statement, **kw)}"
+
+
+def explain(session: Session, statement: Select, analyze: bool = False) -> Dict[str, Any]:
+    return session.execute(Explain(statement, analyze)).scalar_one()[0]
+
+
+def plan_indexes(session: Session, plan: Dict[str, Any]) -> Set[str]:
+    """Indexes the plan touches, with indexes on partitions reported as the partitioned index they belong to."""
+    names = [node["Index Name"] for node in _walk(plan["Plan"]) if "Index Name" in node]
+    if not names:
+        return set()
+    roots = session.execute(
+        text(
+            "SELECT coalesce(pg_partition_root(to_regclass(name)), to_regclass(name))::text FROM unnest(:names) AS name"
+        ),
+        {"names": names},
+    ).scalars()
+    return set(roots)
+
+
+def plan_relations(plan: Dict[str, Any]) -> Set[str]:
+    return {node["Relation Name"] for node in _walk(plan["Plan"]) if "Relation Name" in node}
+
+
+def plan_ok(session: Session, name: str, plan: Dict[str, Any]) -> bool:
+    if name in PRUNED_QUERIES:
+        return len(plan_relations(plan)) <= PRUNED_QUERIES[name]
+    return bool(EXPECTED_INDEXES[name] & plan_indexes(session, plan))
+
+
+def run(session: Session, repeat: int) -> List[Dict[str, Any]]:
+    results = []
+    for name, build in QUERIES.items():
+        statement = build(session)
+        timings = [explain(session, statement, analyze=True)["Execution Time"] for _ in range(repeat)]
+        plan = explain(session, statement)
+        indexes = plan_indexes(session, plan)
+        results.append(
+            {
+                "query": name,
+                "indexes": sorted(indexes),
+                "uses_expected_index": plan_ok(session, name, plan),
+                "median_ms": statistics.median(timings),
+            }
+        )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--assets", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--keep", action="store_true", help="leave the seeded rows in place")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    create_tables()
+    with get_session(Workload.BULK_IMPORT) as session:
+        seed.clear(session)
+        seed.seed(session, assets=args.assets)
+        try:
+            for result in run(session, args.repeat):
+                status = "ok" if result["uses_expected_index"] else "MISSING INDEX"
+                logger.info(
+                    f"{result['query']:<18} {result['median_ms']:>9.3f} ms  {status:<13} {', '.join(result['indexes'])}"
+                )
+        finally:
+            if not args.keep:
+                seed.clear(session)
+
+
+if __name__ == "__main__":
+    main()
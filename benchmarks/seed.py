@@ -0,0 +1,189 @@
+"""Synthetic inventory data for benchmarks. Everything seeded here uses the BENCH- code prefix."""
+
+import random
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List
+
+from sqlalchemy import delete, insert, select, text
+from sqlmodel import Session
+
+from app.models import (
+    Asset,
+    AssetCategory,
+    AssetCondition,
+    AssetMovement,
+    Location,
+    MaintenanceRecord,
+    MovementType,
+    Room,
+    User,
+    UserRole,
+)
+from app.partitions import ensure_movement_partitions
+
+PREFIX = "BENCH-"
+BATCH_SIZE = 5000
+CONDITIONS = list(AssetCondition)
+# mostly good, a tail of damaged and lost items like a real register
+CONDITION_WEIGHTS = [80, 12, 6, 2]
+ITEM_NAMES = ["Laptop", "Proyektor", "Meja Siswa", "Kursi Guru", "Lemari Arsip", "Printer", "Papan Tulis", "AC Split"]
+# laptop memory; high-end machines are a small tail, as in a real register
+RAM_SIZES = [4, 8, 16, 32]
+RAM_WEIGHTS = [30, 40, 25, 5]
+BRANDS = ["Lenovo ThinkPad", "Epson EB", "Olympic", "Chitose", "Brother", "Canon Pixma", "Sharp", "Daikin"]
+
+
+def _batched(rows: List[Dict[str, Any]]):
+    for start in range(0, len(rows), BATCH_SIZE):
+        yield rows[start : start + BATCH_SIZE]
+
+
+def clear(session: Session) -> None:
+    asset_ids = select(Asset.id).where(Asset.kode.startswith(PREFIX))  # type: ignore[attr-defined]
+    session.execute(delete(AssetMovement).where(AssetMovement.asset_id.in_(asset_ids)))  # type: ignore[attr-defined]
+    session.execute(delete(MaintenanceRecord).where(MaintenanceRecord.asset_id.in_(asset_ids)))  # type: ignore[attr-defined]
+    session.execute(delete(Asset).where(Asset.kode.startswith(PREFIX)))  # type: ignore[attr-defined]
+    location_ids = select(Location.id).where(Location.kode_lokasi.startswith(PREFIX))  # type: ignore[attr-defined]
+    session.execute(delete(Room).where(Room.location_id.in_(location_ids)))  # type: ignore[attr-defined]
+    session.execute(delete(Location).where(Location.kode_lokasi.startswith(PREFIX)))  # type: ignore[attr-defined]
+    session.execute(delete(AssetCategory).where(AssetCategory.kode_kategori.startswith(PREFIX)))  # type: ignore[attr-defined]
+    session.execute(delete(User).where(User.username.startswith(PREFIX)))  # type: ignore[attr-defined]
+    session.commit()
+
+
+def seed(
+    session: Session,
+    assets: int,
+    locations: int = 50,
+    rooms_per_location: int = 20,
+    categories: int = 30,
+    movements_per_asset: int = 2,
+    seed_value: int = 42,
+) -> None:
+    """Insert a deterministic synthetic register of the given size and ANALYZE the tables."""
+    rng = random.Random(seed_value)
+    now = datetime(2026, 1, 1)
+
+    user_id = session.execute(
+        insert(User)
+        .values(
+            username=f"{PREFIX}admin",
+            email="bench-admin@example.com",
+            full_name="Benchmark Admin",
+            password_hash="x",
+            role=UserRole.ADMIN,
+            is_active=True,
+            created_at=now,
+            updated_at=now,
+        )
+        .returning(User.id)  # type: ignore[arg-type]
+    ).scalar_one()
+
+    location_ids = list(
+        session.execute(
+            insert(Location).returning(Location.id),  # type: ignore[arg-type]
+            [
+                {
+                    "kode_lokasi": f"{PREFIX}L{i:04d}",
+                    "nama_lokasi": f"Gedung {i}",
+                    "deskripsi": "",
+                    "is_active": True,
+                    "created_at": now,
+                }
+                for i in range(locations)
+            ],
+        ).scalars()
+    )
+    room_rows = [
+        {
+            "nama_ruang": f"Ruang {location_id}-{j}",
+            "location_id": location_id,
+            "deskripsi": "",
+            "is_active": True,
+            "created_at": now,
+        }
+        for location_id in location_ids
+        for j in range(rooms_per_location)
+    ]
+    room_ids = list(session.execute(insert(Room).returning(Room.id, Room.location_id), room_rows).all())  # type: ignore[arg-type]
+    rooms_by_location: Dict[int, List[int]] = {}
+    for room_id, location_id in room_ids:
+        rooms_by_location.setdefault(location_id, []).append(room_id)
+
+    category_ids = list(
+        session.execute(
+            insert(AssetCategory).returning(AssetCategory.id),  # type: ignore[arg-type]
+            [
+                {
+                    "kode_kategori": f"{PREFIX}C{i:03d}",
+                    "nama_kategori": f"Kategori {i}",
+                    "deskripsi": "",
+                    "is_active": True,
+                    "created_at": now,
+                }
+                for i in range(categories)
+            ],
+        ).scalars()
+    )
+
+    asset_rows: List[Dict[str, Any]] = []
+    for i in range(assets):
+        location_id = rng.choice(location_ids)
+        item = rng.randrange(len(ITEM_NAMES))
+        asset_rows.append(
+            {
+                "kode": f"{PREFIX}{i:08d}",
+                "barcode": f"{PREFIX}B{i:08d}",
+                "nomor_aset": f"{PREFIX}N{i:08d}",
+                "nama_barang": f"{ITEM_NAMES[item]} {i}",
+                "merk_tipe": BRANDS[item],
+                "kode_barang": f"02.06.{item:02d}",
+                "tahun_anggaran": rng.randint(2010, 2026),
+                "rupiah_satuan": Decimal(rng.randint(100, 50000)) * Decimal("1000"),
+                "tanggal_perolehan": date(2010, 1, 1) + timedelta(days=rng.randrange(5800)),
+                "location_id": location_id,
+                "room_id": rng.choice(rooms_by_location[location_id]),
+                "pemegang_barang": f"Pegawai {rng.randrange(500)}",
+                "kondisi_barang": rng.choices(CONDITIONS, CONDITION_WEIGHTS)[0],
+                "category_id": rng.choice(category_ids),
+                "gambar": None,
+                "keterangan": "",
+                "spesifikasi": {"ram_gb": rng.choices(RAM_SIZES, RAM_WEIGHTS)[0]} if item == 0 else {},
+                # a few percent of the register has been written off
+                "is_active": rng.random() > 0.05,
+                "created_at": now,
+                "updated_at": now - timedelta(minutes=rng.randrange(500_000)),
+                "created_by": user_id,
+                "updated_by": user_id,
+            }
+        )
+
+    asset_ids: List[int] = []
+    for batch in _batched(asset_rows):
+        asset_ids.extend(session.execute(insert(Asset).returning(Asset.id), batch).scalars())  # type: ignore[arg-type]
+
+    movement_rows: List[Dict[str, Any]] = []
+    for asset_id in asset_ids:
+        for _ in range(movements_per_asset):
+            movement_rows.append(
+                {
+                    "asset_id": asset_id,
+                    "movement_type": rng.choice(list(MovementType)),
+                    "from_location_id": rng.choice(location_ids),
+                    "to_location_id": rng.choice(location_ids),
+                    "tanggal_movement": now - timedelta(minutes=rng.randrange(3_000_000)),
+                    "keterangan": "",
+                    "user_id": user_id,
+                    "created_at": now,
+                }
+            )
+    for batch in _batched(movement_rows):
+        session.execute(insert(AssetMovement), batch)
+    # the history lands in the default partition; give each month its own
+    ensure_movement_partitions(session.connection())
+
+    session.commit()
+    for table in ["users", "locations", "rooms", "asset_categories", "assets", "asset_movements"]:
+        session.execute(text(f"ANALYZE {table}"))
+    session.commit()
@@ -1,26 +1,19 @@
 import logging
 import os
-from app.startup import startup
+from app.api import router as api_router
+from app.health import router as health_router
+from app.metrics import MetricsMiddleware, router as metrics_router
+from app.middleware import CompressionMiddleware, SecurityHeadersMiddleware, remove_middleware
+from app.startup import start_services, startup, stop_services
 from nicegui import app, ui
 from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.middleware.cors import CORSMiddleware
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
 
 # configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
 
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request, call_next):
-        response = await call_next(request)
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-        response.headers["Content-Security-Policy"] = "default-src 'self' http: https: data: blob: 'unsafe-inline'; frame-ancestors https://app.build/ https://www.app.build/ https://staging.app.build/"
-        return response
-
-
 @app.get("/health")
 async def health():
     return {"status": "healthy", "service": "nicegui-app"}
@@ -29,11 +22,24 @@ async def health():
 # suppress sqlalchemy engine logs below warning level
 logging.getLogger("sqlalchemy.engine.Engine").setLevel(logging.WARNING)
 
+# ui.run() adds NiceGUI's own gzip outside all middleware; it would compress what CompressionMiddleware skips
+app.on_startup(lambda: remove_middleware(app, GZipMiddleware))
 app.on_startup(startup)
+app.on_startup(start_services)
+app.on_shutdown(stop_services)
+app.include_router(api_router)
+app.include_router(health_router)
+app.include_router(metrics_router)
+
+# Brotli/gzip above a size threshold, except for already compressed content types
+app.add_middleware(CompressionMiddleware)
 
 # Add security headers middleware
 app.add_middleware(SecurityHeadersMiddleware)
 
+# outermost, so latency includes compression and the other middleware
+app.add_middleware(MetricsMiddleware)
+
 ui.run(
     host="0.0.0.0",
     port=int(os.environ.get("NICEGUI_PORT", 8000)),
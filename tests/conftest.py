@@ -1,5 +1,14 @@
-from typing import Generator
+import asyncio
+from datetime import date
+from decimal import Decimal
+from typing import Any, Awaitable, Callable, Dict, Generator
 import pytest
+from sqlalchemy import delete, select
+from sqlmodel import Session
+from app.database import ASYNC_ENGINE, create_tables, get_session, migrate
+from app import models
+from app.models import Asset, AssetMovement, Location, MaintenanceRecord, Room
+from app.query_budget import query_budget
 from app.startup import startup
 from nicegui.testing import User
 
@@ -10,3 +19,110 @@ pytest_plugins = ["nicegui.testing.plugin"]
 def user(user: User) -> Generator[User, None, None]:
     startup()
     yield user
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    # @pytest.mark.query_budget(max_statements, max_repeats=None) fails a test whose body, fixtures aside,
+    # runs more SQL
+    marker = item.get_closest_marker("query_budget")
+    if marker is None:
+        return (yield)
+    with query_budget(*marker.args, name=item.nodeid, **marker.kwargs):
+        return (yield)
+
+
+async def _wait_for(predicate: Callable[[], bool], timeout: float = 5.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline, "condition not reached in time"
+        await asyncio.sleep(0.02)
+
+
+@pytest.fixture
+def wait_for() -> Callable[..., Awaitable[None]]:
+    """Poll until a predicate holds, e.g. until a NOTIFY has reached a listener."""
+    return _wait_for
+
+
+@pytest.fixture(autouse=True)
+async def dispose_async_engine():
+    # asyncpg connections are bound to the event loop that opened them, and each test gets a new loop
+    yield
+    await ASYNC_ENGINE.dispose()
+
+
+class Inventory:
+    """A user and a location to hang test assets off; everything under them is removed afterwards."""
+
+    def __init__(self, session: Session, prefix: str) -> None:
+        self.session = session
+        self.prefix = prefix
+        self.user = models.User(
+            username=f"{prefix}user", email=f"{prefix.lower()}user@example.com", full_name="Test", password_hash="x"
+        )
+        self.location = Location(kode_lokasi=f"{prefix}LOC", nama_lokasi=f"Lokasi {prefix}")
+        session.add_all([self.user, self.location])
+        session.flush()
+
+    @property
+    def user_id(self) -> int:
+        assert self.user.id is not None
+        return self.user.id
+
+    @property
+    def location_id(self) -> int:
+        assert self.location.id is not None
+        return self.location.id
+
+    def add_asset(self, kode: str, **fields: Any) -> Asset:
+        values: Dict[str, Any] = {
+            "kode": f"{self.prefix}{kode}",
+            "nomor_aset": f"N-{self.prefix}{kode}",
+            "nama_barang": f"Barang {kode}",
+            "merk_tipe": "Generik",
+            "kode_barang": "02.06",
+            "tahun_anggaran": 2024,
+            "rupiah_satuan": Decimal("1000000"),
+            "tanggal_perolehan": date(2024, 1, 10),
+            "location_id": self.location_id,
+            "pemegang_barang": "Petugas",
+            "created_by": self.user_id,
+            "updated_by": self.user_id,
+        }
+        values.update(fields)
+        asset = Asset(**values)
+        self.session.add(asset)
+        self.session.flush()
+        return asset
+
+    def cleanup(self) -> None:
+        session = self.session
+        session.rollback()
+        assets = select(Asset.id).where(Asset.kode.startswith(self.prefix))  # type: ignore[attr-defined]
+        session.execute(delete(AssetMovement).where(AssetMovement.asset_id.in_(assets)))  # type: ignore[attr-defined]
+        session.execute(delete(MaintenanceRecord).where(MaintenanceRecord.asset_id.in_(assets)))  # type: ignore[attr-defined]
+        session.execute(delete(Asset).where(Asset.kode.startswith(self.prefix)))  # type: ignore[attr-defined]
+        locations = select(Location.id).where(Location.kode_lokasi.startswith(self.prefix))  # type: ignore[attr-defined]
+        session.execute(delete(Room).where(Room.location_id.in_(locations)))  # type: ignore[attr-defined]
+        session.execute(delete(Location).where(Location.kode_lokasi.startswith(self.prefix)))  # type: ignore[attr-defined]
+        session.execute(delete(models.User).where(models.User.username.startswith(self.prefix)))  # type: ignore[attr-defined]
+        session.commit()
+
+
+@pytest.fixture(scope="session")
+def migrated() -> None:
+    create_tables()
+    migrate()
+
+
+@pytest.fixture
+def inventory(request, migrated) -> Generator[Inventory, None, None]:
+    create_tables()
+    prefix = f"T{abs(hash(request.node.nodeid)) % 10**6}-"
+    with get_session() as session:
+        inventory = Inventory(session, prefix)
+        try:
+            yield inventory
+        finally:
+            inventory.cleanup()
@@ -0,0 +1,102 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+import pyarrow as pa
+import pytest
+from sqlalchemy import delete
+
+from app import archive
+from app.models import AssetCondition, AssetMovement, MaintenanceRecord, MovementType
+from app.reports import get_movement_report, rebuild_movement_rollups
+
+
+def test_archive_schema_follows_model():
+    schema = archive._arrow_schema(MaintenanceRecord)
+    assert schema.field("tanggal_maintenance").type == pa.date32()
+    assert schema.field("biaya").type == pa.decimal128(15, 2)
+    assert schema.field("kondisi_sebelum").type == pa.string()
+
+
+@pytest.mark.sqlmodel
+def test_archive_moves_old_rows_and_history_reads_both(inventory, tmp_path):
+    session = inventory.session
+    asset = inventory.add_asset("1")
+    for when in (datetime(1970, 2, 3, 9, 30), datetime(2024, 6, 1)):
+        session.add(
+            AssetMovement(
+                asset_id=asset.id,
+                movement_type=MovementType.MUTASI,
+                to_location_id=inventory.location_id,
+                tanggal_movement=when,
+                user_id=inventory.user_id,
+            )
+        )
+    session.add(
+        MaintenanceRecord(
+            asset_id=asset.id,
+            tanggal_maintenance=date(1970, 5, 1),
+            jenis_maintenance="Servis",
+            deskripsi="Ganti kipas",
+            biaya=Decimal("150000.00"),
+            teknisi="Budi",
+            kondisi_sebelum=AssetCondition.RUSAK_RINGAN,
+            kondisi_sesudah=AssetCondition.BAIK,
+            created_by=inventory.user_id,
+        )
+    )
+    session.commit()
+
+    results = {r.table_name: r for r in archive.archive_before(session, date(1975, 1, 1), tmp_path)}
+    assert results["asset_movements"].rows == 1
+    assert results["maintenance_records"].rows == 1
+    assert session.query(AssetMovement).filter(AssetMovement.asset_id == asset.id).count() == 1
+
+    movements = archive.history(session, AssetMovement, asset_id=asset.id, directory=tmp_path)
+    assert [m.tanggal_movement for m in movements] == [datetime(2024, 6, 1), datetime(1970, 2, 3, 9, 30)]
+    assert movements[1].movement_type == MovementType.MUTASI
+    assert (
+        archive.history(session, AssetMovement, asset_id=asset.id, end=date(1971, 1, 1), directory=tmp_path)[0].id
+        == movements[1].id
+    )
+
+    (record,) = archive.history(
+        session, MaintenanceRecord, asset_id=asset.id, start=date(1970, 1, 1), directory=tmp_path
+    )
+    assert (record.biaya, record.kondisi_sesudah) == (Decimal("150000.00"), AssetCondition.BAIK)
+    # the archived movement is still part of the period reports, also after a rebuild
+    before = get_movement_report(session, date(1970, 2, 1), date(1970, 2, 28)).total_mutasi
+    assert before >= 1
+    rebuild_movement_rollups(session, tmp_path)
+    assert get_movement_report(session, date(1970, 2, 1), date(1970, 2, 28)).total_mutasi == before
+
+
+@pytest.mark.sqlmodel
+def test_leftover_partial_file_is_finished_only_once_its_rows_are_gone(inventory, tmp_path):
+    session = inventory.session
+    asset = inventory.add_asset("1")
+    movement = AssetMovement(
+        asset_id=asset.id,
+        movement_type=MovementType.MASUK,
+        to_location_id=inventory.location_id,
+        tanggal_movement=datetime(1970, 3, 1),
+        user_id=inventory.user_id,
+    )
+    session.add(movement)
+    session.commit()
+    directory = archive.table_dir(AssetMovement, tmp_path)
+    directory.mkdir(parents=True)
+    partial = directory / "asset_movements-crashed.parquet.partial"
+    archive._write_archive(session, AssetMovement, date(1970, 3, 2), partial)
+    session.rollback()
+
+    # the rows are still hot, so the crashed run did not commit and its file stays unused
+    archive._finish_partial(session, AssetMovement, partial)
+    assert partial.exists()
+
+    session.execute(delete(AssetMovement).where(AssetMovement.asset_id == asset.id))
+    session.commit()
+    archive._finish_partial(session, AssetMovement, partial)
+    assert not partial.exists()
+    assert [
+        m.tanggal_movement for m in archive.history(session, AssetMovement, asset_id=asset.id, directory=tmp_path)
+    ] == [datetime(1970, 3, 1)]
@@ -0,0 +1,35 @@
+import pytest
+from fastapi import Depends, FastAPI, Request
+from starlette.middleware.sessions import SessionMiddleware
+from starlette.testclient import TestClient
+
+from app.auth import USER_ID_KEY, current_user_id
+
+
+def make_client() -> TestClient:
+    app = FastAPI()
+
+    @app.post("/sign-in/{user_id}")
+    def sign_in(user_id: int, request: Request):
+        request.session[USER_ID_KEY] = user_id
+
+    @app.get("/me")
+    def me(user_id: int = Depends(current_user_id)):
+        return {"user_id": user_id}
+
+    app.add_middleware(SessionMiddleware, secret_key="test")
+    return TestClient(app)
+
+
+@pytest.mark.sqlmodel
+def test_acting_user_comes_from_the_session(inventory):
+    inventory.session.commit()
+    client = make_client()
+
+    assert client.get("/me", params={"user_id": inventory.user_id}).status_code == 401
+    client.post(f"/sign-in/{inventory.user_id}")
+    assert client.get("/me").json() == {"user_id": inventory.user_id}
+
+    inventory.user.is_active = False
+    inventory.session.commit()
+    assert client.get("/me").status_code == 401
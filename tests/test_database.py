@@ -0,0 +1,111 @@
+import pytest
+from sqlmodel import select, text
+
+from app.database import (
+    ENGINE,
+    create_tables_async,
+    fetch_all_async,
+    get_async_session,
+    get_by_id_async,
+    get_session,
+    migrate,
+    to_async_url,
+)
+from app.models import Location
+from app.workloads import Workload
+
+
+def test_to_async_url_switches_driver_and_sslmode():
+    url = to_async_url("postgresql://user:pw@db.example.com:5432/app?sslmode=require")
+
+    assert url.drivername == "postgresql+asyncpg"
+    assert url.query == {"ssl": "require"}
+    assert url.host == "db.example.com"
+
+
+@pytest.mark.sqlmodel
+async def test_async_session_roundtrip():
+    await create_tables_async()
+
+    async with get_async_session() as session:
+        location = Location(kode_lokasi="ASYNC-01", nama_lokasi="Gudang Async")
+        session.add(location)
+        await session.commit()
+        assert location.id is not None
+        location_id = location.id
+
+    try:
+        fetched = await get_by_id_async(Location, location_id)
+        assert fetched is not None
+        assert fetched.nama_lokasi == "Gudang Async"
+
+        rows = await fetch_all_async(select(Location).where(Location.kode_lokasi == "ASYNC-01"))
+        assert [row.id for row in rows] == [location_id]
+    finally:
+        async with get_async_session() as session:
+            await session.delete(await session.get(Location, location_id))
+            await session.commit()
+
+
+@pytest.mark.sqlmodel
+def test_session_workload_sets_statement_timeout():
+    with get_session() as session:
+        assert session.exec(text("SHOW statement_timeout")).one()[0] == "1s"  # type: ignore[call-overload]
+
+    with get_session(Workload.REPORT) as session:
+        assert session.exec(text("SHOW statement_timeout")).one()[0] == "30s"  # type: ignore[call-overload]
+
+    # SET LOCAL must not leak into the pooled connection
+    with get_session() as session:
+        assert session.exec(text("SHOW statement_timeout")).one()[0] == "1s"  # type: ignore[call-overload]
+
+
+@pytest.mark.sqlmodel
+async def test_async_session_workload_sets_statement_timeout():
+    async with get_async_session(Workload.BULK_IMPORT) as session:
+        result = await session.exec(text("SHOW statement_timeout"))  # type: ignore[call-overload]
+        assert result.one()[0] == "5min"
+
+
+@pytest.mark.sqlmodel
+def test_migrate_builds_missing_indexes(migrated):
+    indexes = ["ix_assets_category_active", "ix_asset_movements_tanggal_type"]
+    with ENGINE.begin() as conn:
+        for name in indexes:
+            conn.execute(text(f"DROP INDEX {name}"))
+
+    migrate()
+
+    with ENGINE.connect() as conn:
+        for name in indexes:
+            valid = conn.execute(
+                text("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"), {"name": name}
+            ).scalar_one()
+            assert valid, name
+        partitions = conn.execute(
+            text(
+                "SELECT count(*) FROM pg_inherits i JOIN pg_index x ON x.indexrelid = i.inhrelid "
+                "WHERE i.inhparent = 'ix_asset_movements_tanggal_type'::regclass AND x.indisvalid"
+            )
+        ).scalar_one()
+        assert partitions >= 1
+
+
+@pytest.mark.sqlmodel
+def test_migrate_sets_declared_on_delete_actions(migrated):
+    action_sql = (
+        "SELECT confdeltype FROM pg_constraint WHERE conrelid = 'assets'::regclass AND conname = 'assets_room_id_fkey'"
+    )
+    with ENGINE.begin() as conn:
+        conn.execute(
+            text(
+                "ALTER TABLE assets DROP CONSTRAINT assets_room_id_fkey, "
+                "ADD CONSTRAINT assets_room_id_fkey FOREIGN KEY (room_id) REFERENCES rooms (id)"
+            )
+        )
+        assert conn.execute(text(action_sql)).scalar_one() == "a"
+
+    migrate()
+
+    with ENGINE.connect() as conn:
+        assert conn.execute(text(action_sql)).scalar_one() == "n"
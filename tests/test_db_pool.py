@@ -0,0 +1,44 @@
+import pytest
+from sqlalchemy import create_engine, exc, text
+
+from app.db_pool import InstrumentedQueuePool, PoolConfig, get_pool_stats
+
+
+def test_pool_config_from_env():
+    env = {
+        "APP_DB_POOL_SIZE": "20",
+        "APP_DB_MAX_OVERFLOW": "5",
+        "APP_DB_POOL_PRE_PING": "true",
+        "APP_DB_POOL_RECYCLE": "1800",
+        "APP_DB_POOL_TIMEOUT": "2.5",
+    }
+
+    config = PoolConfig.from_env(env=env)
+
+    assert config == PoolConfig(size=20, max_overflow=5, pre_ping=True, recycle=1800, timeout=2.5)
+
+
+def test_pool_config_defaults_when_unset():
+    assert PoolConfig.from_env(env={"APP_DB_POOL_SIZE": " "}) == PoolConfig()
+
+
+def test_instrumented_pool_counts_checkouts_and_timeouts():
+    config = PoolConfig(size=1, max_overflow=0, timeout=0.05)
+    engine = create_engine("sqlite://", **config.engine_kwargs(InstrumentedQueuePool))
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        stats = get_pool_stats(engine.pool)
+        assert stats.checked_out == 1
+        assert stats.checkouts_total == 1
+
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+
+    stats = get_pool_stats(engine.pool)
+    assert stats.checked_out == 0
+    assert stats.timeouts_total == 1
+    assert stats.wait_seconds_max >= 0
+
+    engine.dispose()
+    assert get_pool_stats(engine.pool).checkouts_total == 1
@@ -0,0 +1,47 @@
+import io
+import json
+
+import pytest
+from openpyxl import load_workbook
+
+from app.database import get_session
+from app.export import EXPORT_COLUMNS, export_row_count, iter_chunks, stream_export, xlsx_chunks
+from app.importer import read_rows
+from app.models import AssetCondition
+
+
+@pytest.mark.sqlmodel
+def test_export_formats(inventory):
+    p = inventory.prefix
+    inventory.add_asset("1", kondisi_barang=AssetCondition.RUSAK_BERAT, spesifikasi={"ram_gb": 8})
+    inventory.add_asset("2", is_active=False)
+    inventory.session.commit()
+
+    csv_rows = {
+        cells["kode"]: cells
+        for _, cells in read_rows(io.BytesIO(b"".join(stream_export("csv"))), "aset.csv")
+        if cells["kode"].startswith(p)
+    }
+    assert set(csv_rows) == {f"{p}1"}
+    assert csv_rows[f"{p}1"]["kondisi_barang"] == "rusak_berat"
+    assert csv_rows[f"{p}1"]["nama_lokasi"] == inventory.location.nama_lokasi
+
+    lines = b"".join(stream_export("jsonl", include_inactive=True)).decode().splitlines()
+    records = [json.loads(line) for line in lines if f'"{p}' in line]
+    assert {r["kode"]: r["spesifikasi"] for r in records} == {f"{p}1": {"ram_gb": 8}, f"{p}2": {}}
+
+    sheet = load_workbook(io.BytesIO(b"".join(stream_export("xlsx"))), read_only=True).worksheets[0]
+    rows = list(sheet.iter_rows(values_only=True))
+    assert list(rows[0]) == EXPORT_COLUMNS
+    assert any(row[0] == f"{p}1" for row in rows[1:])
+
+
+@pytest.mark.sqlmodel
+def test_xlsx_export_refuses_more_rows_than_a_sheet_holds(inventory):
+    for i in range(3):
+        inventory.add_asset(f"{i}")
+    inventory.session.commit()
+
+    assert export_row_count() >= 3
+    with get_session() as session, pytest.raises(ValueError, match="at most 2 rows"):
+        list(xlsx_chunks(iter_chunks(session), max_rows=2))
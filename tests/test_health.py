@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.database import DATABASE_URL
+from app.health import ReadinessProbe, pool_saturation, router
+from app.models import PoolStats
+
+
+def make_stats(checked_out: int) -> PoolStats:
+    return PoolStats(
+        pool_size=5,
+        checked_out=checked_out,
+        checked_in=5 - min(checked_out, 5),
+        overflow=max(checked_out - 5, 0),
+        checkouts_total=0,
+        timeouts_total=0,
+        wait_seconds_total=0.0,
+        wait_seconds_max=0.0,
+    )
+
+
+def test_pool_saturation():
+    saturation = pool_saturation({"sync": make_stats(3), "async": make_stats(15)}, max_overflow=10)
+    assert saturation == {"sync": pytest.approx(0.2), "async": pytest.approx(1.0)}
+
+
+def test_ready_is_unavailable_before_the_first_probe():
+    app = FastAPI()
+    app.include_router(router)
+    response = TestClient(app).get("/ready")
+    assert response.status_code == 503
+    assert response.json()["problems"] == ["no probe result yet"]
+
+
+@pytest.mark.sqlmodel
+async def test_probe_reports_database_and_saturated_pools():
+    probe = ReadinessProbe(DATABASE_URL, interval=0.05, stats=lambda: {"async": make_stats(14)}, max_overflow=10)
+    probe.start()
+    try:
+        while probe.report().problems == ["no probe result yet"]:
+            await asyncio.sleep(0.02)
+        report = probe.report()
+    finally:
+        await probe.stop()
+    assert report.database_ok and report.database_latency_ms is not None
+    assert not report.ready and report.problems == ["pool async saturated (93%)"]
+
+    unreachable = ReadinessProbe("postgresql://postgres@127.0.0.1:1/postgres", stats=dict)
+    report = await unreachable.check()
+    assert not report.ready and not report.database_ok and report.problems == ["database unreachable"]
+
+
+async def test_probe_survives_a_failing_check():
+    calls = []
+
+    def flaky_stats():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("pool gone")
+        return {}
+
+    probe = ReadinessProbe("postgresql://postgres@127.0.0.1:1/postgres", interval=0.05, stats=flaky_stats)
+    probe.start()
+    try:
+        while probe.report().problems == ["no probe result yet"]:
+            await asyncio.sleep(0.02)
+        failed = probe.report()
+        while probe.report().problems == failed.problems:
+            await asyncio.sleep(0.02)
+        recovered = probe.report()
+    finally:
+        await probe.stop()
+    assert not failed.ready and failed.problems == ["probe failed: pool gone"]
+    assert recovered.problems == ["database unreachable"]
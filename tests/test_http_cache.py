@@ -0,0 +1,121 @@
+import httpx
+import pytest
+from fastapi import Depends, FastAPI
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.responses import PlainTextResponse, Response
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.database import DATABASE_URL
+from app.http_cache import ConditionalGet, TableVersions, Validators
+from app.middleware import CompressionMiddleware, accepted_encodings, remove_middleware
+from app.notify import ChangeListener
+
+BODY = "Meja Guru, Kursi Siswa, Papan Tulis\n" * 100
+
+
+async def text(request):
+    return PlainTextResponse(BODY)
+
+
+async def small(request):
+    return PlainTextResponse("ok")
+
+
+async def image(request):
+    return Response(BODY.encode(), media_type="image/png")
+
+
+def make_client() -> TestClient:
+    routes = [Route("/text", text), Route("/small", small), Route("/image", image)]
+    return TestClient(Starlette(routes=routes, middleware=[Middleware(CompressionMiddleware, minimum_size=500)]))
+
+
+def test_accepted_encodings():
+    assert accepted_encodings("gzip, deflate, br;q=0.8") == {"gzip", "deflate", "br"}
+    assert accepted_encodings("br;q=0, gzip;q=0.5") == {"gzip"}
+
+
+def test_compression_prefers_brotli_and_respects_thresholds():
+    client = make_client()
+
+    response = client.get("/text", headers={"Accept-Encoding": "gzip, br"})
+    assert response.headers["content-encoding"] == "br"
+    # httpx decodes br and gzip transparently
+    assert response.text == BODY
+    assert "accept-encoding" in response.headers["vary"].lower()
+
+    response = client.get("/text", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.text == BODY and int(response.headers["content-length"]) < len(BODY)
+
+    for path in ("/small", "/image"):
+        response = client.get(path, headers={"Accept-Encoding": "br, gzip"})
+        assert "content-encoding" not in response.headers
+
+
+def test_outer_gzip_can_be_removed_after_startup():
+    app = Starlette(routes=[Route("/image", image)], middleware=[Middleware(CompressionMiddleware, minimum_size=500)])
+    # added last, so outermost, as ui.run() does
+    app.add_middleware(GZipMiddleware)
+    client = TestClient(app)
+    assert client.get("/image", headers={"Accept-Encoding": "gzip"}).headers["content-encoding"] == "gzip"
+
+    remove_middleware(app, GZipMiddleware)
+    assert "content-encoding" not in client.get("/image", headers={"Accept-Encoding": "gzip"}).headers
+
+
+def test_validators_compare_weak_etags_only():
+    validators = Validators(etag='W/"abc-1.0"')
+
+    def matches(**request_headers: str) -> bool:
+        return validators.matches(httpx.Request("GET", "http://test/", headers=request_headers))  # type: ignore[arg-type]
+
+    assert "Last-Modified" not in validators.headers()
+    assert matches(**{"if-none-match": '"abc-1.0"'})
+    assert matches(**{"if-none-match": 'W/"abc-0.0", W/"abc-1.0"'})
+    assert not matches(**{"if-none-match": 'W/"abc-0.0"'})
+    # dates have whole seconds and cannot tell two changes within one second apart
+    assert not matches(**{"if-modified-since": "Fri, 31 Dec 9999 23:59:59 GMT"})
+
+
+@pytest.mark.sqlmodel
+async def test_unchanged_list_is_not_modified(inventory, wait_for):
+    inventory.session.commit()
+    listener = ChangeListener(reconnect_delay=0.1)
+    versions = TableVersions(listener)
+    calls = []
+    app = FastAPI()
+
+    @app.get("/list", dependencies=[Depends(ConditionalGet("assets", versions=versions))])
+    def listing():
+        calls.append(1)
+        return {"items": len(calls)}
+
+    listener.start(DATABASE_URL)
+    try:
+        await wait_for(lambda: listener.connected)
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            first = await client.get("/list")
+            etag = first.headers["etag"]
+            assert first.status_code == 200 and first.headers["cache-control"] == "no-cache"
+
+            again = await client.get("/list", headers={"If-None-Match": etag})
+            assert again.status_code == 304 and again.headers["etag"] == etag
+            assert len(calls) == 1
+
+            inventory.add_asset("BARU")
+            inventory.session.commit()
+            await wait_for(lambda: versions.validators(["assets"]).etag != etag)  # type: ignore[union-attr]
+
+            changed = await client.get("/list", headers={"If-None-Match": etag})
+            assert changed.status_code == 200 and changed.headers["etag"] != etag
+    finally:
+        await listener.stop()
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        # no validators while changes could be missed
+        response = await client.get("/list", headers={"If-None-Match": etag})
+    assert response.status_code == 200 and "etag" not in response.headers
@@ -0,0 +1,56 @@
+import io
+
+import pytest
+from openpyxl import Workbook
+
+from app.importer import IMPORT_COLUMNS, import_assets, read_rows
+from app.models import Asset, AssetCondition
+
+HEADER = ",".join(IMPORT_COLUMNS)
+
+
+def test_read_rows_from_xlsx():
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["Kode", "Tahun_Anggaran", "Rupiah_Satuan"])
+    sheet.append(["A-1", 2024, 1500000.0])
+    sheet.append([None, None, None])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    buffer.seek(0)
+
+    assert list(read_rows(buffer, "register.xlsx")) == [
+        (2, {"kode": "A-1", "tahun_anggaran": "2024", "rupiah_satuan": "1500000"})
+    ]
+
+
+@pytest.mark.sqlmodel
+def test_import_reports_bad_rows_and_loads_the_rest(inventory):
+    p = inventory.prefix
+    existing = inventory.add_asset("OLD")
+    inventory.session.commit()
+    loc = inventory.location.kode_lokasi
+    lines = [
+        HEADER,
+        f'{p}1,,N-{p}1,Laptop,Lenovo,02.06,2024,1500000,2024-01-10,{loc},,Guru,Rusak Ringan,,,,"{{""ram_gb"": 8}}"',
+        f"{p}2,,N-{p}2,Meja,Olympic,02.07,2023,250000,2023-07-01,{loc},,Guru,,,,,",
+        f"{p}3,,N-{p}3,Kursi,,02.07,tahun,250000,2023-07-01,{loc},,Guru,,,,,",
+        f"{p}4,,N-{p}4,Lemari,,02.07,2023,250000,2023-07-01,NOPE,,Guru,,,,,",
+        f"{p}2,,N-{p}5,Meja,Olympic,02.07,2023,250000,2023-07-01,{loc},,Guru,,,,,",
+        f"{existing.kode},,N-{p}6,Meja,Olympic,02.07,2023,250000,2023-07-01,{loc},,Guru,,,,,",
+    ]
+    file = io.BytesIO("\n".join(lines).encode())
+
+    report = import_assets(inventory.session, file, "register.csv", inventory.user_id)
+
+    assert (report.rows_read, report.rows_imported) == (6, 2)
+    assert {(error.row, error.field) for error in report.errors} >= {
+        (4, "tahun_anggaran"),
+        (5, "kode_lokasi"),
+        (6, "kode"),
+        (7, None),
+    }
+    laptop = inventory.session.query(Asset).filter(Asset.kode == f"{p}1").one()
+    assert laptop.kondisi_barang == AssetCondition.RUSAK_RINGAN
+    assert laptop.spesifikasi == {"ram_gb": 8}
+    assert laptop.keterangan == "" and laptop.created_by == inventory.user_id
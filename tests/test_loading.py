@@ -0,0 +1,93 @@
+from datetime import datetime
+from typing import Any, List
+
+import pytest
+from sqlalchemy import desc, event
+from sqlalchemy.exc import InvalidRequestError
+from sqlmodel import col, select
+
+from app.database import ENGINE
+from app.loading import LoadProfile, get_asset, related_count, related_page, with_profile
+from app.models import Asset, AssetMovement, MovementType, Room
+
+
+@pytest.mark.sqlmodel
+def test_list_profile_loads_names_in_one_statement(inventory):
+    room = Room(nama_ruang="Gudang", location_id=inventory.location_id)
+    inventory.session.add(room)
+    inventory.session.flush()
+    for i in range(4):
+        inventory.add_asset(f"{i}", room_id=room.id)
+    inventory.session.commit()
+    nama_lokasi = inventory.location.nama_lokasi
+    inventory.session.expunge_all()
+
+    statements: List[str] = []
+
+    def count(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+        statements.append(statement)
+
+    statement = select(Asset).where(Asset.location_id == inventory.location_id).order_by(col(Asset.id))
+    event.listen(ENGINE, "before_cursor_execute", count)
+    try:
+        assets = inventory.session.exec(with_profile(statement, LoadProfile.LIST, strict=True)).all()
+        names = [(a.location.nama_lokasi, a.room.nama_ruang, a.category) for a in assets]
+    finally:
+        event.remove(ENGINE, "before_cursor_execute", count)
+    assert len(statements) == 1
+    assert names == [(nama_lokasi, "Gudang", None)] * 4
+    with pytest.raises(InvalidRequestError):
+        assets[0].maintenance_records
+
+
+@pytest.mark.sqlmodel
+def test_detail_and_audit_profiles(inventory):
+    asset_id = inventory.add_asset("A").id
+    inventory.session.commit()
+    inventory.session.expunge_all()
+
+    detail = get_asset(inventory.session, asset_id, strict=True)
+    assert detail is not None
+    assert detail.created_by_user.username == f"{inventory.prefix}user"
+    assert detail.maintenance_records == []
+    inventory.session.expunge_all()
+
+    audit = get_asset(inventory.session, asset_id, LoadProfile.AUDIT, strict=True)
+    assert audit is not None and audit.updated_by_user.username == f"{inventory.prefix}user"
+    assert get_asset(inventory.session, -1) is None
+
+
+@pytest.mark.sqlmodel
+def test_write_only_collections_are_paged(inventory):
+    asset = inventory.add_asset("A")
+    for day in range(1, 6):
+        asset.movements.add(
+            AssetMovement(
+                movement_type=MovementType.MUTASI,
+                to_location_id=inventory.location_id,
+                tanggal_movement=datetime(2025, 2, day),
+                user_id=inventory.user_id,
+            )
+        )
+    inventory.session.commit()
+
+    newest = related_page(inventory.session, asset.movements, desc(AssetMovement.tanggal_movement), limit=2)
+    assert [m.tanggal_movement.day for m in newest] == [5, 4]
+    assert related_count(inventory.session, asset.movements) == 5
+    assert related_count(inventory.session, inventory.location.assets) == 1
+    assert related_count(inventory.session, inventory.user.created_assets) == 1
+
+
+@pytest.mark.sqlmodel
+def test_deleting_a_room_leaves_its_assets_without_one(inventory):
+    room = Room(nama_ruang="Gudang", location_id=inventory.location_id)
+    inventory.session.add(room)
+    inventory.session.flush()
+    asset_id = inventory.add_asset("1", room_id=room.id).id
+    inventory.session.commit()
+
+    # passive_deletes leaves the assets to the foreign key, which sets room_id to NULL
+    inventory.session.delete(room)
+    inventory.session.commit()
+    asset = inventory.session.get(Asset, asset_id)
+    assert asset is not None and asset.room_id is None
@@ -0,0 +1,114 @@
+import pytest
+
+from app.database import DATABASE_URL, get_async_session
+from app.lookup import AssetLookup, LatencyWindow, LookupCache
+from app.models import AssetCondition, AssetSummary
+from app.notify import ChangeListener
+
+
+def make_summary(asset_id: int, kode: str, barcode: str) -> AssetSummary:
+    return AssetSummary(
+        id=asset_id,
+        kode=kode,
+        barcode=barcode,
+        nomor_aset=f"N-{kode}",
+        nama_barang="Laptop",
+        merk_tipe="Lenovo",
+        kondisi_barang=AssetCondition.BAIK,
+        location_id=1,
+        room_id=None,
+        pemegang_barang="Budi",
+        is_active=True,
+    )
+
+
+def test_cache_serves_looked_up_codes_until_evicted():
+    cache = LookupCache(max_size=100, ttl=60)
+    summary = make_summary(1, "A-1", "899001")
+    cache.put("A-1", summary, cache.generation)
+    cache.put("899001", summary, cache.generation)
+
+    assert cache.get("A-1") is not None
+    assert cache.get("899001") is not None
+    assert cache.get("N-A-1") is None
+    assert len(cache) == 1
+
+    cache.evict(1)
+    assert cache.get("899001") is None
+    assert len(cache) == 0
+
+
+def test_cache_skips_rows_read_before_an_eviction():
+    cache = LookupCache(max_size=100, ttl=60)
+    generation = cache.generation
+    cache.evict(1)
+
+    cache.put("A-1", make_summary(1, "A-1", "899001"), generation)
+    assert cache.get("A-1") is None
+
+
+def test_cache_drops_least_recently_used_asset():
+    cache = LookupCache(max_size=2, ttl=60)
+    cache.put("B-1", make_summary(1, "A-1", "B-1"), cache.generation)
+    cache.put("B-2", make_summary(2, "A-2", "B-2"), cache.generation)
+    cache.get("B-1")
+    cache.put("B-3", make_summary(3, "A-3", "B-3"), cache.generation)
+
+    assert cache.get("B-2") is None
+    assert cache.get("B-1") is not None
+    assert cache.get("B-3") is not None
+
+
+def test_cache_keeps_the_owner_of_a_shared_code():
+    cache = LookupCache(max_size=100, ttl=60)
+    # asset 2's barcode is asset 1's kode; a lookup of "A-1" resolves to asset 2
+    cache.put("A-1", make_summary(2, "A-2", "A-1"), cache.generation)
+    cache.put("899001", make_summary(1, "A-1", "899001"), cache.generation)
+
+    shared = cache.get("A-1")
+    assert shared is not None and shared.id == 2
+    first = cache.get("899001")
+    assert first is not None and first.id == 1
+
+    cache.evict(1)
+    shared = cache.get("A-1")
+    assert shared is not None and shared.id == 2
+
+
+def test_latency_percentiles():
+    window = LatencyWindow()
+    for ms in range(1, 101):
+        window.record(ms / 1000)
+
+    assert window.percentiles_ms(0.5, 0.99) == pytest.approx([51.0, 100.0])
+
+
+@pytest.mark.sqlmodel
+async def test_lookup_is_invalidated_by_notify(inventory, wait_for):
+    asset = inventory.add_asset("SCAN", barcode=f"{inventory.prefix}899", nama_barang="Proyektor Lama")
+    inventory.session.commit()
+
+    listener = ChangeListener(reconnect_delay=0.1)
+    lookup = AssetLookup(LookupCache(max_size=100, ttl=60), listener)
+    listener.start(DATABASE_URL)
+    try:
+        await wait_for(lambda: listener.connected)
+
+        async with get_async_session() as session:
+            first = await lookup.lookup(session, f" {inventory.prefix}899\r\n")
+            assert first is not None and first.nama_barang == "Proyektor Lama"
+            assert (await lookup.lookup(session, f"{inventory.prefix}899")) is not None
+            assert (await lookup.lookup(session, asset.kode)) is not None
+        assert lookup.hits == 1
+        assert len(lookup.cache) == 1
+
+        asset.nama_barang = "Proyektor Baru"
+        inventory.session.commit()
+        await wait_for(lambda: len(lookup.cache) == 0)
+
+        async with get_async_session() as session:
+            updated = await lookup.lookup(session, asset.nomor_aset)
+        assert updated is not None and updated.nama_barang == "Proyektor Baru"
+        assert lookup.stats().p99_ms > 0
+    finally:
+        await listener.stop()
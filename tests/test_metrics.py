@@ -0,0 +1,113 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.staticfiles import StaticFiles
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.database import ENGINE
+from app.metrics import (
+    EVENT_LOOP_LAG_SECONDS,
+    HTTP_REQUEST_SECONDS,
+    SQL_STATEMENT_SECONDS,
+    Counter,
+    Histogram,
+    LoopLagMonitor,
+    MetricsMiddleware,
+    router,
+)
+
+
+def make_client() -> TestClient:
+    app = FastAPI()
+    app.include_router(router)
+
+    @app.get("/items/{item_id}")
+    def item(item_id: int):
+        return {"id": item_id}
+
+    app.mount("/static", StaticFiles(directory=Path(__file__).parent))
+
+    app.add_middleware(MetricsMiddleware)
+    return TestClient(app)
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("demo_seconds", "Demo.", (0.1, 1.0), ("kind",))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(value, ("a",))
+
+    lines = list(histogram.render())
+    assert 'demo_seconds_bucket{kind="a",le="0.1"} 1' in lines
+    assert 'demo_seconds_bucket{kind="a",le="1.0"} 3' in lines
+    assert 'demo_seconds_bucket{kind="a",le="+Inf"} 4' in lines
+    assert 'demo_seconds_count{kind="a"} 4' in lines
+    assert 'demo_seconds_sum{kind="a"} 4.05' in lines
+
+
+def test_counter_keeps_full_precision():
+    counter = Counter("demo_total", "Demo.")
+    counter.inc(amount=1234567.0)
+    counter.inc(amount=0.25)
+    assert "demo_total 1234567.25" in list(counter.render())
+
+
+def test_requests_are_labelled_by_route_template():
+    client = make_client()
+    labels = ("GET", "/items/{item_id}", "200")
+    before = HTTP_REQUEST_SECONDS.count(labels)
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/missing")
+
+    assert HTTP_REQUEST_SECONDS.count(labels) == before + 2
+    assert HTTP_REQUEST_SECONDS.count(("GET", "unmatched", "404")) >= 1
+
+
+def test_mounted_requests_are_labelled_by_mount_path():
+    client = make_client()
+    found, missing = ("GET", "/static", "200"), ("GET", "/static", "404")
+    unmatched = ("GET", "unmatched", "404")
+    before = [HTTP_REQUEST_SECONDS.count(labels) for labels in (found, missing, unmatched)]
+    client.get("/static/test_metrics.py")
+    client.get("/static/nothing.css")
+
+    after = [HTTP_REQUEST_SECONDS.count(labels) for labels in (found, missing, unmatched)]
+    assert after == [before[0] + 1, before[1] + 1, before[2]]
+
+
+def test_metrics_endpoint_exposes_every_family():
+    response = make_client().get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    for family in (
+        "app_http_request_duration_seconds",
+        "app_sql_statement_duration_seconds",
+        "app_event_loop_lag_seconds",
+        "app_db_pool_checked_out",
+        "app_nicegui_clients",
+        "app_cache_hits_total",
+    ):
+        assert f"# TYPE {family} " in response.text
+    # one header per family, as the exposition format requires
+    assert response.text.count("# TYPE app_cache_hits_total ") == 1
+
+
+async def test_loop_lag_monitor_samples():
+    monitor = LoopLagMonitor(interval=0.01)
+    before = EVENT_LOOP_LAG_SECONDS.count()
+    monitor.start()
+    await asyncio.sleep(0.1)
+    await monitor.stop()
+    assert EVENT_LOOP_LAG_SECONDS.count() > before
+
+
+@pytest.mark.sqlmodel
+def test_sql_statements_are_timed():
+    before = SQL_STATEMENT_SECONDS.count(("primary", "SELECT"))
+    with ENGINE.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    assert SQL_STATEMENT_SECONDS.count(("primary", "SELECT")) == before + 1
@@ -0,0 +1,44 @@
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.responses import PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.middleware import SECURITY_HEADERS, SecurityHeadersMiddleware
+
+
+async def framed(request):
+    return PlainTextResponse("ok", headers={"X-Frame-Options": "DENY", "Referrer-Policy": "no-referrer"})
+
+
+async def streamed(request):
+    async def chunks():
+        for i in range(3):
+            yield f"chunk {i}\n".encode()
+
+    return StreamingResponse(chunks(), media_type="text/plain")
+
+
+def make_client() -> TestClient:
+    app = Starlette(
+        routes=[Route("/framed", framed), Route("/streamed", streamed)],
+        middleware=[Middleware(SecurityHeadersMiddleware)],
+    )
+    return TestClient(app)
+
+
+def test_security_headers_replace_endpoint_values():
+    response = make_client().get("/framed")
+
+    for name, value in SECURITY_HEADERS.items():
+        assert response.headers[name] == value
+    assert response.headers.get_list("Referrer-Policy") == [SECURITY_HEADERS["Referrer-Policy"]]
+    assert response.headers["X-Frame-Options"] == "DENY"
+
+
+def test_streaming_body_passes_through():
+    with make_client().stream("GET", "/streamed") as response:
+        body = b"".join(response.iter_bytes())
+
+    assert body == b"chunk 0\nchunk 1\nchunk 2\n"
+    assert response.headers["X-Content-Type-Options"] == "nosniff"
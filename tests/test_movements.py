@@ -0,0 +1,59 @@
+import pytest
+from pydantic import ValidationError
+from sqlmodel import col, select
+
+from app.models import Asset, AssetMovement, BulkMovementCreate, Location, MovementType, Room
+from app.movements import move_assets
+
+
+@pytest.mark.sqlmodel
+def test_bulk_move_updates_assets_and_records_movements(inventory):
+    target = Location(kode_lokasi=f"{inventory.prefix}LOC2", nama_lokasi="Gedung B")
+    inventory.session.add(target)
+    inventory.session.flush()
+    room = Room(nama_ruang="Lab", location_id=target.id)
+    inventory.session.add(room)
+    inventory.session.flush()
+    asset_ids = [inventory.add_asset(f"{i}").id for i in range(3)]
+    already_there = inventory.add_asset("X", location_id=target.id, room_id=room.id, pemegang_barang="Bu Sari").id
+    inventory.session.commit()
+
+    request = BulkMovementCreate(
+        asset_ids=[*asset_ids, already_there], to_location_id=target.id, to_room_id=room.id, pemegang_baru="Bu Sari"
+    )
+    result = move_assets(inventory.session, request, inventory.user_id)
+    assert result.moved == 3 and result.unchanged == [already_there]
+
+    moved = inventory.session.exec(select(Asset).where(col(Asset.id).in_(asset_ids))).all()
+    assert {(a.location_id, a.room_id, a.pemegang_barang) for a in moved} == {(target.id, room.id, "Bu Sari")}
+    movements = inventory.session.exec(select(AssetMovement).where(col(AssetMovement.asset_id).in_(asset_ids))).all()
+    assert len(movements) == 3
+    assert all(
+        m.movement_type == MovementType.MUTASI and m.from_location_id == inventory.location_id for m in movements
+    )
+    assert {m.pemegang_lama for m in movements} == {"Petugas"}
+
+
+@pytest.mark.sqlmodel
+def test_bulk_move_is_all_or_nothing(inventory):
+    asset_id = inventory.add_asset("A").id
+    retired_id = inventory.add_asset("B", is_active=False).id
+    other = Location(kode_lokasi=f"{inventory.prefix}LOC2", nama_lokasi="Gedung B")
+    inventory.session.add(other)
+    inventory.session.commit()
+
+    with pytest.raises(ValueError, match="tidak aktif"):
+        move_assets(inventory.session, BulkMovementCreate(asset_ids=[asset_id, retired_id], to_location_id=other.id), 1)
+    with pytest.raises(ValueError, match="lokasi asal"):
+        request = BulkMovementCreate(asset_ids=[asset_id], from_location_id=other.id, to_location_id=other.id)
+        move_assets(inventory.session, request, inventory.user_id)
+    with pytest.raises(ValueError, match="tidak ditemukan"):
+        move_assets(inventory.session, BulkMovementCreate(asset_ids=[asset_id, -1], to_location_id=other.id), 1)
+
+    asset = inventory.session.get(Asset, asset_id)
+    assert asset is not None and asset.location_id == inventory.location_id
+
+
+def test_bulk_move_request_is_bounded():
+    with pytest.raises(ValidationError):
+        BulkMovementCreate(asset_ids=list(range(1001)), to_location_id=1)
@@ -0,0 +1,66 @@
+import asyncio
+from typing import List
+
+import pytest
+from sqlalchemy import text
+
+from app.database import DATABASE_URL
+from app.notify import MAX_NOTIFY_IDS, ChangeEvent, ChangeListener
+
+
+async def test_listener_keeps_retrying_after_unexpected_errors():
+    # a malformed DSN raises ValueError from asyncpg, which used to end the task for good
+    listener = ChangeListener(reconnect_delay=0.01)
+    listener.start("postgresql://user@host:notaport/db")
+    try:
+        await asyncio.sleep(0.1)
+        assert listener._task is not None and not listener._task.done()
+        assert not listener.connected
+    finally:
+        await listener.stop()
+
+
+def test_dispatch_parses_statement_payloads():
+    listener = ChangeListener()
+    events: List[ChangeEvent] = []
+    listener.subscribe("assets", events.append)
+
+    listener.dispatch('{"table": "assets", "op": "UPDATE", "rows": 2, "ids": [3, 4]}')
+    listener.dispatch('{"table": "assets", "op": "UPDATE", "rows": 900, "ids": null}')
+    listener.dispatch('{"table": "assets", "op": "UPDATE"}')
+
+    assert events == [ChangeEvent("assets", "UPDATE", 2, (3, 4)), ChangeEvent("assets", "UPDATE", 900, None)]
+
+
+@pytest.mark.sqlmodel
+async def test_one_notification_per_statement(inventory, wait_for):
+    for i in range(MAX_NOTIFY_IDS + 1):
+        inventory.add_asset(f"{i}")
+    inventory.session.commit()
+    location_id = inventory.location_id
+
+    listener = ChangeListener(reconnect_delay=0.1)
+    events: List[ChangeEvent] = []
+    listener.subscribe("assets", events.append)
+    listener.start(DATABASE_URL)
+    try:
+        await wait_for(lambda: listener.connected)
+        prefix = f"{inventory.prefix}%"
+        inventory.session.execute(
+            text("UPDATE assets SET keterangan = 'dicek' WHERE kode LIKE :prefix AND kode <> :first"),
+            {"prefix": prefix, "first": f"{inventory.prefix}0"},
+        )
+        inventory.session.execute(
+            text("UPDATE assets SET keterangan = 'dicek' WHERE location_id = :location_id"),
+            {"location_id": location_id},
+        )
+        inventory.session.execute(text("UPDATE assets SET keterangan = 'x' WHERE false"))
+        inventory.session.commit()
+        await wait_for(lambda: len(events) >= 2)
+        await asyncio.sleep(0.1)
+    finally:
+        await listener.stop()
+
+    assert [(e.op, e.rows) for e in events] == [("UPDATE", MAX_NOTIFY_IDS), ("UPDATE", MAX_NOTIFY_IDS + 1)]
+    assert events[0].ids is not None and len(events[0].ids) == MAX_NOTIFY_IDS
+    assert events[1].ids is None
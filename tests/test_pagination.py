@@ -0,0 +1,40 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models import AssetFilter
+from app.pagination import AssetSort, decode_cursor, encode_cursor, paginate_assets
+
+
+def test_cursor_roundtrip_and_rejection():
+    moment = datetime(2025, 3, 1, 12, 30, 15, 123456)
+    cursor = encode_cursor(AssetSort.UPDATED_DESC, moment, 42)
+    assert decode_cursor(AssetSort.UPDATED_DESC, cursor) == (moment, 42)
+    with pytest.raises(ValueError):
+        decode_cursor(AssetSort.KODE, cursor)
+    with pytest.raises(ValueError):
+        decode_cursor(AssetSort.UPDATED_DESC, "not-a-cursor")
+
+
+@pytest.mark.sqlmodel
+@pytest.mark.parametrize("sort", [AssetSort.KODE, AssetSort.UPDATED_DESC, AssetSort.NAMA])
+def test_pages_cover_every_asset_once(inventory, sort):
+    base = datetime(2025, 1, 1)
+    for i in range(7):
+        # equal updated_at and nama_barang values force the id tie-break
+        inventory.add_asset(f"{i}", updated_at=base + timedelta(hours=i // 3), nama_barang=f"Meja {i % 2}")
+    inventory.add_asset("X", is_active=False)
+    inventory.session.commit()
+    filters = AssetFilter(location_id=inventory.location_id)
+
+    seen, after = [], None
+    while True:
+        page = paginate_assets(inventory.session, filters, sort=sort, limit=3, after=after)
+        seen.extend(asset.kode for asset in page.items)
+        if page.next_cursor is None:
+            break
+        after = page.next_cursor
+
+    everything = paginate_assets(inventory.session, filters, sort=sort, limit=100)
+    assert seen == [asset.kode for asset in everything.items]
+    assert len(seen) == 7 and f"{inventory.prefix}X" not in seen
@@ -0,0 +1,136 @@
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import insert, text
+
+from app.database import ENGINE
+from app.models import AssetMovement, MovementType
+from app.partitions import (
+    DEFAULT_PARTITION,
+    detach_movement_partitions,
+    ensure_movement_partitions,
+    install_movement_partitions,
+    movement_partitions,
+    partition_name,
+)
+from app.reports import install_movement_rollups
+
+
+def test_partition_name():
+    assert partition_name(date(2025, 1, 1)) == "asset_movements_p2025_01"
+
+
+@pytest.mark.sqlmodel
+def test_old_rows_are_split_out_and_detached(inventory):
+    session = inventory.session
+    asset = inventory.add_asset("1")
+    session.add(
+        AssetMovement(
+            asset_id=asset.id,
+            movement_type=MovementType.MASUK,
+            to_location_id=inventory.location_id,
+            tanggal_movement=datetime(1980, 5, 17),
+            user_id=inventory.user_id,
+        )
+    )
+    session.commit()
+    conn = session.connection()
+    assert conn.execute(text(f"SELECT count(*) FROM {DEFAULT_PARTITION}")).scalar_one() >= 1
+
+    created = ensure_movement_partitions(conn, months_ahead=1, today=date(2030, 1, 1))
+    assert {"asset_movements_p1980_05", "asset_movements_p2030_01", "asset_movements_p2030_02"} <= set(created)
+    assert conn.execute(text(f"SELECT count(*) FROM {DEFAULT_PARTITION}")).scalar_one() == 0
+    assert conn.execute(text("SELECT count(*) FROM asset_movements_p1980_05")).scalar_one() == 1
+
+    try:
+        assert detach_movement_partitions(conn, before=date(1980, 6, 1)) == ["asset_movements_p1980_05"]
+        assert "asset_movements_p1980_05" not in movement_partitions(conn)
+        assert session.query(AssetMovement).filter(AssetMovement.asset_id == asset.id).count() == 0
+    finally:
+        for month in ("p1980_05", "p2030_01", "p2030_02"):
+            conn.execute(text(f"DROP TABLE IF EXISTS asset_movements_{month}"))
+        session.commit()
+
+
+@pytest.mark.sqlmodel
+def test_install_is_idempotent(inventory):
+    conn = inventory.session.connection()
+    install_movement_partitions(conn)
+
+    assert install_movement_partitions(conn) == []
+    assert conn.execute(text(f"SELECT to_regclass('{DEFAULT_PARTITION}') IS NOT NULL")).scalar_one()
+    inventory.session.commit()
+
+
+@pytest.mark.sqlmodel
+def test_converted_table_keeps_its_triggers(inventory):
+    asset = inventory.add_asset("1")
+    inventory.session.commit()
+    with ENGINE.connect() as conn:
+        # a plain asset_movements with the rollup triggers, shadowing the partitioned one; rolled back below
+        conn.execute(text("CREATE SCHEMA partition_convert"))
+        conn.execute(text("SET LOCAL search_path = partition_convert, public"))
+        conn.execute(text("CREATE TABLE asset_movements (LIKE public.asset_movements INCLUDING DEFAULTS)"))
+        conn.execute(text("ALTER TABLE asset_movements ADD PRIMARY KEY (id)"))
+        for index in AssetMovement.__table__.indexes:
+            index.create(conn)
+        install_movement_rollups(conn)
+        try:
+            install_movement_partitions(conn, months_ahead=0)
+            assert (
+                conn.execute(text("SELECT relkind FROM pg_class WHERE oid = 'asset_movements'::regclass")).scalar()
+                == "p"
+            )
+
+            conn.execute(
+                insert(AssetMovement.__table__).values(
+                    asset_id=asset.id,
+                    movement_type=MovementType.MASUK,
+                    to_location_id=inventory.location_id,
+                    tanggal_movement=datetime(1981, 3, 2),
+                    user_id=inventory.user_id,
+                )
+            )
+            count = conn.execute(
+                text(
+                    "SELECT movement_count FROM movement_daily_rollups WHERE location_id = :id AND day = '1981-03-02'"
+                ),
+                {"id": inventory.location_id},
+            ).scalar_one()
+            assert count == 1
+        finally:
+            conn.rollback()
+
+
+@pytest.mark.sqlmodel
+def test_month_detached_without_archiving_is_attached_again(inventory):
+    session = inventory.session
+    asset = inventory.add_asset("1")
+
+    def add_movement(day: int) -> None:
+        session.add(
+            AssetMovement(
+                asset_id=asset.id,
+                movement_type=MovementType.MASUK,
+                to_location_id=inventory.location_id,
+                tanggal_movement=datetime(1982, 7, day),
+                user_id=inventory.user_id,
+            )
+        )
+        session.commit()
+
+    add_movement(1)
+    try:
+        ensure_movement_partitions(session.connection(), months_ahead=0, today=date(1982, 7, 1))
+        detached = detach_movement_partitions(session.connection(), before=date(1982, 8, 1))
+        assert detached == ["asset_movements_p1982_07"]
+        session.commit()
+        add_movement(20)
+
+        ensure_movement_partitions(session.connection(), months_ahead=0, today=date(1982, 7, 1))
+        assert "asset_movements_p1982_07" in movement_partitions(session.connection())
+        assert session.query(AssetMovement).filter(AssetMovement.asset_id == asset.id).count() == 2
+    finally:
+        session.rollback()
+        session.execute(text("DROP TABLE IF EXISTS asset_movements_p1982_07"))
+        session.commit()
@@ -0,0 +1,133 @@
+import logging
+import subprocess
+import sys
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlmodel import col, select
+
+from app.loading import LoadProfile, with_profile
+from app.metrics import MetricsMiddleware
+from app.models import Asset, Room
+from app.query_budget import (
+    REPEAT_THRESHOLD,
+    QueryBudgetExceeded,
+    query_budget,
+    record_statement,
+    statement_shape,
+    track,
+    tracked,
+)
+
+LOOKUP = "SELECT assets.id FROM assets WHERE assets.id = %(pk_1)s"
+
+
+def test_statement_shape_folds_in_lists():
+    short = "SELECT * FROM assets\n WHERE id IN (%(id_1_1)s, %(id_1_2)s)"
+    long = "SELECT * FROM assets WHERE id IN ($1, $2, $3, $4)"
+    assert statement_shape(short) == statement_shape(long) == "SELECT * FROM assets WHERE id IN (?)"
+
+
+def test_statements_are_charged_to_every_open_unit():
+    with track("outer") as outer:
+        record_statement(LOOKUP, 0.5)
+        with track("inner") as inner:
+            record_statement(LOOKUP, 0.25)
+    record_statement(LOOKUP, 1.0)
+
+    assert (inner.statements, inner.db_seconds) == (1, 0.25)
+    assert (outer.statements, outer.db_seconds) == (2, 0.75)
+    assert outer.shapes[LOOKUP] == 2
+
+
+def test_repeated_shape_is_logged_with_the_route(caplog):
+    caplog.set_level(logging.WARNING, logger="app.query_budget")
+    app = FastAPI()
+
+    @app.get("/assets/{asset_id}/children")
+    def children(asset_id: int):
+        for _ in range(REPEAT_THRESHOLD + 1):
+            record_statement(LOOKUP, 0.001)
+        return []
+
+    app.add_middleware(MetricsMiddleware)
+    TestClient(app).get("/assets/1/children")
+
+    assert (
+        f"Possible N+1 in GET /assets/{{asset_id}}/children: statement ran {REPEAT_THRESHOLD + 1} times" in caplog.text
+    )
+    assert LOOKUP in caplog.text
+
+
+async def test_tracked_handlers():
+    @tracked()
+    def on_click() -> int:
+        record_statement(LOOKUP, 0.0)
+        return 1
+
+    @tracked("ui save")
+    async def on_save() -> int:
+        record_statement(LOOKUP, 0.0)
+        return 2
+
+    with track("page") as page:
+        assert on_click() == 1
+        assert await on_save() == 2
+    assert page.statements == 2
+
+
+def test_query_budget_raises_when_exceeded():
+    with query_budget(2):
+        record_statement(LOOKUP, 0.0)
+    with pytest.raises(QueryBudgetExceeded, match="ran 3 SQL statements, budget is 2"):
+        with query_budget(2):
+            for _ in range(3):
+                record_statement(LOOKUP, 0.0)
+    with pytest.raises(QueryBudgetExceeded, match="one statement 2 times"):
+        with query_budget(10, max_repeats=1):
+            for _ in range(2):
+                record_statement(LOOKUP, 0.0)
+
+
+@pytest.fixture
+def assets_in_rooms(inventory):
+    """A statement selecting four new assets, each in its own room."""
+    location_id = inventory.location_id
+    for i in range(4):
+        room = Room(nama_ruang=f"Ruang {i}", location_id=inventory.location_id)
+        inventory.session.add(room)
+        inventory.session.flush()
+        inventory.add_asset(f"{i}", room_id=room.id)
+    inventory.session.commit()
+    inventory.session.expunge_all()
+    return select(Asset).where(Asset.location_id == location_id).order_by(col(Asset.id))
+
+
+@pytest.mark.sqlmodel
+def test_lazy_loads_in_a_loop_are_caught(inventory, assets_in_rooms):
+    with pytest.raises(QueryBudgetExceeded, match="one statement 4 times"):
+        with query_budget(10, max_repeats=2):
+            assets = inventory.session.exec(assets_in_rooms).all()
+            [asset.room.nama_ruang for asset in assets]
+
+
+@pytest.mark.sqlmodel
+@pytest.mark.query_budget(1)
+def test_list_profile_stays_within_its_budget(inventory, assets_in_rooms):
+    assets = inventory.session.exec(with_profile(assets_in_rooms, LoadProfile.LIST)).all()
+    assert sorted(asset.room.nama_ruang for asset in assets) == [f"Ruang {i}" for i in range(4)]
+
+
+@pytest.mark.sqlmodel
+def test_engines_report_statements_without_the_metrics_module():
+    script = (
+        "import sys\n"
+        "from sqlalchemy import text\n"
+        "from app.database import ENGINE\n"
+        "from app.query_budget import track\n"
+        "with track('script') as unit, ENGINE.connect() as conn:\n"
+        "    conn.execute(text('SELECT 1'))\n"
+        "assert 'app.metrics' not in sys.modules and unit.statements == 1, unit\n"
+    )
+    subprocess.run([sys.executable, "-c", script], check=True)
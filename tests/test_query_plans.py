@@ -0,0 +1,25 @@
+import pytest
+
+from app.database import create_tables, get_session
+from app.workloads import Workload
+from benchmarks import seed
+from benchmarks.query_plans import QUERIES, explain, plan_ok
+
+
+@pytest.fixture(scope="module")
+def seeded_session():
+    # large enough that the planner's choices match a real register; seeded once for all queries
+    create_tables()
+    with get_session(Workload.BULK_IMPORT) as session:
+        seed.clear(session)
+        seed.seed(session, assets=50_000, movements_per_asset=4)
+        yield session
+        seed.clear(session)
+
+
+@pytest.mark.sqlmodel
+@pytest.mark.parametrize("name", list(QUERIES))
+def test_main_queries_use_model_indexes(seeded_session, name):
+    plan = explain(seeded_session, QUERIES[name](seeded_session))
+
+    assert plan_ok(seeded_session, name, plan)
@@ -0,0 +1,47 @@
+import pytest
+
+from app.database import DATABASE_URL, get_session
+from app.models import Room
+from app.notify import ChangeListener
+from app.reference import ReferenceCache, ReferenceData
+
+
+def test_snapshot_maps():
+    data = ReferenceData.from_rows(
+        locations=[_row(id=1, kode_lokasi="GD-A", nama_lokasi="Gedung A")],
+        rooms=[_row(id=10, location_id=1, nama_ruang="Lab Komputer"), _row(id=11, location_id=1, nama_ruang="Gudang")],
+        categories=[_row(id=5, kode_kategori="ELK", nama_kategori="Elektronik")],
+    )
+    assert data.location_ids_by_code["GD-A"] == 1 and data.location_names[1] == "Gedung A"
+    assert data.room_ids_by_name[(1, "lab komputer")] == 10 and data.room_names[11] == "Gudang"
+    assert data.category_names[5] == "Elektronik" and data.category_ids_by_code["ELK"] == 5
+
+
+def _row(**values):
+    return type("Row", (), values)
+
+
+@pytest.mark.sqlmodel
+async def test_reference_cache_is_invalidated_by_notify(inventory, wait_for):
+    inventory.session.commit()
+    listener = ChangeListener(reconnect_delay=0.1)
+    cache = ReferenceCache(listener, ttl=60)
+    listener.start(DATABASE_URL)
+    try:
+        await wait_for(lambda: listener.connected)
+
+        with get_session() as session:
+            first = cache.get(session)
+            assert first.location_ids_by_code[inventory.location.kode_lokasi] == inventory.location_id
+            assert cache.get(session) is first
+        assert cache.hits == 1 and cache.loads == 1
+
+        inventory.session.add(Room(nama_ruang="Aula", location_id=inventory.location_id))
+        inventory.session.commit()
+        await wait_for(lambda: not cache.loaded)
+
+        with get_session() as session:
+            updated = cache.get(session)
+        assert (inventory.location_id, "aula") in updated.room_ids_by_name
+    finally:
+        await listener.stop()
@@ -0,0 +1,42 @@
+import pytest
+
+from app.database import DATABASE_URL
+from app.health import ReadinessProbe
+from app.replica import ReplicaRouter
+
+
+def test_routing_follows_the_recorded_lag():
+    router = ReplicaRouter(max_lag_seconds=10, max_age=60)
+    assert not router.use_replica()
+
+    router.record(0.5)
+    assert router.use_replica()
+
+    router.record(30.0)
+    assert not router.use_replica()
+
+    # a failed measurement looks like an unreachable replica
+    router.record(None)
+    assert not router.use_replica()
+    assert router.lag_seconds is None
+
+
+def test_stale_measurement_routes_to_primary():
+    router = ReplicaRouter(max_lag_seconds=10, max_age=0)
+    router.record(0.0)
+
+    assert not router.use_replica()
+
+
+@pytest.mark.sqlmodel
+async def test_probe_records_lag_for_the_router():
+    # the primary stands in for the replica and reports zero lag
+    router = ReplicaRouter(max_lag_seconds=0, max_age=60)
+    probe = ReadinessProbe(DATABASE_URL, replica_dsn=DATABASE_URL, replica_router=router)
+    try:
+        await probe.check()
+    finally:
+        await probe.stop()
+
+    assert router.lag_seconds == 0
+    assert router.use_replica()
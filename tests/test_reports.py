@@ -0,0 +1,46 @@
+from datetime import date, datetime
+
+import pytest
+
+from app.models import AssetMovement, Location, MovementType
+from app.reports import get_movement_report
+
+
+@pytest.mark.sqlmodel
+def test_movement_report_from_rollups(inventory):
+    session = inventory.session
+    gudang = Location(kode_lokasi=f"{inventory.prefix}GDG", nama_lokasi=f"Gudang {inventory.prefix}")
+    session.add(gudang)
+    asset = inventory.add_asset("1")
+
+    def move(movement_type, day, from_location=None, to_location=None):
+        movement = AssetMovement(
+            asset_id=asset.id,
+            movement_type=movement_type,
+            from_location_id=from_location,
+            to_location_id=to_location,
+            tanggal_movement=datetime(1990, 3, day, 10),
+            user_id=inventory.user_id,
+        )
+        session.add(movement)
+        return movement
+
+    move(MovementType.MASUK, 1, to_location=gudang.id)
+    move(MovementType.MUTASI, 2, from_location=gudang.id, to_location=inventory.location_id)
+    move(MovementType.KELUAR, 20, from_location=inventory.location_id)
+    late = move(MovementType.KELUAR, 31, from_location=inventory.location_id)
+    session.commit()
+
+    report = get_movement_report(session, date(1990, 3, 1), date(1990, 3, 20))
+    assert (report.total_masuk, report.total_mutasi, report.total_keluar) == (1, 1, 1)
+    assert report.movements_by_location[gudang.nama_lokasi] == {"masuk": 1, "keluar": 0, "mutasi": 0}
+    assert report.movements_by_location[inventory.location.nama_lokasi] == {"masuk": 0, "keluar": 1, "mutasi": 1}
+
+    late.tanggal_movement = datetime(1990, 3, 15)
+    session.add(late)
+    session.commit()
+    assert get_movement_report(session, date(1990, 3, 1), date(1990, 3, 20)).total_keluar == 2
+
+    session.delete(late)
+    session.commit()
+    assert get_movement_report(session, date(1990, 3, 1), date(1990, 3, 31)).total_keluar == 1
@@ -0,0 +1,34 @@
+import pytest
+
+from app.models import AssetFilter, Room
+from app.responses import asset_response_page, get_asset_response, get_asset_responses, response_from_asset
+
+
+@pytest.mark.sqlmodel
+def test_projection_matches_orm_response(inventory):
+    room = Room(nama_ruang="Ruang Rapat", location_id=inventory.location_id)
+    inventory.session.add(room)
+    inventory.session.flush()
+    assets = [inventory.add_asset("A", room_id=room.id), inventory.add_asset("B", spesifikasi={"ram": "8 GB"})]
+    inventory.session.commit()
+
+    projected = get_asset_responses(inventory.session, [asset.id for asset in assets])
+    assert [response.model_dump() for response in projected] == [
+        response_from_asset(asset).model_dump() for asset in assets
+    ]
+    assert projected[0].room_name == "Ruang Rapat" and projected[1].room_name is None
+    assert get_asset_response(inventory.session, -1) is None
+
+
+@pytest.mark.sqlmodel
+def test_response_pages(inventory):
+    for i in range(5):
+        inventory.add_asset(f"{i}")
+    inventory.session.commit()
+    filters = AssetFilter(location_id=inventory.location_id)
+
+    first = asset_response_page(inventory.session, filters, limit=3)
+    second = asset_response_page(inventory.session, filters, limit=3, after=first.next_cursor)
+    assert [r.kode for r in first.items + second.items] == [f"{inventory.prefix}{i}" for i in range(5)]
+    assert second.next_cursor is None
+    assert all(r.location_name == inventory.location.nama_lokasi for r in first.items)
@@ -0,0 +1,49 @@
+import pytest
+
+from app.search import search_assets, to_prefix_tsquery, trigram_enabled
+
+
+def test_to_prefix_tsquery():
+    assert to_prefix_tsquery("Lapt  Think-pad") == "lapt:* & think:* & pad:*"
+    assert to_prefix_tsquery("  ?! ") is None
+
+
+@pytest.fixture
+def search_data(inventory):
+    inventory.add_asset("1", nama_barang="Laptop Guru", merk_tipe="Lenovo ThinkPad", pemegang_barang="Budi")
+    inventory.add_asset("2", nama_barang="Meja Laptop", merk_tipe="Olympic", pemegang_barang="Siti")
+    inventory.add_asset("3", nama_barang="Proyektor", merk_tipe="Epson", keterangan="laptop cadangan", is_active=False)
+    inventory.session.commit()
+    return inventory
+
+
+@pytest.mark.sqlmodel
+def test_search_matches_prefixes(search_data):
+    page = search_assets(search_data.session, "lapt")
+
+    assert {hit.kode for hit in page.hits} == {f"{search_data.prefix}1", f"{search_data.prefix}2"}
+    assert not page.has_more
+
+    thinkpad = search_assets(search_data.session, "laptop think")
+    assert [hit.kode for hit in thinkpad.hits] == [f"{search_data.prefix}1"]
+
+
+@pytest.mark.sqlmodel
+def test_search_pages_and_inactive(search_data):
+    first = search_assets(search_data.session, "laptop", page_size=1, include_inactive=True)
+    assert first.has_more
+    assert len(first.hits) == 1
+
+    everything = search_assets(search_data.session, "laptop", include_inactive=True)
+    assert len(everything.hits) == 3
+    # keterangan carries the lowest weight
+    assert everything.hits[-1].kode == f"{search_data.prefix}3"
+
+
+@pytest.mark.sqlmodel
+def test_search_tolerates_typos_once_migrated(search_data):
+    if not trigram_enabled():
+        pytest.skip("pg_trgm is not available on this server")
+
+    page = search_assets(search_data.session, "proyekter", include_inactive=True)
+    assert [hit.kode for hit in page.hits] == [f"{search_data.prefix}3"]
@@ -0,0 +1,28 @@
+import pytest
+
+from app.specs import SpecFilter, SpecOp, find_assets_by_spec, spec_condition
+
+
+def test_ordering_filters_need_a_value():
+    with pytest.raises(ValueError):
+        spec_condition(SpecFilter(key="ram_gb", op=SpecOp.GE))
+    with pytest.raises(ValueError):
+        spec_condition(SpecFilter(key="wifi", op=SpecOp.GT, value=True))
+
+
+@pytest.mark.sqlmodel
+def test_find_assets_by_spec(inventory):
+    small = inventory.add_asset("1", spesifikasi={"jenis": "laptop", "ram_gb": 4})
+    large = inventory.add_asset("2", spesifikasi={"jenis": "laptop", "ram_gb": 16, "gpu": "RTX"})
+    inventory.add_asset("3", spesifikasi={"jenis": "proyektor", "lumen": 3500})
+    inventory.session.commit()
+
+    def kodes(**kwargs):
+        found = find_assets_by_spec(inventory.session, **kwargs)
+        return {asset.kode for asset in found if asset.location_id == inventory.location_id}
+
+    laptops_8gb = kodes(contains={"jenis": "laptop"}, filters=[SpecFilter(key="ram_gb", op=SpecOp.GE, value=8)])
+    assert laptops_8gb == {large.kode}
+    assert kodes(filters=[SpecFilter(key="gpu", op=SpecOp.EXISTS)]) == {large.kode}
+    assert kodes(filters=[SpecFilter(key="ram_gb", value=4)]) == {small.kode}
+    assert kodes(filters=[SpecFilter(key="jenis", op=SpecOp.NE, value="laptop")]) == {f"{inventory.prefix}3"}
@@ -0,0 +1,64 @@
+import pytest
+from sqlalchemy import update
+
+from app.models import Asset, AssetCondition, Location, LocationAssetCount
+from app.summary import get_location_summaries, reconcile_location_counts
+
+
+def _summary(inventory, location_id=None):
+    location_id = location_id or inventory.location_id
+    return next(s for s in get_location_summaries(inventory.session) if s.location_id == location_id)
+
+
+@pytest.mark.sqlmodel
+def test_counters_follow_asset_changes(inventory):
+    session = inventory.session
+    other = Location(kode_lokasi=f"{inventory.prefix}LOC2", nama_lokasi="Gudang")
+    session.add(other)
+    first = inventory.add_asset("1")
+    inventory.add_asset("2", kondisi_barang=AssetCondition.RUSAK_RINGAN)
+    inventory.add_asset("3", is_active=False)
+    session.commit()
+
+    summary = _summary(inventory)
+    assert summary.total_assets == 2
+    assert summary.assets_by_condition[AssetCondition.BAIK.value] == 1
+    assert summary.assets_by_condition[AssetCondition.RUSAK_RINGAN.value] == 1
+
+    # a mutasi moves the asset, a bulk update changes condition, a deactivation drops it
+    first.location_id = other.id
+    session.add(first)
+    session.commit()
+    session.execute(
+        update(Asset)
+        .where(Asset.location_id == inventory.location_id, Asset.is_active)
+        .values(kondisi_barang=AssetCondition.RUSAK_BERAT)
+    )
+    session.commit()
+    assert _summary(inventory).assets_by_condition[AssetCondition.RUSAK_BERAT.value] == 1
+    assert _summary(inventory, other.id).total_assets == 1
+
+    first.is_active = False
+    session.add(first)
+    session.commit()
+    assert _summary(inventory, other.id).total_assets == 0
+
+
+@pytest.mark.sqlmodel
+def test_reconcile_reports_and_repairs_drift(inventory):
+    session = inventory.session
+    inventory.add_asset("1")
+    inventory.add_asset("2")
+    session.commit()
+    session.execute(
+        update(LocationAssetCount)
+        .where(LocationAssetCount.location_id == inventory.location_id)
+        .values(asset_count=LocationAssetCount.asset_count + 5)
+    )
+    session.commit()
+
+    report = reconcile_location_counts(session)
+    drift = next(d for d in report.drifts if d.location_id == inventory.location_id)
+    assert (drift.kondisi_barang, drift.stored, drift.actual) == (AssetCondition.BAIK, 7, 2)
+    assert _summary(inventory).total_assets == 2
+    assert not reconcile_location_counts(session).drifts